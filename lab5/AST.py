@@ -261,6 +261,17 @@ class TabRefBegin(Node):
         self.lineno = lineno
 
 
+class BlockRef(Node):
+    def __init__(self, id, row_begin, row_end, col_begin, col_end, lineno):
+        Node.__init__(self)
+        self.id = id
+        self.row_begin = row_begin
+        self.row_end = row_end
+        self.col_begin = col_begin
+        self.col_end = col_end
+        self.lineno = lineno
+
+
 class MatrixRowsNode(Node):
     def __init__(self, rows, lineno):
         Node.__init__(self)
@@ -276,10 +287,19 @@ class NumLineNode(Node):
 
 
 class MatrixFuncs(Node):
-    def __init__(self, fun, value, lineno):
+    def __init__(self, fun, rows, cols, lineno):
         Node.__init__(self)
         self.fun = fun
-        self.value = value
+        self.rows = rows
+        self.cols = cols
+        self.lineno = lineno
+
+
+class Builtin(Node):
+    def __init__(self, fun, args, lineno):
+        Node.__init__(self)
+        self.fun = fun
+        self.args = args
         self.lineno = lineno
 
 
@@ -299,4 +319,16 @@ class String(Node):
 
 class Error(Node):
     def __init__(self):
-        pass
\ No newline at end of file
+        pass
+
+
+# przechodzi drzewo w głąb (pre-order), zwracając każdy węzeł
+def walk(node):
+    if isinstance(node, list):
+        for item in node:
+            yield from walk(item)
+    elif isinstance(node, Node):
+        yield node
+
+        for value in vars(node).values():
+            yield from walk(value)
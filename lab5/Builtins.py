@@ -0,0 +1,340 @@
+from array import array
+from itertools import chain, repeat
+from math import fsum, sqrt
+import math
+import weakref
+from operator import mul
+from Matrix import Matrix
+from SparseMatrix import SparseMatrix
+
+# Funkcje wbudowane języka M dla macierzy Matrix i SparseMatrix. Sumy liczb
+# rzeczywistych liczy `fsum` (wynik dokładnie zaokrąglony, niezależny od kolejności),
+# więc NumpyBackend daje te same wartości co do bitu.
+
+
+def is_matrix(value):
+    return isinstance(value, (Matrix, SparseMatrix))
+
+
+def size(value):
+    return value.rows * (1 if value.cols is None else value.cols)
+
+
+# wiersze macierzy (axis 1) albo jej kolumny (axis 0) jako ciągi wartości
+def lines(value, axis):
+    if axis == 0:
+        value = value.transposed()
+
+    if isinstance(value, SparseMatrix):
+        return (value.row_values(row) for row in range(value.rows))
+
+    return value.lines()
+
+
+def total(values, floats):
+    return fsum(values) if floats else sum(values)
+
+
+# funkcja(wartości, liczba wartości, czy liczby rzeczywiste); None - brak wyniku dla pustej macierzy
+reducers = {
+    "sum": lambda values, count, floats: total(values, floats),
+    "min": lambda values, count, floats: min(values, default=None),
+    "max": lambda values, count, floats: max(values, default=None),
+    "mean": lambda values, count, floats: total(values, floats) / count if count else None,
+    "norm": lambda values, count, floats: sqrt(total((x * x for x in values), floats)),
+}
+
+# wartość funkcji dla <count> elementów równych c - jak `reducers`, bez przechodzenia po elementach
+constant_reducers = {
+    "sum": lambda c, count: c * count,
+    "min": lambda c, count: c if count else None,
+    "max": lambda c, count: c if count else None,
+    "mean": lambda c, count: c * count / count if count else None,
+    "norm": lambda c, count: sqrt(c * c * count),
+}
+
+
+# sum/min/max/mean/norm(A) - wszystkie elementy, (A, 0) - każda kolumna, (A, 1) - każdy wiersz
+def reduce(fun, value, axis=None):
+    if not is_matrix(value):
+        raise ValueError(f"Argument funkcji `{fun}` musi być macierzą albo wektorem")
+
+    floats = value.dtype == 'd'
+
+    if axis is None:
+        count = size(value)
+
+        if value.constant() is not None:
+            result = constant_reducers[fun](value.constant(), count)
+        elif isinstance(value, SparseMatrix):
+            # niezerowe elementy i jedno zero za wszystkie pozostałe - nie zmienia sumy, minimum ani maksimum
+            zeros = [0.] if len(value.data) < count else []
+            result = reducers[fun](chain(value.data, zeros), count, floats)
+        else:
+            result = reducers[fun](chain.from_iterable(value.lines()), count, floats)
+
+        if result is None:
+            raise ValueError(f"Nie można policzyć `{fun}` dla pustej macierzy")
+
+        return result
+
+    if value.cols is None:
+        raise ValueError(f"Funkcja `{fun}` z osią wymaga macierzy, nie wektora")
+    elif axis not in (0, 1):
+        raise ValueError(f"Oś funkcji `{fun}` musi być równa 0 (kolumny) albo 1 (wiersze): {axis}")
+
+    count = value.cols if axis == 1 else value.rows
+    results = [reducers[fun](line, count, floats) for line in lines(value, axis)]
+
+    if None in results:
+        raise ValueError(f"Nie można policzyć `{fun}` dla pustej macierzy")
+
+    return Matrix(array('d' if floats or fun in ("mean", "norm") else 'q', results), len(results))
+
+
+# iloczyn skalarny - suma iloczynów odpowiadających sobie elementów dwóch wartości tych samych wymiarów
+def dot(left, right):
+    if not is_matrix(left) or not is_matrix(right):
+        raise ValueError("Argumenty funkcji `dot` muszą być macierzami albo wektorami")
+    elif (left.rows, left.cols) != (right.rows, right.cols):
+        raise ValueError("Nie można policzyć `dot` dla wartości o różnych wymiarach")
+
+    products = map(mul, chain.from_iterable(lines(left, 1)), chain.from_iterable(lines(right, 1)))
+    return total(products, 'd' in (left.dtype, right.dtype))
+
+
+# funkcje math bez wyjątków: argument spoza dziedziny daje nan, 0 w log - -inf, przepełnienie - inf (jak w NumPy)
+def safe_sqrt(x):
+    return math.sqrt(x) if x >= 0 else math.nan
+
+
+def safe_exp(x):
+    try:
+        return math.exp(x)
+    except OverflowError:
+        return math.inf
+
+
+def safe_log(x):
+    return math.log(x) if x > 0 else -math.inf if x == 0 else math.nan
+
+
+def safe_pow(x, y):
+    try:
+        return math.pow(x, y)
+    except ValueError:
+        return math.inf if x == 0 else math.nan
+    except OverflowError:
+        return -math.inf if x < 0 and y % 2 == 1 else math.inf
+
+
+# funkcja -> (funkcja z math, jej wersja bez wyjątków)
+kernels = {
+    "sqrt": (math.sqrt, safe_sqrt),
+    "exp": (math.exp, safe_exp),
+    "log": (math.log, safe_log),
+    "pow": (math.pow, safe_pow),
+}
+
+
+# wartości <fun> dla kolejnych elementów <columns> - `map` z funkcją z math; dopiero gdy
+# któryś element jest spoza dziedziny, wszystko jest liczone jeszcze raz wersją bez wyjątków
+def apply(fun, *columns):
+    fast, safe = kernels[fun]
+
+    try:
+        return array('d', map(fast, *columns))
+    except (ValueError, OverflowError):
+        return array('d', map(safe, *columns))
+
+
+# sqrt/exp/log/abs(x) - dla liczby albo każdego elementu macierzy; abs zachowuje typ elementów
+def map_elements(fun, value):
+    if not is_matrix(value):
+        return abs(value) if fun == "abs" else kernels[fun][1](value)
+
+    if isinstance(value, SparseMatrix):
+        if fun in ("sqrt", "abs"):
+            return value.mapped(abs if fun == "abs" else kernels[fun][1], 'd' if fun == "sqrt" else None)
+
+        value = value.dense()
+
+    if value.constant() is not None:
+        return Matrix.repeated(map_elements(fun, value.constant()), value.rows, value.cols)
+    elif fun == "abs":
+        return Matrix(array(value.dtype, map(abs, value.flat())), value.rows, value.cols)
+
+    return Matrix(apply(fun, value.flat()), value.rows, value.cols)
+
+
+# pow(x, y) element po elemencie: liczba albo macierz do potęgi liczby, liczba do potęgi
+# każdego elementu macierzy albo dwie macierze tych samych wymiarów; wynik zawsze rzeczywisty
+def power(x, y):
+    if not is_matrix(x) and not is_matrix(y):
+        return safe_pow(x, y)
+    elif is_matrix(x) and is_matrix(y) and (x.rows, x.cols) != (y.rows, y.cols):
+        raise ValueError("Nie można policzyć `pow` dla macierzy o różnych wymiarach")
+
+    if isinstance(x, SparseMatrix) and not is_matrix(y) and y > 0:
+        return x.mapped(lambda value: safe_pow(value, y), 'd')
+
+    x, y = (value.dense() if isinstance(value, SparseMatrix) else value for value in (x, y))
+    shape = x if is_matrix(x) else y
+
+    if not is_matrix(y) and x.constant() is not None:
+        return Matrix.repeated(safe_pow(x.constant(), y), x.rows, x.cols)
+
+    columns = [value.flat() if is_matrix(value) else repeat(value) for value in (x, y)]
+    return Matrix(apply("pow", *columns), shape.rows, shape.cols)
+
+
+# Rozkład LU z częściowym wyborem elementu głównego: P·A = L·U, L (bez jedynek na przekątnej)
+# i U w jednej liście wierszy. Kolejność działań na każdym elemencie jest taka sama jak w
+# wersji z NumpyBackend (całe wiersze naraz), więc oba backendy dają te same wyniki co do bitu.
+def lu(rows):
+    a = [[float(x) for x in row] for row in rows]
+    n = len(a)
+    perm, sign, singular = list(range(n)), 1., False
+
+    for k in range(n):
+        pivot = max(range(k, n), key=lambda i: abs(a[i][k]))
+
+        if a[pivot][k] == 0:
+            singular = True
+            continue
+
+        if pivot != k:
+            a[k], a[pivot] = a[pivot], a[k]
+            perm[k], perm[pivot] = perm[pivot], perm[k]
+            sign = -sign
+
+        row = a[k]
+
+        for i in range(k + 1, n):
+            line = a[i]
+            factor = line[k] / row[k]
+            line[k] = factor
+            line[k + 1:] = [x - factor * y for x, y in zip(line[k + 1:], row[k + 1:])]
+
+    return a, perm, sign, singular
+
+
+# id macierzy -> (słaba referencja, kopia elementów, rozkład); kopia wykrywa zapis do macierzy
+# po rozkładzie, więc kolejne solve/inv/det z tym samym A kosztują porównanie zamiast O(n³)
+factorizations = {}
+
+
+def factorization(value):
+    cached = factorizations.get(id(value))
+    snapshot = array(value.dtype, value.flat())
+
+    if cached is not None and cached[0]() is value and cached[1] == snapshot:
+        return cached[2]
+
+    if cached is None:
+        weakref.finalize(value, factorizations.pop, id(value), None)
+
+    factors = lu(value.lines())
+    factorizations[id(value)] = (weakref.ref(value), snapshot, factors)
+    return factors
+
+
+# macierz kwadratowa do rozkładu - rzadka (oprócz jednostkowej, obsługiwanej osobno) jako gęsta
+def square(fun, value):
+    if not is_matrix(value) or value.cols is None or value.rows != value.cols:
+        raise ValueError(f"Funkcja `{fun}` wymaga macierzy kwadratowej")
+
+    return value.dense() if isinstance(value, SparseMatrix) else value
+
+
+# rozwiązanie L·U·X = P·B dla wierszy <rhs> - każdy wiersz B naraz dla wszystkich kolumn
+def substitute(factors, rhs):
+    a, perm, sign, singular = factors
+
+    if singular:
+        raise ValueError("Macierz układu jest osobliwa")
+
+    rhs = [list(line) for line in rhs]
+    b = [[float(x) for x in rhs[i]] for i in perm]
+    n = len(a)
+
+    for k in range(n):
+        for i in range(k + 1, n):
+            factor = a[i][k]
+            b[i] = [x - factor * y for x, y in zip(b[i], b[k])]
+
+    for k in reversed(range(n)):
+        pivot = a[k][k]
+        b[k] = [x / pivot for x in b[k]]
+
+        for i in range(k):
+            factor = a[i][k]
+            b[i] = [x - factor * y for x, y in zip(b[i], b[k])]
+
+    return b
+
+
+# solve(A, b) - rozwiązanie układu A·x = b dla wektora b albo każdej kolumny macierzy b
+def solve(matrix, rhs):
+    if not is_matrix(rhs):
+        raise ValueError("Prawa strona układu w funkcji `solve` musi być macierzą albo wektorem")
+
+    if isinstance(matrix, SparseMatrix) and matrix.is_identity() and rhs.rows == matrix.rows:
+        return Matrix(array('d', chain.from_iterable(lines(rhs, 1))), rhs.rows, rhs.cols)
+
+    matrix = square("solve", matrix)
+
+    if rhs.rows != matrix.rows:
+        raise ValueError(f"Prawa strona układu ma {rhs.rows} wierszy, a macierz {matrix.rows}")
+
+    if rhs.cols is None:
+        rows = [[x] for x in rhs.flat()]
+    else:
+        rows = lines(rhs, 1)
+
+    result = substitute(factorization(matrix), rows)
+    return Matrix(array('d', chain.from_iterable(result)), rhs.rows, rhs.cols)
+
+
+def inverse(matrix):
+    if isinstance(matrix, SparseMatrix) and matrix.is_identity():
+        return matrix
+
+    matrix = square("inv", matrix)
+    n = matrix.rows
+    identity = ([1. if i == j else 0. for j in range(n)] for i in range(n))
+    return Matrix(array('d', chain.from_iterable(substitute(factorization(matrix), identity))), n, n)
+
+
+# wyznacznik - iloczyn przekątnej U ze znakiem permutacji (0 dla macierzy osobliwej)
+def determinant(matrix):
+    if isinstance(matrix, SparseMatrix) and matrix.is_identity():
+        return 1.
+
+    a, perm, sign, singular = factorization(square("det", matrix))
+
+    if singular:
+        return 0.
+
+    for k in range(len(a)):
+        sign *= a[k][k]
+
+    return sign
+
+
+builtins = {
+    "sum": lambda value, axis=None: reduce("sum", value, axis),
+    "min": lambda value, axis=None: reduce("min", value, axis),
+    "max": lambda value, axis=None: reduce("max", value, axis),
+    "mean": lambda value, axis=None: reduce("mean", value, axis),
+    "norm": lambda value, axis=None: reduce("norm", value, axis),
+    "dot": dot,
+    "sqrt": lambda value: map_elements("sqrt", value),
+    "exp": lambda value: map_elements("exp", value),
+    "log": lambda value: map_elements("log", value),
+    "abs": lambda value: map_elements("abs", value),
+    "pow": power,
+    "solve": solve,
+    "inv": inverse,
+    "det": determinant,
+}
@@ -0,0 +1,461 @@
+import AST
+from visit import *
+from DefUse import shares, elementwise_tree
+
+# kody operacji - każda instrukcja zajmuje dwie komórki tablicy: [kod, argument]
+HALT = 0
+LOAD_CONST = 1          # push consts[arg]
+LOAD = 2                # push slots[arg]
+STORE = 3               # slots[arg] = pop()
+POP = 4
+ADD = 5
+SUB = 6
+MUL = 7
+DIV = 8                 # dzielenie z `inf` dla zera, jak w `operations['/']`
+UPDATE = 9              # right = pop(); stack[-1] = update(consts[arg], stack[-1], right) - `x += v`
+BINARY_MAT = 10         # arith_mat(consts[arg], left, right)
+COMPARE_LT = 11
+COMPARE_GT = 12
+COMPARE_LE = 13
+COMPARE_GE = 14
+COMPARE_EQ = 15
+COMPARE_NE = 16
+JUMP = 17               # pc = arg
+POP_JUMP_IF_FALSE = 18
+POP_JUMP_IF_TRUE = 19
+FOR_STEP = 20           # push slots[arg] < slots[arg + 1]; slots[arg] += 1
+MATRIX_FUNC = 22        # fun, n = consts[arg]; push matrix_funcs(fun, n ostatnich wartości ze stosu)
+LOAD_ITEM1 = 23         # row = pop(); push slots[arg][row]
+LOAD_ITEM2 = 24         # col = pop(); row = pop(); push slots[arg][row, col]
+STORE_ITEM1 = 25        # row = pop(); value = pop(); slots[arg] = store_row(slots[arg], row, value)
+STORE_ITEM2 = 26        # col = pop(); row = pop(); value = pop(); slots[arg] = store_item(slots[arg], row, col, value)
+STORE_RANGE = 27        # end = pop(); begin = pop(); value = pop(); slots[arg] = store_range(slots[arg], begin, end, value)
+TO_STR = 28             # push show(pop())
+JOIN_STR = 29           # right = pop(); push f"{pop()} {show(right)}"
+PRINT = 30
+TRANSPOSE = 31
+MATRIX_LITERAL = 32     # push share(macierz z consts[arg]) - tworzona raz, przy pierwszym wykonaniu
+LOAD_RANGE = 33         # end = pop(); begin = pop(); push load_range(slots[arg], begin, end)
+LOAD_BLOCK = 34         # 4 granice ze stosu; push load_block(slots[arg], *granice)
+SHARE = 35              # stack[-1] = share(stack[-1]) - przed przypisaniem `B = A` i `r = A[i]`
+ARITH_FUSED = 36        # tree, n = consts[arg]; push arith_fused(tree, n ostatnich wartości ze stosu)
+UPDATE_ITEM = 37        # op, slot, n = consts[arg]; n indeksów i wartość ze stosu; slots[slot] = update_item(...)
+STORE_BLOCK = 38        # 4 granice i wartość ze stosu; slots[arg] = store_block(slots[arg], *granice, value)
+CALL_BUILTIN = 39       # fun, n = consts[arg]; push call_builtin(fun, n ostatnich wartości ze stosu)
+
+opnames = {value: name for name, value in list(globals().items()) if name.isupper() and isinstance(value, int)}
+
+# instrukcje, których argument jest indeksem w tablicy stałych, slotem lub adresem skoku
+const_ops = {LOAD_CONST, BINARY_MAT, MATRIX_FUNC, MATRIX_LITERAL, ARITH_FUSED, UPDATE, UPDATE_ITEM, CALL_BUILTIN}
+slot_ops = {LOAD, STORE, FOR_STEP, LOAD_ITEM1, LOAD_ITEM2, STORE_ITEM1, STORE_ITEM2, STORE_RANGE, LOAD_RANGE,
+            LOAD_BLOCK, STORE_BLOCK}
+jump_ops = {JUMP, POP_JUMP_IF_FALSE, POP_JUMP_IF_TRUE}
+
+arith_ops = {'+': ADD, '-': SUB, '*': MUL, '/': DIV}
+compare_ops = {'<': COMPARE_LT, '>': COMPARE_GT, '<=': COMPARE_LE, '>=': COMPARE_GE, '==': COMPARE_EQ, '!=': COMPARE_NE}
+
+
+class Code(object):
+    def __init__(self, instructions, consts, slot_names):
+        self.instructions = instructions
+        self.consts = consts
+        self.slot_names = slot_names
+        self.nslots = len(slot_names)
+
+
+def disassemble(code):
+    lines = []
+    instructions = code.instructions
+
+    for pc in range(0, len(instructions), 2):
+        op, arg = instructions[pc], instructions[pc + 1]
+        line = f"{pc:>6} {opnames[op]:<18}"
+
+        if op in const_ops:
+            line += f"{arg:>4} ({code.consts[arg]!r})"
+        elif op in slot_ops:
+            line += f"{arg:>4} ({code.slot_names[arg]})"
+        elif op in jump_ops:
+            line += f"{arg:>4}"
+
+        lines.append(line.rstrip())
+
+    return "\n".join(lines)
+
+
+# Kompilator zamienia AST na płaską tablicę instrukcji maszyny stosowej.
+# Zmienne są rozwiązywane w czasie kompilacji do numerów slotów (zasięgi
+# bloków jak w MemoryStack), a `break`/`continue`/`return` stają się skokami.
+class BytecodeCompiler(object):
+    def __init__(self):
+        self.instructions = []
+        self.consts = []
+        self.const_index = {}
+        self.slot_names = []
+        self.scopes = [{}]
+        self.loops = []   # (skoki do `continue`, skoki do `break`) dla każdej otwartej pętli
+        self.blocks = []  # skoki `return` do końca najbliższego bloku { ... }
+
+    def compile(self, ast):
+        self.visit(ast)
+        self.emit(HALT)
+        return Code(self.instructions, self.consts, self.slot_names)
+
+    def emit(self, op, arg=0):
+        self.instructions.extend((op, arg))
+        return len(self.instructions) - 2
+
+    def label(self):
+        return len(self.instructions)
+
+    def patch(self, positions, target):
+        for position in positions:
+            self.instructions[position + 1] = target
+
+    def const(self, value):
+        # stałe niehaszowalne (np. wiersze macierzy) zawsze dostają własny indeks
+        try:
+            key = (type(value), value)
+            index = self.const_index.get(key)
+        except TypeError:
+            key, index = None, None
+
+        if index is None:
+            index = len(self.consts)
+            self.consts.append(value)
+
+            if key is not None:
+                self.const_index[key] = index
+
+        return index
+
+    def push_scope(self):
+        self.scopes.append({})
+
+    def pop_scope(self):
+        self.scopes.pop()
+
+    def declare(self, name):
+        slot = len(self.slot_names)
+        self.slot_names.append(name)
+        self.scopes[-1][name] = slot
+        return slot
+
+    def hidden(self, name):
+        slot = len(self.slot_names)
+        self.slot_names.append(name)
+        return slot
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            slot = scope.get(name)
+
+            if slot is not None:
+                return slot
+
+        return None
+
+    def resolve(self, name):
+        slot = self.lookup(name)
+        return slot if slot is not None else self.declare(name)
+
+    def scoped(self, node):
+        self.push_scope()
+        self.visit(node)
+        self.pop_scope()
+
+    @on('node')
+    def visit(self, node):
+        pass
+
+    @when(AST.MultipleStmts)
+    def visit(self, node):
+        for stmt in node.stmts:
+            if stmt is not None:
+                self.visit(stmt)
+
+    @when(AST.ControlStmt)
+    def visit(self, node):
+        continue_jumps, break_jumps = self.loops[-1]
+
+        if node.control_stmt == "continue":
+            continue_jumps.append(self.emit(JUMP))
+        elif node.control_stmt == "break":
+            break_jumps.append(self.emit(JUMP))
+
+    @when(AST.StatementsSet)
+    def visit(self, node):
+        self.blocks.append([])
+        self.scoped(node.stmts)
+        self.patch(self.blocks.pop(), self.label())
+
+    @when(AST.SpecificStmt)
+    def visit(self, node):
+        self.visit(node.specific_stmt)
+
+    @when(AST.ReturnExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+        self.emit(POP)
+        self.blocks[-1].append(self.emit(JUMP))
+
+    @when(AST.IfElseStmt)
+    def visit(self, node):
+        self.visit(node.rel_expr)
+        to_else = self.emit(POP_JUMP_IF_FALSE)
+        self.scoped(node.if_stmt)
+        to_end = self.emit(JUMP)
+        self.patch([to_else], self.label())
+        self.scoped(node.else_stmt)
+        self.patch([to_end], self.label())
+
+    @when(AST.IfStmt)
+    def visit(self, node):
+        self.visit(node.rel_expr)
+        to_end = self.emit(POP_JUMP_IF_FALSE)
+        self.scoped(node.if_stmt)
+        self.patch([to_end], self.label())
+
+    @when(AST.WhileStmt)
+    def visit(self, node):
+        self.push_scope()
+        self.loops.append(([], []))
+
+        top = self.label()
+        self.visit(node.rel_expr)
+        to_end = self.emit(POP_JUMP_IF_FALSE)
+        self.visit(node.while_stmt)
+        self.emit(JUMP, top)
+
+        continue_jumps, break_jumps = self.loops.pop()
+        self.patch(continue_jumps, top)
+        self.patch([to_end] + break_jumps, self.label())
+        self.pop_scope()
+
+    # Pętla przechodzi przez wartości begin..end włącznie, o ile begin < end;
+    # licznik trzymany jest w ukrytym slocie, więc przypisania do zmiennej
+    # iterującej w ciele pętli działają tylko do końca bieżącego obrotu.
+    @when(AST.ForStmt)
+    def visit(self, node):
+        counter = self.hidden(f"{node.iter_variable}@counter")
+        self.hidden(f"{node.iter_variable}@end")  # zawsze counter + 1, czyta go FOR_STEP
+
+        self.visit(node.range_begin)
+        self.emit(STORE, counter)
+        self.visit(node.range_end)
+        self.emit(STORE, counter + 1)
+
+        self.push_scope()
+        iterator = self.declare(node.iter_variable)
+        self.loops.append(([], []))
+
+        self.emit(LOAD, counter)
+        self.emit(LOAD, counter + 1)
+        self.emit(COMPARE_LT)
+        to_end = self.emit(POP_JUMP_IF_FALSE)
+
+        body = self.label()
+        self.emit(LOAD, counter)
+        self.emit(STORE, iterator)
+        self.visit(node.for_stmt)
+
+        step = self.label()
+        self.emit(FOR_STEP, counter)
+        self.emit(POP_JUMP_IF_TRUE, body)
+
+        continue_jumps, break_jumps = self.loops.pop()
+        self.patch(continue_jumps, step)
+        self.patch([to_end] + break_jumps, self.label())
+        self.pop_scope()
+
+    @when(AST.PrintStmt)
+    def visit(self, node):
+        self.visit(node.print_stmt)
+        self.emit(PRINT)
+
+    @when(AST.PrintRecursive)
+    def visit(self, node):
+        self.visit(node.print_rec)
+        self.visit(node.print_expr)
+        self.emit(JOIN_STR)
+
+    @when(AST.PrintExpr)
+    def visit(self, node):
+        self.visit(node.print_expr)
+        self.emit(TO_STR)
+
+    @when(AST.Value)
+    def visit(self, node):
+        self.visit(node.val)
+
+    @when(AST.ArithNumExpr)
+    def visit(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+        self.emit(arith_ops[node.op])
+
+    @when(AST.Variable)
+    def visit(self, node):
+        self.emit(LOAD, self.resolve(node.name))
+
+    @when(AST.IntNum)
+    def visit(self, node):
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    @when(AST.AssignExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+        self.emit(LOAD_CONST, self.const(None))
+
+    @when(AST.RelationExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+    @when(AST.MatrixExpression)
+    def visit(self, node):
+        expression = node.expression
+
+        if isinstance(expression, AST.DoubleRef):
+            self.visit(expression.row)
+            self.visit(expression.col)
+            self.emit(LOAD_ITEM2, self.resolve(expression.id))
+        elif isinstance(expression, AST.SingleRef):
+            self.visit(expression.row)
+            self.emit(LOAD_ITEM1, self.resolve(expression.id))
+        elif isinstance(expression, (AST.TabRefBoth, AST.TabRefEnd, AST.TabRefBegin)):
+            self.bounds(getattr(expression, "begin", None), getattr(expression, "end", None))
+            self.emit(LOAD_RANGE, self.resolve(expression.id))
+        elif isinstance(expression, AST.BlockRef):
+            self.bounds(expression.row_begin, expression.row_end, expression.col_begin, expression.col_end)
+            self.emit(LOAD_BLOCK, self.resolve(expression.id))
+        else:
+            self.visit(expression)
+
+    @when(AST.UnaryExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+    # literał zawiera same stałe - w consts trafia jako zagnieżdżona lista
+    @when(AST.MatrixNode)
+    def visit(self, node):
+        values = node.values
+        rows = [row.num_line for row in values.rows] if isinstance(values, AST.MatrixRowsNode) else values.num_line
+        self.emit(MATRIX_LITERAL, self.const(rows))
+
+    @when(AST.GeneralExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+        if node.special_op == "'":
+            self.emit(TRANSPOSE)
+
+    @when(AST.ArithMatExpr)
+    def visit(self, node):
+        tree, leaves = elementwise_tree(node)
+
+        if len(leaves) > 2:
+            for leaf in leaves:
+                self.visit(leaf)
+
+            self.emit(ARITH_FUSED, self.const((tree, len(leaves))))
+            return
+
+        self.visit(node.left)
+        self.visit(node.right)
+        self.emit(BINARY_MAT, self.const(node.div_op))
+
+    @when(AST.DeclareExpr)
+    def visit(self, node):
+        self.visit(node.right)
+
+        if isinstance(node.left, AST.Variable):
+            if shares(node.right):
+                self.emit(SHARE)
+
+            self.emit(STORE, self.resolve(node.left.name))
+            return
+
+        ref = node.left.matrix_ref if isinstance(node.left, AST.MatrixRef) else node.left.tab_ref
+        slot = self.resolve(ref.id)
+
+        if isinstance(ref, AST.DoubleRef):
+            self.visit(ref.row)
+            self.visit(ref.col)
+            self.emit(STORE_ITEM2, slot)
+        elif isinstance(ref, AST.SingleRef):
+            self.visit(ref.row)
+            self.emit(STORE_ITEM1, slot)
+        elif isinstance(ref, AST.BlockRef):
+            self.bounds(ref.row_begin, ref.row_end, ref.col_begin, ref.col_end)
+            self.emit(STORE_BLOCK, slot)
+        else:
+            self.bounds(getattr(ref, "begin", None), getattr(ref, "end", None))
+            self.emit(STORE_RANGE, slot)
+
+    # granice wycinka na stos; pominięta granica to None
+    def bounds(self, *bounds):
+        for bound in bounds:
+            if bound is None:
+                self.emit(LOAD_CONST, self.const(None))
+            else:
+                self.visit(bound)
+
+    @when(AST.UpdateExpr)
+    def visit(self, node):
+        if isinstance(node.left, AST.Variable):
+            slot = self.resolve(node.left.name)
+            self.emit(LOAD, slot)
+            self.visit(node.right)
+            self.emit(UPDATE, self.const(node.assign_op))
+            self.emit(STORE, slot)
+            return
+
+        # wartość, potem indeksy jak w `update_item`: [row, col], [row] albo [begin, end, None]
+        self.visit(node.right)
+        ref = node.left.matrix_ref if isinstance(node.left, AST.MatrixRef) else node.left.tab_ref
+
+        if isinstance(ref, AST.DoubleRef):
+            indices = (ref.row, ref.col)
+        elif isinstance(ref, AST.SingleRef):
+            indices = (ref.row,)
+        elif isinstance(ref, AST.BlockRef):
+            indices = (ref.row_begin, ref.row_end, ref.col_begin, ref.col_end)
+        else:
+            indices = (getattr(ref, "begin", None), getattr(ref, "end", None), None)
+
+        self.bounds(*indices)
+        self.emit(UPDATE_ITEM, self.const((node.assign_op, self.resolve(ref.id), len(indices))))
+
+    @when(AST.CompExpr)
+    def visit(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+        self.emit(compare_ops[node.comp_op])
+
+    @when(AST.MatrixFuncs)
+    def visit(self, node):
+        args = [arg for arg in (node.rows, node.cols) if arg is not None]
+
+        for arg in args:
+            self.visit(arg)
+
+        self.emit(MATRIX_FUNC, self.const((node.fun, len(args))))
+
+    @when(AST.Builtin)
+    def visit(self, node):
+        for arg in node.args:
+            self.visit(arg)
+
+        self.emit(CALL_BUILTIN, self.const((node.fun, len(node.args))))
+
+    @when(AST.FloatNum)
+    def visit(self, node):
+        self.emit(LOAD_CONST, self.const(node.value))
+
+    @when(AST.String)
+    def visit(self, node):
+        self.emit(LOAD_CONST, self.const(node.value[1:-1]))
+
+    @when(AST.Error)
+    def visit(self, node):
+        self.emit(LOAD_CONST, self.const(None))
@@ -0,0 +1,503 @@
+import AST
+from Memory import *
+from Exceptions import *
+from visit import *
+from Runtime import *
+from DefUse import elementwise_tree
+import sys
+
+sys.setrecursionlimit(10000)
+
+
+# Zamiast chodzić po drzewie przy każdym wykonaniu, AST jest raz zamieniane
+# na drzewo domknięć, które mają już powiązane poddomknięcia, operatory
+# i metody stosu pamięci. Semantyka jest taka sama jak w Interpreterze.
+class ClosureCompiler(object):
+    def __init__(self):
+        self.memory_stack = MemoryStack(Memory("global_memory"))
+
+    def run(self, ast):
+        self.compile(ast)()
+
+    def compile(self, node):
+        if node is None:
+            return lambda: None
+
+        return self.visit(node)
+
+    # opakowuje <body> w utworzenie własnej ramki; bloki bez nowych nazw (frame_size None) jej nie dostają
+    def scoped(self, name, frame_size, body):
+        if frame_size is None:
+            return body
+
+        push, pop = self.memory_stack.push, self.memory_stack.pop
+
+        def run():
+            push(Memory(name, frame_size))
+            signal = body()
+            pop()
+            return signal
+
+        return run
+
+    @on('node')
+    def visit(self, node):
+        pass
+
+    @when(AST.MultipleStmts)
+    def visit(self, node):
+        # tylko korzeń programu ma niezerowy rozmiar - to sloty ramki globalnej
+        if node.frame_size:
+            self.memory_stack.memory_stack[0].reserve(node.frame_size)
+
+        stmts = tuple(self.visit(stmt) for stmt in node.stmts if stmt is not None)
+
+        # sygnał zakończenia (BREAK / CONTINUE / RETURN) przerywa ciąg instrukcji
+        def run():
+            for stmt in stmts:
+                signal = stmt()
+
+                if signal:
+                    return signal
+
+        return run
+
+    @when(AST.ControlStmt)
+    def visit(self, node):
+        signal = CONTINUE if node.control_stmt == "continue" else BREAK
+        return lambda: signal
+
+    @when(AST.StatementsSet)
+    def visit(self, node):
+        stmts = self.scoped("stmts_set", node.frame_size, self.visit(node.stmts))
+
+        def run():
+            signal = stmts()
+
+            if signal is not RETURN:
+                return signal
+
+        return run
+
+    @when(AST.SpecificStmt)
+    def visit(self, node):
+        return self.visit(node.specific_stmt)
+
+    @when(AST.ReturnExpression)
+    def visit(self, node):
+        expression = self.visit(node.expression)
+
+        def run():
+            expression()
+            return RETURN
+
+        return run
+
+    @when(AST.IfElseStmt)
+    def visit(self, node):
+        rel_expr = self.visit(node.rel_expr)
+        if_stmt = self.scoped("if_stmt", node.if_frame_size, self.compile(node.if_stmt))
+        else_stmt = self.scoped("else_stmt", node.else_frame_size, self.compile(node.else_stmt))
+
+        def run():
+            if rel_expr():
+                return if_stmt()
+            else:
+                return else_stmt()
+
+        return run
+
+    @when(AST.IfStmt)
+    def visit(self, node):
+        rel_expr = self.visit(node.rel_expr)
+        if_stmt = self.scoped("if_stmt", node.frame_size, self.compile(node.if_stmt))
+
+        def run():
+            if rel_expr():
+                return if_stmt()
+
+        return run
+
+    @when(AST.WhileStmt)
+    def visit(self, node):
+        rel_expr = self.visit(node.rel_expr)
+        while_stmt = self.compile(node.while_stmt)
+
+        def run():
+            signal = None
+
+            while rel_expr():
+                signal = while_stmt()
+
+                if signal is BREAK:
+                    signal = None
+                    break
+                elif signal is RETURN:
+                    break
+
+            if signal is RETURN:
+                return signal
+
+        return self.scoped("while_stmt", node.frame_size, run)
+
+    @when(AST.ForStmt)
+    def visit(self, node):
+        level, slot = node.address
+        range_begin = self.visit(node.range_begin)
+        range_end = self.visit(node.range_end)
+        for_stmt = self.compile(node.for_stmt)
+        frame_size = node.frame_size
+        native_range = not node.assigns_iterator # jak w Interpreterze - iteracja po `range`
+        memory_stack = self.memory_stack
+        frames = memory_stack.frames
+
+        def run():
+            value = range_begin()
+            value_end = range_end()
+
+            memory_stack.push(Memory("for_stmt", frame_size))
+            frame = frames[level]
+            frame[slot] = value
+            signal = None
+
+            if native_range and type(value) is int and type(value_end) is int:
+                for value in range(value, value_end + 1 if value < value_end else value):
+                    frame[slot] = value
+                    signal = for_stmt()
+
+                    if signal is BREAK:
+                        signal = None
+                        break
+                    elif signal is RETURN:
+                        break
+            else:
+                while value < value_end:
+                    value = frame[slot]
+                    signal = for_stmt()
+                    frame[slot] = value + 1
+
+                    if signal is BREAK:
+                        signal = None
+                        break
+                    elif signal is RETURN:
+                        break
+
+            memory_stack.pop()
+
+            if signal is RETURN:
+                return signal
+
+        return run
+
+    @when(AST.PrintStmt)
+    def visit(self, node):
+        print_stmt = self.visit(node.print_stmt)
+        return lambda: print(print_stmt())
+
+    @when(AST.PrintRecursive)
+    def visit(self, node):
+        print_rec = self.visit(node.print_rec)
+        print_expr = self.visit(node.print_expr)
+        return lambda: f"{print_rec()} {show(print_expr())}"
+
+    @when(AST.PrintExpr)
+    def visit(self, node):
+        print_expr = self.visit(node.print_expr)
+        return lambda: show(print_expr())
+
+    @when(AST.Value)
+    def visit(self, node):
+        return self.visit(node.val)
+
+    @when(AST.ArithNumExpr)
+    def visit(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.op
+
+        # najczęstsze operatory bez dodatkowego wywołania lambdy z `operations`
+        if op == '+':
+            return lambda: left() + right()
+        elif op == '-':
+            return lambda: left() - right()
+        elif op == '*':
+            return lambda: left() * right()
+
+        func = operations[op]
+        return lambda: func(left(), right())
+
+    @when(AST.Variable)
+    def visit(self, node):
+        level, slot = node.address
+        frames = self.memory_stack.frames
+        return lambda: frames[level][slot]
+
+    @when(AST.IntNum)
+    def visit(self, node):
+        value = node.value
+        return lambda: value
+
+    @when(AST.AssignExpression)
+    def visit(self, node):
+        expression = self.visit(node.expression)
+
+        def run():
+            expression()
+
+        return run
+
+    @when(AST.RelationExpression)
+    def visit(self, node):
+        return self.visit(node.expression)
+
+    @when(AST.MatrixExpression)
+    def visit(self, node):
+        expression = self.visit(node.expression)
+        frames = self.memory_stack.frames
+
+        if isinstance(node.expression, AST.DoubleRef):
+            level, slot = node.expression.address
+
+            def run():
+                val = expression()
+                return frames[level][slot][val[0], val[1]]
+
+            return run
+
+        if isinstance(node.expression, AST.SingleRef):
+            level, slot = node.expression.address
+
+            def run():
+                val = expression()
+                return frames[level][slot][val[0]]
+
+            return run
+
+        # wycinki A[a:b] i bloki A[a:b, c:d] są widokami macierzy
+        if isinstance(node.expression, (AST.TabRefBoth, AST.TabRefEnd, AST.TabRefBegin)):
+            level, slot = node.expression.address
+
+            def run():
+                val = expression()
+                return load_range(frames[level][slot], val[0], val[1])
+
+            return run
+
+        if isinstance(node.expression, AST.BlockRef):
+            level, slot = node.expression.address
+            return lambda: load_block(frames[level][slot], *expression())
+
+        return expression
+
+    @when(AST.UnaryExpression)
+    def visit(self, node):
+        return self.visit(node.expression)
+
+    @when(AST.MatrixNode)
+    def visit(self, node):
+        # literał zawiera same stałe - macierz powstaje raz, przy kompilacji
+        matrix = matrix_literal(self.visit(node.values)())
+        return lambda: share(matrix)
+
+    @when(AST.GeneralExpression)
+    def visit(self, node):
+        expression = self.visit(node.expression)
+
+        if node.special_op == "'":
+            return lambda: transpose(expression())
+
+        return expression
+
+    @when(AST.ArithMatExpr)
+    def visit(self, node):
+        tree, leaves = elementwise_tree(node)
+
+        # kilka działań pod rząd - jedno przejście przez elementy, bez macierzy pośrednich
+        if len(leaves) > 2:
+            leaves = tuple(self.visit(leaf) for leaf in leaves)
+            return lambda: arith_fused(tree, [leaf() for leaf in leaves])
+
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.div_op
+        return lambda: arith_mat(op, left(), right())
+
+    @when(AST.DeclareExpr)
+    def visit(self, node):
+        right = self.visit(node.right)
+        frames = self.memory_stack.frames
+
+        if isinstance(node.left, AST.Variable):
+            level, slot = node.left.address
+
+            if node.shares:
+                def run():
+                    frames[level][slot] = share(right())
+            else:
+                def run():
+                    frames[level][slot] = right()
+
+            return run
+
+        left = self.visit(node.left)
+
+        def run():
+            (level, slot), indices = left()
+            matrix = frames[level][slot]
+            value = right()
+
+            if len(indices) == 4:
+                matrix = store_block(matrix, *indices, value)
+
+            elif len(indices) == 3:
+                matrix = store_range(matrix, indices[0], indices[1], value)
+
+            elif len(indices) == 2:
+                matrix = store_item(matrix, indices[0], indices[1], value)
+
+            else:
+                matrix = store_row(matrix, indices[0], value)
+
+            frames[level][slot] = matrix
+
+        return run
+
+    @when(AST.UpdateExpr)
+    def visit(self, node):
+        right = self.visit(node.right)
+        frames = self.memory_stack.frames
+        op = node.assign_op
+
+        if not isinstance(node.left, AST.Variable):
+            left = self.visit(node.left)
+
+            def run():
+                value = right()
+                (level, slot), indices = left()
+                frame = frames[level]
+                frame[slot] = update_item(op, frame[slot], indices, value)
+
+            return run
+
+        level, slot = node.left.address
+        func = compound[op]
+        numbers = scalars
+
+        # liczby bez dodatkowego wywołania `update`; macierz jest zmieniana w miejscu, jeśli może
+        def run():
+            frame = frames[level]
+            old = frame[slot]
+            frame[slot] = func(old, right()) if old.__class__ in numbers else update(op, old, right())
+
+        return run
+
+    @when(AST.CompExpr)
+    def visit(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.comp_op
+
+        if op == '<':
+            return lambda: left() < right()
+        elif op == '>':
+            return lambda: left() > right()
+        elif op == '<=':
+            return lambda: left() <= right()
+        elif op == '>=':
+            return lambda: left() >= right()
+        elif op == '==':
+            return lambda: left() == right()
+        elif op == '!=':
+            return lambda: left() != right()
+
+        return lambda: None
+
+    @when(AST.MatrixRef)
+    def visit(self, node):
+        address = node.matrix_ref.address
+        indices = self.visit(node.matrix_ref)
+        return lambda: (address, indices())
+
+    @when(AST.TabRef)
+    def visit(self, node):
+        address = node.tab_ref.address
+        indices = self.visit(node.tab_ref)
+        return lambda: (address, indices())
+
+    @when(AST.DoubleRef)
+    def visit(self, node):
+        row = self.visit(node.row)
+        col = self.visit(node.col)
+        return lambda: [row(), col()]
+
+    @when(AST.SingleRef)
+    def visit(self, node):
+        row = self.visit(node.row)
+        return lambda: [row()]
+
+    @when(AST.TabRefBoth)
+    def visit(self, node):
+        begin = self.visit(node.begin)
+        end = self.visit(node.end)
+        return lambda: [begin(), end(), None]
+
+    @when(AST.TabRefEnd)
+    def visit(self, node):
+        end = self.visit(node.end)
+        return lambda: [None, end(), None]
+
+    @when(AST.TabRefBegin)
+    def visit(self, node):
+        begin = self.visit(node.begin)
+        return lambda: [begin(), None, None]
+
+    @when(AST.BlockRef)
+    def visit(self, node):
+        bounds = tuple(self.visit(bound) for bound in (node.row_begin, node.row_end, node.col_begin, node.col_end))
+        return lambda: [bound() for bound in bounds]
+
+    @when(AST.MatrixRowsNode)
+    def visit(self, node):
+        rows = tuple(self.visit(row) for row in node.rows)
+        return lambda: [row() for row in rows]
+
+    @when(AST.NumLineNode)
+    def visit(self, node):
+        num_line = node.num_line
+        return lambda: num_line
+
+    @when(AST.MatrixFuncs)
+    def visit(self, node):
+        fun = node.fun
+        rows = self.visit(node.rows)
+
+        if node.cols is None:
+            return lambda: matrix_funcs(fun, rows())
+
+        cols = self.visit(node.cols)
+        return lambda: matrix_funcs(fun, rows(), cols())
+
+    @when(AST.Builtin)
+    def visit(self, node):
+        fun = node.fun
+        args = tuple(self.visit(arg) for arg in node.args)
+
+        if len(args) == 1:
+            arg = args[0]
+            return lambda: call_builtin(fun, arg())
+
+        return lambda: call_builtin(fun, *[arg() for arg in args])
+
+    @when(AST.FloatNum)
+    def visit(self, node):
+        value = node.value
+        return lambda: value
+
+    @when(AST.String)
+    def visit(self, node):
+        value = node.value[1:-1]
+        return lambda: value
+
+    @when(AST.Error)
+    def visit(self, node):
+        return lambda: None
@@ -0,0 +1,407 @@
+import ast
+import keyword
+import AST
+from visit import *
+from DefUse import DefUse, shares, elementwise_tree
+
+# nazwy, których zmienne języka M nie mogą zasłonić w wygenerowanym kodzie
+reserved = set(keyword.kwlist) | {"print", "range", "str", "float"}
+
+prelude = """
+from Runtime import arith_mat as _rt_arith_mat, matrix_funcs as _rt_matrix_funcs, store_range as _rt_store_range
+from Runtime import matrix_literal as _rt_matrix_literal, transpose as _rt_transpose, store_item as _rt_store_item
+from Runtime import show as _rt_show, for_range as _rt_for_range
+from Runtime import store_row as _rt_store_row, load_range as _rt_load_range, load_block as _rt_load_block
+from Runtime import share as _rt_share, arith_fused as _rt_arith_fused, store_block as _rt_store_block
+from Runtime import update as _rt_update, update_item as _rt_update_item, scalars as _rt_scalars
+from Runtime import call_builtin as _rt_call_builtin
+from Exceptions import ReturnValueException as _rt_Return
+_rt_inf = float('inf')
+"""
+
+binary_ops = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult, '/': ast.Div}
+update_ops = {'+=': ast.Add, '-=': ast.Sub, '*=': ast.Mult, '/=': ast.Div}
+compare_ops = {'<': ast.Lt, '>': ast.Gt, '<=': ast.LtE, '>=': ast.GtE, '==': ast.Eq, '!=': ast.NotEq}
+
+
+def mangle(name):
+    if name.startswith("_") or name in reserved:
+        return "_u" + name
+
+    return name
+
+
+def load(name):
+    return ast.Name(id=name, ctx=ast.Load())
+
+
+def store(name):
+    return ast.Name(id=name, ctx=ast.Store())
+
+
+def call(name, *args):
+    return ast.Call(func=load(name), args=list(args), keywords=[])
+
+
+def execute(module, filename="<m>"):
+    exec(compile(module, filename, "exec"), {"__name__": "__m__"})
+
+
+# Generator kodu tłumaczy sprawdzone AST języka M na moduł Pythona (ast.Module):
+# cały program trafia do funkcji `_rt_main`, więc zmienne skalarne są szybkimi
+# zmiennymi lokalnymi, ForStmt staje się `for ... in range`, a WhileStmt `while`.
+# Semantyka (także pomijanie unarnego minusa) jest taka jak w Interpreterze.
+class CodeGenerator(object):
+    def __init__(self):
+        self.scopes = [{}]
+        self.blocks = []    # czy w bloku { ... } wystąpił `return`
+        self.pending = []   # przypisania użyte jako wyrażenia, wyciągnięte przed instrukcję
+        self.literals = []  # przypisania macierzy literałów na początku _rt_main
+        self.temps = 0
+        self.shadows = 0
+        self.def_use = None
+
+    def generate(self, tree):
+        self.def_use = DefUse(tree)
+        main = ast.parse("def _rt_main():\n    pass").body[0]
+        body = self.statements(tree)
+        main.body = self.literals + body
+
+        module = ast.parse(prelude)
+        module.body.append(main)
+        module.body.append(ast.Expr(value=call("_rt_main")))
+
+        return ast.fix_missing_locations(module)
+
+    def lookup(self, name):
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+
+        return None
+
+    def resolve(self, name):
+        python_name = self.lookup(name)
+
+        if python_name is None:
+            python_name = self.scopes[-1][name] = mangle(name)
+
+        return python_name
+
+    def temp(self):
+        self.temps += 1
+        return f"_rt_t{self.temps}"
+
+    def statements(self, node):
+        if node is None:
+            return [ast.Pass()]
+
+        pending, self.pending = self.pending, []
+        body = self.visit(node)
+        body = self.pending + body
+        self.pending = pending
+
+        return body or [ast.Pass()]
+
+    def scoped(self, node):
+        self.scopes.append({})
+        body = self.statements(node)
+        self.scopes.pop()
+        return body
+
+    @on('node')
+    def visit(self, node):
+        pass
+
+    @when(AST.MultipleStmts)
+    def visit(self, node):
+        body = []
+
+        for stmt in node.stmts:
+            if stmt is not None:
+                body.extend(self.statements(stmt))
+
+        return body
+
+    @when(AST.ControlStmt)
+    def visit(self, node):
+        return [ast.Continue() if node.control_stmt == "continue" else ast.Break()]
+
+    # `return` kończy najbliższy blok { ... } - tak jak ReturnValueException w Interpreterze
+    @when(AST.StatementsSet)
+    def visit(self, node):
+        self.blocks.append(False)
+        body = self.scoped(node.stmts)
+
+        if self.blocks.pop():
+            handler = ast.ExceptHandler(type=load("_rt_Return"), name=None, body=[ast.Pass()])
+            body = [ast.Try(body=body, handlers=[handler], orelse=[], finalbody=[])]
+
+        return body
+
+    @when(AST.SpecificStmt)
+    def visit(self, node):
+        return self.visit(node.specific_stmt)
+
+    @when(AST.ReturnExpression)
+    def visit(self, node):
+        self.blocks[-1] = True
+        return [ast.Expr(value=self.visit(node.expression)), ast.Raise(exc=load("_rt_Return"), cause=None)]
+
+    @when(AST.IfElseStmt)
+    def visit(self, node):
+        test = self.visit(node.rel_expr)
+        return [ast.If(test=test, body=self.scoped(node.if_stmt), orelse=self.scoped(node.else_stmt))]
+
+    @when(AST.IfStmt)
+    def visit(self, node):
+        test = self.visit(node.rel_expr)
+        return [ast.If(test=test, body=self.scoped(node.if_stmt), orelse=[])]
+
+    @when(AST.WhileStmt)
+    def visit(self, node):
+        self.scopes.append({})
+        test = self.visit(node.rel_expr)
+        body = self.statements(node.while_stmt)
+        self.scopes.pop()
+
+        return [ast.While(test=test, body=body, orelse=[])]
+
+    # M przechodzi przez begin..end włącznie, o ile begin < end
+    @when(AST.ForStmt)
+    def visit(self, node):
+        begin = self.visit(node.range_begin)
+        end = self.visit(node.range_end)
+
+        if all(isinstance(bound, ast.Constant) and type(bound.value) is int for bound in (begin, end)):
+            stop = ast.Constant(value=end.value + 1 if begin.value < end.value else begin.value)
+            values = call("range", begin, stop)
+        else:
+            values = call("_rt_for_range", begin, end)
+
+        # zmienna iterująca przesłaniająca widoczną zmienną dostaje własną nazwę
+        name = node.iter_variable
+
+        if self.lookup(name) is not None:
+            self.shadows += 1
+            python_name = f"_rt_s{self.shadows}_{name}"
+        else:
+            python_name = mangle(name)
+
+        self.scopes.append({name: python_name})
+        body = self.statements(node.for_stmt)
+        self.scopes.pop()
+
+        return [ast.For(target=store(python_name), iter=values, body=body, orelse=[])]
+
+    # literały są wypisywane wprost, pozostałe wartości przez `show` (macierze NumPy jak listy)
+    @when(AST.PrintStmt)
+    def visit(self, node):
+        values = [value if isinstance(value, ast.Constant) else call("_rt_show", value)
+                  for value in self.visit(node.print_stmt)]
+        return [ast.Expr(value=call("print", *values))]
+
+    # print(a, b) wypisuje to samo co f"{a} {b}" w Interpreterze
+    @when(AST.PrintRecursive)
+    def visit(self, node):
+        return self.visit(node.print_rec) + [self.visit(node.print_expr)]
+
+    @when(AST.PrintExpr)
+    def visit(self, node):
+        return [self.visit(node.print_expr)]
+
+    @when(AST.Value)
+    def visit(self, node):
+        return self.visit(node.val)
+
+    @when(AST.ArithNumExpr)
+    def visit(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+
+        if node.op != '/':
+            return ast.BinOp(left=left, op=binary_ops[node.op](), right=right)
+
+        # dzielenie przez zero daje `inf`, jak `operations['/']`
+        if isinstance(right, ast.Constant):
+            if right.value != 0:
+                return ast.BinOp(left=left, op=ast.Div(), right=right)
+
+            return load("_rt_inf")
+
+        if isinstance(right, ast.Name):
+            divisor, test = right, right
+        else:
+            name = self.temp()
+            divisor, test = load(name), ast.NamedExpr(target=store(name), value=right)
+
+        return ast.IfExp(test=ast.Compare(left=test, ops=[ast.NotEq()], comparators=[ast.Constant(value=0)]),
+                         body=ast.BinOp(left=left, op=ast.Div(), right=divisor),
+                         orelse=load("_rt_inf"))
+
+    @when(AST.Variable)
+    def visit(self, node):
+        python_name = self.lookup(node.name)
+        return load(python_name if python_name is not None else mangle(node.name))
+
+    @when(AST.IntNum)
+    def visit(self, node):
+        return ast.Constant(value=node.value)
+
+    @when(AST.AssignExpression)
+    def visit(self, node):
+        self.pending.extend(self.visit(node.expression))
+        return ast.Constant(value=None)
+
+    @when(AST.RelationExpression)
+    def visit(self, node):
+        return self.visit(node.expression)
+
+    @when(AST.MatrixExpression)
+    def visit(self, node):
+        expression = node.expression
+
+        if isinstance(expression, AST.DoubleRef):
+            index = ast.Tuple(elts=[self.visit(expression.row), self.visit(expression.col)], ctx=ast.Load())
+            return ast.Subscript(value=self.visit(AST.Variable(expression.id, node.lineno)), slice=index, ctx=ast.Load())
+
+        if isinstance(expression, AST.SingleRef):
+            return ast.Subscript(value=self.visit(AST.Variable(expression.id, node.lineno)),
+                                 slice=self.visit(expression.row), ctx=ast.Load())
+
+        # wycinki A[a:b] i bloki A[a:b, c:d] są widokami macierzy
+        if isinstance(expression, (AST.TabRefBoth, AST.TabRefEnd, AST.TabRefBegin)):
+            return call("_rt_load_range", self.visit(AST.Variable(expression.id, node.lineno)),
+                        *self.bounds(getattr(expression, "begin", None), getattr(expression, "end", None)))
+
+        if isinstance(expression, AST.BlockRef):
+            return call("_rt_load_block", self.visit(AST.Variable(expression.id, node.lineno)),
+                        *self.bounds(expression.row_begin, expression.row_end, expression.col_begin, expression.col_end))
+
+        return self.visit(expression)
+
+    # granice wycinka; pominięta granica to None
+    def bounds(self, *bounds):
+        return [ast.Constant(value=None) if bound is None else self.visit(bound) for bound in bounds]
+
+    @when(AST.UnaryExpression)
+    def visit(self, node):
+        return self.visit(node.expression)
+
+    @when(AST.MatrixNode)
+    def visit(self, node):
+        # literał zawiera same stałe - macierz powstaje raz, przed programem, a każde wykonanie dostaje `share`
+        name = f"_rt_m{len(self.literals) + 1}"
+        self.literals.append(ast.Assign(targets=[store(name)], value=call("_rt_matrix_literal", self.visit(node.values))))
+        return call("_rt_share", load(name))
+
+    @when(AST.GeneralExpression)
+    def visit(self, node):
+        if node.special_op == "'":
+            return call("_rt_transpose", self.visit(node.expression))
+
+        return self.visit(node.expression)
+
+    @when(AST.ArithMatExpr)
+    def visit(self, node):
+        tree, leaves = elementwise_tree(node)
+
+        # kilka działań pod rząd - jedno przejście przez elementy, bez macierzy pośrednich
+        if len(leaves) > 2:
+            operands = ast.List(elts=[self.visit(leaf) for leaf in leaves], ctx=ast.Load())
+            return call("_rt_arith_fused", ast.Constant(value=tree), operands)
+
+        return call("_rt_arith_mat", ast.Constant(value=node.div_op), self.visit(node.left), self.visit(node.right))
+
+    @when(AST.DeclareExpr)
+    def visit(self, node):
+        value = self.visit(node.right)
+
+        if isinstance(node.left, AST.Variable):
+            if shares(node.right):
+                value = call("_rt_share", value)
+
+            return [ast.Assign(targets=[store(self.resolve(node.left.name))], value=value)]
+
+        # zapis zwraca macierz do dalszego trzymania w zmiennej (widok NumPy zastępuje kopia)
+        ref = node.left.matrix_ref if isinstance(node.left, AST.MatrixRef) else node.left.tab_ref
+        name = self.resolve(ref.id)
+
+        if isinstance(ref, AST.DoubleRef):
+            stored = call("_rt_store_item", load(name), self.visit(ref.row), self.visit(ref.col), value)
+        elif isinstance(ref, AST.SingleRef):
+            stored = call("_rt_store_row", load(name), self.visit(ref.row), value)
+        elif isinstance(ref, AST.BlockRef):
+            stored = call("_rt_store_block", load(name), *self.bounds(ref.row_begin, ref.row_end, ref.col_begin, ref.col_end), value)
+        else:
+            stored = call("_rt_store_range", load(name),
+                          *self.bounds(getattr(ref, "begin", None), getattr(ref, "end", None)), value)
+
+        return [ast.Assign(targets=[store(name)], value=stored)]
+
+    # `x = x + v` zamiast `x += v`; macierz przechodzi przez `update` (w miejscu, jeśli nie dzieli danych)
+    @when(AST.UpdateExpr)
+    def visit(self, node):
+        op = ast.Constant(value=node.assign_op)
+
+        if not isinstance(node.left, AST.Variable):
+            ref = node.left.matrix_ref if isinstance(node.left, AST.MatrixRef) else node.left.tab_ref
+            name = self.resolve(ref.id)
+
+            if isinstance(ref, AST.DoubleRef):
+                indices = [self.visit(ref.row), self.visit(ref.col)]
+            elif isinstance(ref, AST.SingleRef):
+                indices = [self.visit(ref.row)]
+            elif isinstance(ref, AST.BlockRef):
+                indices = self.bounds(ref.row_begin, ref.row_end, ref.col_begin, ref.col_end)
+            else:
+                indices = self.bounds(getattr(ref, "begin", None), getattr(ref, "end", None), None)
+
+            stored = call("_rt_update_item", op, load(name), ast.List(elts=indices, ctx=ast.Load()), self.visit(node.right))
+            return [ast.Assign(targets=[store(name)], value=stored)]
+
+        name = self.resolve(node.left.name)
+        right = self.visit(node.right)
+        value = ast.BinOp(left=load(name), op=update_ops[node.assign_op](), right=right)
+
+        # zmienna, która może być macierzą, przechodzi przez `update`, chyba że właśnie jest liczbą
+        if not self.def_use.number(node.left.name):
+            scalar = ast.Compare(left=ast.Attribute(value=load(name), attr="__class__", ctx=ast.Load()),
+                                 ops=[ast.In()], comparators=[load("_rt_scalars")])
+            value = ast.IfExp(test=scalar, body=value, orelse=call("_rt_update", op, load(name), right))
+
+        return [ast.Assign(targets=[store(name)], value=value)]
+
+    @when(AST.CompExpr)
+    def visit(self, node):
+        return ast.Compare(left=self.visit(node.left), ops=[compare_ops[node.comp_op]()],
+                           comparators=[self.visit(node.right)])
+
+    @when(AST.MatrixRowsNode)
+    def visit(self, node):
+        return ast.List(elts=[self.visit(row) for row in node.rows], ctx=ast.Load())
+
+    @when(AST.NumLineNode)
+    def visit(self, node):
+        return ast.List(elts=[ast.Constant(value=value) for value in node.num_line], ctx=ast.Load())
+
+    @when(AST.MatrixFuncs)
+    def visit(self, node):
+        args = [self.visit(arg) for arg in (node.rows, node.cols) if arg is not None]
+        return call("_rt_matrix_funcs", ast.Constant(value=node.fun), *args)
+
+    @when(AST.Builtin)
+    def visit(self, node):
+        return call("_rt_call_builtin", ast.Constant(value=node.fun), *[self.visit(arg) for arg in node.args])
+
+    @when(AST.FloatNum)
+    def visit(self, node):
+        return ast.Constant(value=node.value)
+
+    @when(AST.String)
+    def visit(self, node):
+        return ast.Constant(value=node.value[1:-1])
+
+    @when(AST.Error)
+    def visit(self, node):
+        return ast.Constant(value=None)
@@ -0,0 +1,187 @@
+import AST
+
+# odwołania do elementów, wierszy, wycinków i bloków macierzy
+refs = (AST.DoubleRef, AST.SingleRef, AST.TabRefBoth, AST.TabRefEnd, AST.TabRefBegin, AST.BlockRef)
+
+# odwołania, których wartość jest widokiem macierzy
+views = (AST.SingleRef, AST.TabRefBoth, AST.TabRefEnd, AST.TabRefBegin, AST.BlockRef)
+
+
+# nazwa zmiennej, do której (albo do której elementu) przypisuje cel DeclareExpr / UpdateExpr
+def target_name(target):
+    if isinstance(target, AST.Variable):
+        return target.name
+
+    return (target.matrix_ref if isinstance(target, AST.MatrixRef) else target.tab_ref).id
+
+
+# zdejmuje węzły, których wynik może współdzielić dane z argumentem: Value, nawiasy,
+# transpozycję (w NumPy to widok) i unarny minus
+def unwrap(node):
+    while isinstance(node, (AST.Value, AST.GeneralExpression, AST.UnaryExpression)):
+        node = node.val if isinstance(node, AST.Value) else node.expression
+
+    return node
+
+
+# węzły, których wartość jest zawsze liczbą (po zdjęciu opakowań przez `unwrap`)
+numbers = (AST.IntNum, AST.FloatNum, AST.ArithNumExpr)
+
+
+# czy przypisanie wartości <node> do zmiennej ma dać nowy nagłówek (`share`): wartość to macierz
+# innej zmiennej albo wiersz macierzy (w NumPy zwykły widok, który trzeba zarejestrować)
+def shares(node):
+    source = unwrap(node)
+    return isinstance(source, AST.Variable) or isinstance(source, AST.MatrixExpression) and isinstance(source.expression, AST.SingleRef)
+
+
+# drzewo działań element po elemencie o korzeniu <node> dla `arith_fused`: krotki
+# (op, lewy, prawy), w liściach indeksy węzłów z <leaves> liczonych osobno (nawiasy są pomijane)
+def elementwise_tree(node):
+    leaves = []
+
+    def build(node):
+        while isinstance(node, AST.GeneralExpression) and node.special_op == "()":
+            node = node.expression
+
+        if isinstance(node, AST.ArithMatExpr):
+            return node.div_op, build(node.left), build(node.right)
+
+        leaves.append(node)
+        return len(leaves) - 1
+
+    return build(node), leaves
+
+
+# Informacja definicja-użycie dla całego programu. Nazwy połączone
+# przypisaniem `B = A` albo widokiem (`r = A[1]`, `S = A[0:2]`) tworzą klasę
+# aliasów - przypisanie do elementu jednej z nich może zmienić wartość
+# wszystkich. Dane są kopiowane przy zapisie, więc klasy są zachowawcze.
+class DefUse(object):
+    def __init__(self, tree):
+        self.aliases = {}
+        self.stored = set() # klasy aliasów z przypisaniami do elementów
+        self.names = set()
+        self.not_numbers = set()    # zmienne, do których bywa przypisywane coś innego niż liczba
+        self.sources = {}           # zmienna -> przypisywane jej wartości (None - nieznana, z `op=` albo pętli `for`)
+
+        for node in AST.walk(tree):
+            if isinstance(node, AST.Variable):
+                self.names.add(node.name)
+            elif isinstance(node, refs):
+                self.names.add(node.id)
+            elif isinstance(node, AST.ForStmt):
+                self.names.add(node.iter_variable)
+                self.sources.setdefault(node.iter_variable, []).append(None)
+            elif isinstance(node, AST.UpdateExpr) and isinstance(node.left, AST.Variable):
+                self.sources.setdefault(node.left.name, []).append(None)
+            elif isinstance(node, AST.DeclareExpr):
+                source = unwrap(node.right)
+
+                if isinstance(node.left, AST.Variable):
+                    self.define(node.left.name, node.right)
+
+                if isinstance(source, AST.Variable):
+                    self.union(target_name(node.left), source.name)
+                elif isinstance(source, AST.MatrixExpression) and isinstance(source.expression, views):
+                    self.union(target_name(node.left), source.expression.id)
+
+        for node in AST.walk(tree):
+            if isinstance(node, (AST.DeclareExpr, AST.UpdateExpr)) and not isinstance(node.left, AST.Variable):
+                self.stored.add(self.find(target_name(node.left)))
+
+    def define(self, name, value):
+        self.sources.setdefault(name, []).append(value)
+
+        if not isinstance(unwrap(value), numbers):
+            self.not_numbers.add(name)
+
+    # nowa nazwa zmiennej tymczasowej, nieużywana w programie
+    def fresh(self, prefix):
+        number = 1
+
+        while f"{prefix}{number}" in self.names:
+            number += 1
+
+        self.names.add(f"{prefix}{number}")
+        return f"{prefix}{number}"
+
+    def find(self, name):
+        while self.aliases.get(name, name) != name:
+            name = self.aliases[name]
+
+        return name
+
+    def union(self, name1, name2):
+        root1, root2 = self.find(name1), self.find(name2)
+
+        if root1 != root2:
+            self.aliases[root1] = root2
+
+    def alias_class(self, name):
+        root = self.find(name)
+        return {other for other in self.names if self.find(other) == root} | {name}
+
+    # czy zmienna jest zawsze liczbą - `x op= v` nie musi wtedy sprawdzać, czy x jest macierzą
+    def number(self, name):
+        return name not in self.not_numbers
+
+    # wymiary wartości <node> znane przed wykonaniem: (wiersze, kolumny), (długość, None) dla wektora
+    # albo None - literał macierzy, zeros/ones/eye z literałami, transpozycja i zmienna przypisywana
+    # w programie tylko raz (przypisania do elementów, wierszy i bloków nie zmieniają wymiarów)
+    def shape(self, node, seen=frozenset()):
+        while isinstance(node, (AST.Value, AST.MatrixExpression)) or isinstance(node, AST.GeneralExpression) and node.special_op == "()":
+            node = node.val if isinstance(node, AST.Value) else node.expression
+
+        if isinstance(node, AST.GeneralExpression):
+            shape = self.shape(node.expression, seen)
+            return shape[::-1] if shape is not None and shape[1] is not None else None
+        elif isinstance(node, AST.MatrixNode) and isinstance(node.values, AST.MatrixRowsNode):
+            return len(node.values.rows), len(node.values.rows[0].num_line)
+        elif isinstance(node, AST.MatrixNode):
+            return len(node.values.num_line), None
+        elif isinstance(node, AST.MatrixFuncs):
+            sizes = [unwrap(size) for size in (node.rows, node.rows if node.cols is None else node.cols)]
+            return tuple(size.value for size in sizes) if all(isinstance(size, AST.IntNum) and size.value >= 0 for size in sizes) else None
+        elif isinstance(node, AST.Variable):
+            sources = self.sources.get(node.name, [])
+
+            if node.name in seen or len(sources) != 1 or sources[0] is None:
+                return None
+
+            return self.shape(sources[0], seen | {node.name})
+
+        return None
+
+    # czy wartość przypisana do <target> może być potem zmieniona w miejscu
+    def mutable(self, target):
+        return not isinstance(target, AST.Variable) or self.find(target.name) in self.stored
+
+    # nazwy, których wartość może się zmienić podczas wykonania <node>
+    def definitions(self, node):
+        names = set()
+
+        for child in AST.walk(node):
+            if isinstance(child, (AST.DeclareExpr, AST.UpdateExpr)):
+                if isinstance(child.left, AST.Variable):
+                    names.add(child.left.name)
+                else:
+                    names |= self.alias_class(target_name(child.left))
+            elif isinstance(child, AST.ForStmt):
+                names.add(child.iter_variable)
+
+        return names
+
+    # nazwy czytane przez wyrażenie <node>; None, gdy wyrażenie zawiera przypisanie
+    def uses(self, node):
+        names = set()
+
+        for child in AST.walk(node):
+            if isinstance(child, AST.AssignExpression):
+                return None
+            elif isinstance(child, AST.Variable):
+                names.add(child.name)
+            elif isinstance(child, refs):
+                names.add(child.id)
+
+        return names
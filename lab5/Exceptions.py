@@ -2,9 +2,7 @@ class ReturnValueException(Exception):
     pass
 
 
-class BreakException(Exception):
-    pass
-
-
-class ContinueException(Exception):
-    pass
\ No newline at end of file
+# sygnały zakończenia instrukcji - Interpreter zwraca je zamiast rzucać wyjątki powyżej
+BREAK = "break"
+CONTINUE = "continue"
+RETURN = "return"
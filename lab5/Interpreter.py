@@ -2,122 +2,147 @@ import AST
 from Memory import *
 from Exceptions import *
 from visit import *
+from Runtime import *
+from DefUse import elementwise_tree
 import sys
 
-operations = {
-    '+': lambda x, y: x + y,
-    '-': lambda x, y: x - y,
-    '/': lambda x, y: x / y if y != 0 else float('inf'),
-    '.+': lambda x, y: x + y,
-    '.-': lambda x, y: x - y,
-    './': lambda x, y: x / y if y != 0 else float('inf'),
-    '*': lambda x, y: x * y,
-}
 sys.setrecursionlimit(10000)
 
 
 class Interpreter(object):
     def __init__(self):
         self.memory_stack = MemoryStack(Memory("global_memory"))
+        self.literals = {}  # MatrixNode -> jego macierz, tworzona przy pierwszym wykonaniu
+        self.fused = {}     # ArithMatExpr -> drzewo działań element po elemencie i jego liście
+
+    # wykonuje <node> we własnej ramce; bloki bez nowych nazw (frame_size None) jej nie dostają
+    def scoped(self, name, frame_size, node):
+        if frame_size is None:
+            return self.visit(node)
+
+        self.memory_stack.push(Memory(name, frame_size))
+        signal = self.visit(node)
+        self.memory_stack.pop()
+        return signal
 
     @on('node')
     def visit(self, node):
         pass
 
+    # Instrukcje zwracają sygnał zakończenia: None przy zwykłym wykonaniu albo
+    # BREAK / CONTINUE / RETURN, który jest przekazywany w górę do najbliższej
+    # pętli lub bloku { ... } - bez rzucania wyjątków.
     @when(AST.MultipleStmts)
     def visit(self, node):
+        # tylko korzeń programu ma niezerowy rozmiar - to sloty ramki globalnej
+        if node.frame_size:
+            self.memory_stack.memory_stack[0].reserve(node.frame_size)
+
         for stmt in node.stmts:
-            self.visit(stmt)
+            signal = self.visit(stmt)
+
+            if signal:
+                return signal
 
     @when(AST.ControlStmt)
     def visit(self, node):
         if node.control_stmt == "continue":
-            raise ContinueException
+            return CONTINUE
         elif node.control_stmt == "break":
-            raise BreakException
+            return BREAK
 
     @when(AST.StatementsSet)
     def visit(self, node):
-        self.memory_stack.push(Memory("stmts_set"))
+        signal = self.scoped("stmts_set", node.frame_size, node.stmts)
 
-        try:
-            self.visit(node.stmts)
-        except ReturnValueException:
-            return
-        finally:
-            self.memory_stack.pop()
+        # `return` kończy tylko bieżący blok
+        if signal is not RETURN:
+            return signal
 
     @when(AST.SpecificStmt)
     def visit(self, node):
-        self.visit(node.specific_stmt)
+        return self.visit(node.specific_stmt)
 
     @when(AST.ReturnExpression)
     def visit(self, node):
         self.visit(node.expression)
-        raise ReturnValueException
+        return RETURN
 
     @when(AST.IfElseStmt)
     def visit(self, node):
         if self.visit(node.rel_expr):
-            try:
-                self.memory_stack.push(Memory("if_stmt"))
-                self.visit(node.if_stmt)
-            finally:
-                self.memory_stack.pop()
-        
+            return self.scoped("if_stmt", node.if_frame_size, node.if_stmt)
         else:
-            try:
-                self.memory_stack.push(Memory("else_stmt"))
-                self.visit(node.else_stmt)
-            finally:
-                self.memory_stack.pop()
+            return self.scoped("else_stmt", node.else_frame_size, node.else_stmt)
 
     @when(AST.IfStmt)
     def visit(self, node):
         if self.visit(node.rel_expr):
-            try:
-                self.memory_stack.push(Memory("if_stmt"))
-                self.visit(node.if_stmt)
-            finally:
-                self.memory_stack.pop()
+            return self.scoped("if_stmt", node.frame_size, node.if_stmt)
 
     # simplistic while loop interpretation
     @when(AST.WhileStmt)
     def visit(self, node):
-        self.memory_stack.push(Memory("while_stmt"))
+        if node.frame_size is not None:
+            self.memory_stack.push(Memory("while_stmt", node.frame_size))
+
+        signal = None
 
         while self.visit(node.rel_expr):
-            try:
-                self.visit(node.while_stmt)
-            except ContinueException:
-                pass
-            except BreakException:
+            signal = self.visit(node.while_stmt)
+
+            if signal is BREAK:
+                signal = None
+                break
+            elif signal is RETURN:
                 break
 
-        self.memory_stack.pop()
+        if node.frame_size is not None:
+            self.memory_stack.pop()
+
+        if signal is RETURN:
+            return signal
 
     @when(AST.ForStmt)
     def visit(self, node):
-        name = node.iter_variable
+        level, slot = node.address
         value = self.visit(node.range_begin)
         value_end = self.visit(node.range_end)
 
-        self.memory_stack.push(Memory("for_stmt"))
-        self.memory_stack.insert(name, value)
+        self.memory_stack.push(Memory("for_stmt", node.frame_size))
+        frame = self.memory_stack.frames[level]
+        frame[slot] = value
+        signal = None
+
+        # Szybka ścieżka: ciało nie przypisuje zmiennej iterującej, więc kolejne
+        # wartości begin..end (włącznie, gdy begin < end) daje natywny `range`.
+        if not node.assigns_iterator and type(value) is int and type(value_end) is int:
+            for value in range(value, value_end + 1 if value < value_end else value):
+                frame[slot] = value
+                signal = self.visit(node.for_stmt)
+
+                if signal is BREAK:
+                    signal = None
+                    break
+                elif signal is RETURN:
+                    break
+        else:
+            while value < value_end:
+                value = frame[slot]
+                signal = self.visit(node.for_stmt)
+                frame[slot] = value + 1
 
-        while value < value_end:
-            try:
-                value = self.memory_stack.get(name)
-                self.visit(node.for_stmt)
-            except ContinueException:
-                pass
-            except BreakException:
-                break
-            finally:
-                self.memory_stack.set(name, value + 1)
+                if signal is BREAK:
+                    signal = None
+                    break
+                elif signal is RETURN:
+                    break
 
         self.memory_stack.pop()
 
+        if signal is RETURN:
+            return signal
+
     @when(AST.PrintStmt)
     def visit(self, node):
         print(self.visit(node.print_stmt))
@@ -126,11 +151,11 @@ class Interpreter(object):
     def visit(self, node):
         text1 = self.visit(node.print_rec)
         text2 = self.visit(node.print_expr)
-        return f"{text1} {text2}"
+        return f"{text1} {show(text2)}"
 
     @when(AST.PrintExpr)
     def visit(self, node):
-        return str(self.visit(node.print_expr))
+        return show(self.visit(node.print_expr))
 
     @when(AST.Value)
     def visit(self, node):
@@ -146,7 +171,7 @@ class Interpreter(object):
 
     @when(AST.Variable)
     def visit(self, node):
-        return self.memory_stack.get(node.name)
+        return self.memory_stack.get_at(node.address)
 
     @when(AST.IntNum)
     def visit(self, node):
@@ -164,12 +189,16 @@ class Interpreter(object):
     def visit(self, node):
         val = self.visit(node.expression)
         if isinstance(node.expression, (AST.DoubleRef, AST.SingleRef)):
-            name = node.expression.id
-            matrix = self.memory_stack.get(name)
+            matrix = self.memory_stack.get_at(node.expression.address)
             if isinstance(node.expression, AST.DoubleRef):
-                return matrix[val[0]][val[1]]
+                return matrix[val[0], val[1]]
             else:
                 return matrix[val[0]]
+        # wycinki A[a:b] i bloki A[a:b, c:d] są widokami macierzy
+        if isinstance(node.expression, (AST.TabRefBoth, AST.TabRefEnd, AST.TabRefBegin)):
+            return load_range(self.memory_stack.get_at(node.expression.address), val[0], val[1])
+        if isinstance(node.expression, AST.BlockRef):
+            return load_block(self.memory_stack.get_at(node.expression.address), *val)
         return val
 
     @when(AST.UnaryExpression)
@@ -178,145 +207,108 @@ class Interpreter(object):
 
     @when(AST.MatrixNode)
     def visit(self, node):
-        return self.visit(node.values)
+        matrix = self.literals.get(node)
+
+        if matrix is None:
+            matrix = self.literals[node] = matrix_literal(self.visit(node.values))
+
+        return share(matrix)
 
     @when(AST.GeneralExpression)
     def visit(self, node):
-        return self.visit(node.expression)
+        value = self.visit(node.expression)
+
+        if node.special_op == "'":
+            return transpose(value)
+
+        return value
 
     @when(AST.ArithMatExpr)
     def visit(self, node):
-        # 1. Rekurencyjne odwiedzenie lewego i prawego poddrzewa, aby uzyskać wartości operandów
-        left = self.visit(node.left)
-        right = self.visit(node.right)
-        
-        # 2. Pobranie operatora i odpowiadającej mu funkcji z mapowania (np. dodawanie, odejmowanie)
-        op = node.div_op
-        func = operations[op]
+        if node not in self.fused:
+            self.fused[node] = elementwise_tree(node)
 
-        # --- LOGIKA BROADCASTINGU (Dopasowanie wymiarów) ---
-        # Jeśli lewa strona jest wektorem, a prawa macierzą - rozszerzamy lewą stronę,
-        # by pasowała strukturą do macierzy (kopiowanie wartości wierszy).
-        if not all(isinstance(el, list) for el in left) and all(isinstance(el, list) for el in right):
-            left = [[l] * len(right[0]) for l in left]
-            
-        # Analogicznie: jeśli prawa strona jest "płaska", a lewa to macierz - rozszerzamy prawą.
-        elif not all(isinstance(el, list) for el in right) and all(isinstance(el, list) for el in left):
-            right = [[r] * len(left[0]) for r in right]
-
-        if op == '.*':
-            # Jeśli oba operandy są wektorami (listami 1D) - wykonaj mnożenie element po elemencie
-            if not all(isinstance(el, list) for el in left) and not all(isinstance(el, list) for el in right):
-                return [l * r for l, r in zip(left, right)]
-
-            # Klasyczne mnożenie macierzy (Matrix Multiplication) dla struktur 2D
-            # Inicjalizacja macierzy wynikowej zerami o wymiarach [wiersze_lewej x kolumny_prawej]
-            result = [[0. for _ in range(len(right[0]))] for _ in range(len(left))]
-
-            # Potrójna pętla - standardowy algorytm mnożenia macierzy: C[i][j] = Σ (A[i][k] * B[k][j])
-            for i in range(len(left)): # po wierszach lewej macierzy
-                for j in range(len(right[0])): # po kolumnach prawej macierzy
-                    suma = 0
-                    for k in range(len(left[0])): # iloczyn skalarny wiersza i kolumny
-                        suma += left[i][k] * right[k][j]
-                    result[i][j] = suma
-
-            return result
-            
-        else:
-            # Dla wektorów: wykonaj operację element po elemencie
-            if not all(isinstance(el, list) for el in left) and not all(isinstance(el, list) for el in right):
-                return [func(l, r) for l, r in zip(left, right)]
+        # Kilka działań pod rząd (np. A .+ B .- C) jest liczonych razem, bez macierzy pośrednich
+        tree, leaves = self.fused[node]
 
-            # Dla macierzy: wykonaj operację element po elemencie w strukturze 2D
-            return [[func(l, r) for l, r in zip(lrow, rrow)] for lrow, rrow in zip(left, right)]
+        if len(leaves) > 2:
+            return arith_fused(tree, [self.visit(leaf) for leaf in leaves])
+
+        # Rekurencyjne odwiedzenie lewego i prawego poddrzewa, aby uzyskać wartości operandów
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        return arith_mat(node.div_op, left, right)
 
     @when(AST.DeclareExpr)
     def visit(self, node):
         #  Przypisanie do zwykłej zmiennej (np. x = 5)
         if isinstance(node.left, AST.Variable):
-            name = node.left.name
             value = self.visit(node.right) # Obliczamy wartość wyrażenia po prawej stronie
 
-            # Sprawdzamy, czy zmienna już istnieje w pamięci
-            if self.memory_stack.get(name) is None:
-                self.memory_stack.insert(name, value) # Nowa zmienna -> dodaj do stosu
-            else:
-                self.memory_stack.set(name, value)    # Istniejąca zmienna -> aktualizuj wartość
+            # `B = A` - B dostaje własny nagłówek na danych A (kopiowanych przy pierwszym zapisie)
+            if node.shares:
+                value = share(value)
+
+            # Resolver już zdecydował, czy to nowa zmienna, czy istniejąca - od razu zapisujemy do slotu
+            self.memory_stack.set_at(node.left.address, value)
                 
         # Przypisanie do elementu macierzy lub jej wycinka (np. A[1,2] = 5 lub A[1:5] = 0) 
         else:
-            # Zakładamy, że node.left to operacja indeksowania, która zwraca nazwę i listę indeksów
-            name, indices = self.visit(node.left)
-            matrix = self.memory_stack.get(name) # Pobieramy macierz z pamięci
+            # Zakładamy, że node.left to operacja indeksowania, która zwraca adres i listę indeksów
+            address, indices = self.visit(node.left)
+            matrix = self.memory_stack.get_at(address) # Pobieramy macierz z pamięci
             value = self.visit(node.right)       # Obliczamy wartość do przypisania
 
-            # Logika dla 3 elementów w 'indices' sugeruje konstrukcję [początek, koniec, flaga_zakresu]
-            if len(indices) == 3:
-                begin = 0 if indices[0] is None else indices[0]
-                end = len(matrix) if indices[1] is None else indices[1]
+            # Blok A[a:b, c:d] - 4 granice
+            if len(indices) == 4:
+                matrix = store_block(matrix, *indices, value)
 
+            # Logika dla 3 elementów w 'indices' sugeruje konstrukcję [początek, koniec, flaga_zakresu]
+            elif len(indices) == 3:
                 # Wypełniamy wybrany zakres wierszy nową wartością
-                for i in range(begin, end):
-                    matrix[i] = value
+                matrix = store_range(matrix, indices[0], indices[1], value)
                     
             # PRZYPISANIE DO KONKRETNEJ KOMÓRKI 2D - np. A[i, j] = value
             elif len(indices) == 2:
-                matrix[indices[0]][indices[1]] = value
+                matrix = store_item(matrix, indices[0], indices[1], value)
                 
             # PRZYPISANIE DO KONKRETNEGO WIERSZA / ELEMENTU 1D - np. A[i] = value
             else:
-                matrix[indices[0]] = value
+                matrix = store_row(matrix, indices[0], value)
 
-            # Zaktualizuj zmodyfikowaną macierz w pamięci
-            self.memory_stack.set(name, matrix)
+            # Zaktualizuj zmodyfikowaną macierz w pamięci (zapis do widoku NumPy daje nową tablicę)
+            self.memory_stack.set_at(address, matrix)
 
     @when(AST.UpdateExpr)
     def visit(self, node):
-        name = node.left.name
         value = self.visit(node.right)
-        op = node.assign_op
-        old_value = self.memory_stack.get(name)
-
-        if op == '+=':
-            self.memory_stack.set(name, old_value + value)
-        elif op == '-=':
-            self.memory_stack.set(name, old_value - value)
-        elif op == '*=':
-            self.memory_stack.set(name, old_value * value)
-        elif op == '/=':
-            self.memory_stack.set(name, old_value / value)
+
+        # x += v; macierz jest zmieniana w miejscu, jeśli nie dzieli danych z inną zmienną
+        if isinstance(node.left, AST.Variable):
+            old_value = self.memory_stack.get_at(node.left.address)
+            self.memory_stack.set_at(node.left.address, update(node.assign_op, old_value, value))
+            return
+
+        # A[i, j] += v, A[i] += v, A[a:b] += v, A[a:b, c:d] += v
+        address, indices = self.visit(node.left)
+        matrix = self.memory_stack.get_at(address)
+        self.memory_stack.set_at(address, update_item(node.assign_op, matrix, indices, value))
 
     @when(AST.CompExpr)
     def visit(self, node):
         left = self.visit(node.left)
         right = self.visit(node.right)
-        op = node.comp_op
-
-        if op == '<':
-            return left < right
-        elif op == '>':
-            return left > right
-        elif op == '<=':
-            return left <= right
-        elif op == '>=':
-            return left >= right
-        elif op == '==':
-            return left == right
-        elif op == '!=':
-            return left != right
+        return comparisons[node.comp_op](left, right)
 
     @when(AST.MatrixRef)
     def visit(self, node):
-        name = node.matrix_ref.id
         indices = self.visit(node.matrix_ref)
-        return name, indices
+        return node.matrix_ref.address, indices
 
     @when(AST.TabRef)
     def visit(self, node):
-        name = node.tab_ref.id
         indices = self.visit(node.tab_ref)
-        return name, indices
+        return node.tab_ref.address, indices
 
     @when(AST.DoubleRef)
     def visit(self, node):
@@ -345,6 +337,10 @@ class Interpreter(object):
         begin = self.visit(node.begin)
         return [begin, None, None]
 
+    @when(AST.BlockRef)
+    def visit(self, node):
+        return [self.visit(node.row_begin), self.visit(node.row_end), self.visit(node.col_begin), self.visit(node.col_end)]
+
     @when(AST.MatrixRowsNode)
     def visit(self, node):
         return [self.visit(row) for row in node.rows]
@@ -355,18 +351,11 @@ class Interpreter(object):
 
     @when(AST.MatrixFuncs)
     def visit(self, node):
-        generators = {
-            "zeros": lambda n: [[0. for _ in range(n)] for _ in range(n)],
-            "ones":  lambda n: [[1. for _ in range(n)] for _ in range(n)],
-            "eye":   lambda n: [[1. if i == j else 0. for j in range(n)] for i in range(n)]
-        }
+        return matrix_funcs(node.fun, *(self.visit(arg) for arg in (node.rows, node.cols) if arg is not None))
 
-        matrix_func = generators.get(node.fun)
-
-        if matrix_func:
-            return matrix_func(node.value)
-        
-        raise ValueError(f"Nieznana funkcja macierzowa: {node.fun}")
+    @when(AST.Builtin)
+    def visit(self, node):
+        return call_builtin(node.fun, *(self.visit(arg) for arg in node.args))
 
     @when(AST.FloatNum)
     def visit(self, node):
@@ -0,0 +1,237 @@
+from array import array
+from itertools import chain, repeat
+from sys import getrefcount
+
+
+# typ elementów: 'q' - liczby całkowite (literały), 'd' - rzeczywiste
+def dtype_of(values):
+    return 'd' if any(isinstance(value, float) for value in values) else 'q'
+
+
+# Macierz (albo wektor 1-D, gdy cols is None) w buforze array: element [i, j]
+# leży pod indeksem start + i * row_stride + j * col_stride (element wektora
+# [i] - pod start + i * row_stride). Indeksowanie jak w zagnieżdżonych listach:
+# m[i] to wiersz albo element wektora, m[i, j] to element.
+#
+# Transpozycja, wiersz, zakres wierszy i blok są widokami (view=True) - dzielą
+# bufor z macierzą, z której powstały, i różnią się tylko start i krokami.
+# Widok dostaje własny, ciągły bufor przy pierwszym zapisie do niego, a macierz,
+# której bufor trzyma jeszcze jakiś widok albo inny nagłówek (`B = A`, literał
+# wykonany ponownie) - przy zapisie do niej. Macierz, która nie jest widokiem,
+# ma zawsze ciągły bufor wiersz po wierszu.
+# Krok 0 powtarza ten sam element - tak skalar, wektor czy wiersz jest rozszerzany
+# do wymiarów drugiego argumentu działania bez kopiowania (`broadcast`).
+# Zapis liczby rzeczywistej do macierzy liczb całkowitych zmienia jej typ na 'd'.
+# Liczba całkowita zapisana do macierzy typu 'd' staje się rzeczywista
+# (`D[0, 0] = 42` na macierzy z zeros wypisuje 42.0) - tak jak w NumPy.
+class Matrix(object):
+    __slots__ = ("data", "rows", "cols", "start", "row_stride", "col_stride", "view", "__weakref__")
+
+    def __init__(self, data, rows, cols=None, start=0, row_stride=None, col_stride=1, view=False):
+        self.data = data
+        self.rows = rows
+        self.cols = cols
+        self.start = start
+        self.row_stride = (1 if cols is None else cols) if row_stride is None else row_stride
+        self.col_stride = col_stride
+        self.view = view
+
+    @classmethod
+    def from_list(cls, value):
+        if value and all(isinstance(row, list) for row in value):
+            flat = list(chain.from_iterable(value))
+            return cls(array(dtype_of(flat), flat), len(value), len(value[0]))
+
+        return cls(array(dtype_of(value), value), len(value))
+
+    # skalar jako widok rows x cols - jeden element z krokami 0
+    @classmethod
+    def repeated(cls, value, rows, cols=None):
+        return cls(array(dtype_of([value]), [value]), rows, cols, 0, 0, 0, True)
+
+    @property
+    def dtype(self):
+        return self.data.typecode
+
+    # wartość, którą jest każdy element (macierz z krokami 0, np. zeros(n)); None dla pozostałych
+    def constant(self):
+        return self.data[self.start] if self.cols is not None and self.row_stride == self.col_stride == 0 else None
+
+    def position(self, row, col):
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"Indeks [{row}, {col}] poza macierzą {self.rows}x{self.cols}")
+
+        return self.start + row * self.row_stride + col * self.col_stride
+
+    # wartości wektora, wiersza albo kolumny jako array - wycinek bufora z krokiem
+    def line(self, start, length, stride):
+        if length <= 0:
+            return array(self.data.typecode)
+        elif stride == 0:
+            return self.data[start:start + 1] * length
+
+        return self.data[start:start + (length - 1) * stride + 1:stride]
+
+    def row_values(self, row):
+        return self.line(self.start + row * self.row_stride, self.cols, self.col_stride)
+
+    def column_values(self, col):
+        return self.line(self.start + col * self.col_stride, self.rows, self.row_stride)
+
+    # wszystkie elementy wiersz po wierszu; macierz (nie widok) oddaje po prostu swój bufor
+    def flat(self):
+        if not self.view:
+            return self.data
+        elif self.cols is None:
+            return self.line(self.start, self.rows, self.row_stride)
+
+        data = array(self.data.typecode)
+
+        for row in range(self.rows):
+            data.extend(self.row_values(row))
+
+        return data
+
+    # wartości kolejnych wierszy (wektor 1-D to jeden wiersz); wiersz z krokiem 0 to powtórzenie jednej wartości
+    def lines(self):
+        if self.cols is None:
+            return [self.values(self.start, self.rows, self.row_stride)]
+
+        return (self.values(self.start + row * self.row_stride, self.cols, self.col_stride) for row in range(self.rows))
+
+    def values(self, start, length, stride):
+        return repeat(self.data[start], length) if stride == 0 and length > 0 else self.line(start, length, stride)
+
+    # bufor trzymają tylko atrybuty `data` - poza tym i argumentem getrefcount są to widoki i inne nagłówki
+    def owns_data(self):
+        return not self.view and getrefcount(self.data) <= 2
+
+    # widok staje się zwykłą macierzą z własnym, ciągłym buforem
+    def materialize(self):
+        if self.view:
+            self.data = self.flat()
+            self.start, self.col_stride, self.view = 0, 1, False
+            self.row_stride = 1 if self.cols is None else self.cols
+
+    def upcast(self, value):
+        if self.data.typecode == 'q' and (isinstance(value, float) or getattr(value, "dtype", 'q') == 'd'):
+            self.data = array('d', self.data)
+
+    # wiersze begin..end-1 (jak wycinek listy) - widok
+    def rows_view(self, begin, end):
+        rows = range(self.rows)[begin:end]
+        return Matrix(self.data, len(rows), self.cols, self.start + rows.start * self.row_stride,
+                      self.row_stride, self.col_stride, True)
+
+    def block(self, row_begin, row_end, col_begin, col_end):
+        rows, cols = range(self.rows)[row_begin:row_end], range(self.cols)[col_begin:col_end]
+        start = self.start + rows.start * self.row_stride + cols.start * self.col_stride
+        return Matrix(self.data, len(rows), len(cols), start, self.row_stride, self.col_stride, True)
+
+    # widok o wymiarach rows x cols (cols None - wektor), w którym kierunki długości 1
+    # dostają krok 0; wektor 1-D obok macierzy jest kolumną
+    def broadcast(self, rows, cols):
+        if self.rows == rows and self.cols == cols:
+            return self
+
+        row_stride = self.row_stride if self.rows == rows else 0
+
+        if self.cols is None:
+            return Matrix(self.data, rows, cols, self.start, row_stride, 0, True)
+
+        return Matrix(self.data, rows, cols, self.start, row_stride, self.col_stride if self.cols == cols else 0, True)
+
+    # `B = A` - nowy nagłówek na tym samym buforze
+    def shared(self):
+        return Matrix(self.data, self.rows, self.cols, self.start, self.row_stride, self.col_stride, self.view)
+
+    def transposed(self):
+        return Matrix(self.data, self.cols, self.rows, self.start, self.col_stride, self.row_stride, True)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            return self.data[self.position(*index)]
+        elif self.cols is None:
+            if not 0 <= index < self.rows:
+                raise IndexError(f"Indeks [{index}] poza wektorem długości {self.rows}")
+
+            return self.data[self.start + index * self.row_stride]
+
+        if not 0 <= index < self.rows:
+            raise IndexError(f"Indeks [{index}] poza macierzą {self.rows}x{self.cols}")
+
+        return Matrix(self.data, self.cols, None, self.start + index * self.row_stride, self.col_stride, 1, True)
+
+    # m[i] = wektor albo liczba (wypełnia cały wiersz), m[i, j] = liczba
+    def __setitem__(self, index, value):
+        self.materialize()
+        self.upcast(value)
+
+        if not self.owns_data():
+            self.data = array(self.data.typecode, self.data)
+
+        if isinstance(index, tuple):
+            self.data[self.position(*index)] = value
+        elif self.cols is None:
+            self.data[index] = value
+        else:
+            start = self.position(index, 0) if self.cols else index * self.cols
+
+            if isinstance(value, Matrix):
+                if value.rows != self.cols or value.cols is not None:
+                    raise ValueError(f"Nie można zapisać wektora długości {value.rows} w wierszu długości {self.cols}")
+
+                self.data[start:start + self.cols] = array(self.data.typecode, value.flat())
+            else:
+                self.data[start:start + self.cols] = array(self.data.typecode, [value]) * self.cols
+
+    # wiersze <rows> i kolumny <cols> (range; None dla wektora) = value: liczba wypełnia blok, wektor
+    # trafia do każdego wiersza (jak `m[i] = wektor`), macierz tych samych wymiarów jest kopiowana.
+    # Wartości bloku powstają przed zapisem, więc value może być widokiem tej macierzy
+    def store_block(self, rows, cols, value):
+        width = 1 if cols is None else len(cols)
+        values = self.block_values(value, len(rows), width, cols is None)
+
+        self.materialize()
+        self.upcast(value)
+
+        if not self.owns_data():
+            self.data = array(self.data.typecode, self.data)
+
+        if self.data.typecode != values.typecode:
+            values = array(self.data.typecode, values)
+
+        # pełne wiersze leżą w buforze jeden za drugim - cały blok to jeden wycinek
+        if cols is None or len(cols) == self.cols:
+            start = rows.start * width
+            self.data[start:start + len(rows) * width] = values
+            return
+
+        for k, row in enumerate(rows):
+            start = row * self.cols + cols.start
+            self.data[start:start + width] = values[k * width:(k + 1) * width]
+
+    def block_values(self, value, rows, cols, vector):
+        if not isinstance(value, Matrix):
+            return array(dtype_of([value]), [value]) * (rows * cols)
+        elif (value.rows, value.cols) == ((rows, None) if vector else (rows, cols)):
+            return array(value.dtype, value.flat())
+        elif not vector and value.cols is None and value.rows == cols:
+            return array(value.dtype, value.flat()) * rows
+
+        size = f"{value.rows}" if value.cols is None else f"{value.rows}x{value.cols}"
+        raise ValueError(f"Nie można zapisać macierzy {size} w bloku {rows if vector else f'{rows}x{cols}'}")
+
+    def tolist(self):
+        if self.cols is None:
+            return self.flat().tolist()
+
+        return [self.row_values(row).tolist() for row in range(self.rows)]
+
+    def __str__(self):
+        return str(self.tolist())
+
+    __repr__ = __str__
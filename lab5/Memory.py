@@ -1,10 +1,11 @@
 class Memory:
-    def __init__(self, name): # memory name
+    def __init__(self, name, size = 0): # memory name and number of slots
         self.name = name
         self.memory = {}
+        self.slots = [None] * size
 
     def has_key(self, name): # variable name
-        return name in self.memory.keys()
+        return name in self.memory
 
     def get(self, name): # gets from memory current value of variable <name>
         return self.memory.get(name)
@@ -12,10 +13,15 @@ class Memory:
     def put(self, name, value): # puts into memory current value of variable <name>
         self.memory[name] = value
 
+    def reserve(self, size): # makes sure the memory has at least <size> slots
+        if len(self.slots) < size:
+            self.slots.extend([None] * (size - len(self.slots)))
 
-class MemoryStack:                                                                       
+
+class MemoryStack:
     def __init__(self, memory = None): # initialize memory stack with memory <memory>
         self.memory_stack = [memory] if memory is not None else []
+        self.frames = [memory.slots] if memory is not None else [] # slots of every memory, indexed by level
 
     def get(self, name): # gets from memory stack current value of variable <name>
         for i in range(len(self.memory_stack) - 1, -1, -1):
@@ -30,8 +36,18 @@ class MemoryStack:
             if self.memory_stack[i].has_key(name):
                 self.memory_stack[i].put(name, value)
 
+    def get_at(self, address): # gets value from slot <address> = (level, slot) resolved by Resolver
+        level, slot = address
+        return self.frames[level][slot]
+
+    def set_at(self, address, value): # sets slot <address> = (level, slot) to value <value>
+        level, slot = address
+        self.frames[level][slot] = value
+
     def push(self, memory): # pushes memory <memory> onto the stack
         self.memory_stack.append(memory)
+        self.frames.append(memory.slots)
 
     def pop(self): # pops the top memory from the stack
-        self.memory_stack.pop()
\ No newline at end of file
+        self.memory_stack.pop()
+        self.frames.pop()
@@ -0,0 +1,378 @@
+import numpy
+import weakref
+from Builtins import reducers, constant_reducers, total, kernels, apply, safe_pow
+
+# Implementacja operacji macierzowych z Runtime na tablicach NumPy. Wyniki
+# (także typy elementów: int dla literałów, float dla eye/zeros/ones i `./`)
+# są takie same jak dla Matrix, więc wypisywane wartości się zgadzają.
+
+# zeros i ones to widok jednej liczby (kroki 0, tylko do odczytu) - zapis trafia do kopii, jak zapis do widoku
+generators = {
+    "zeros": lambda rows, cols: numpy.broadcast_to(0., (rows, cols)),
+    "ones":  lambda rows, cols: numpy.broadcast_to(1., (rows, cols)),
+    "eye":   lambda rows, cols: numpy.eye(rows, cols),
+}
+
+
+def matrix(value):
+    return numpy.array(value)
+
+
+def matrix_funcs(fun, rows, cols):
+    return generators[fun](rows, cols)
+
+
+# dzielenie przez zero daje `inf`, jak `operations['./']`
+def divide(left, right):
+    zero = right == 0
+    return numpy.where(zero, numpy.inf, left / numpy.where(zero, 1, right))
+
+
+elementwise = {
+    '.+': numpy.add,
+    '.-': numpy.subtract,
+    './': divide,
+}
+
+
+def arith_mat(op, left, right):
+    # mnożenie macierzy - wektor obok macierzy jest kolumną powtórzoną tyle razy, ile kolumn ma macierz
+    if op == '.*' and 2 in (numpy.ndim(left), numpy.ndim(right)) and 0 not in (numpy.ndim(left), numpy.ndim(right)):
+        if left.ndim == 1:
+            left = numpy.broadcast_to(left[:, None], (left.shape[0], right.shape[1]))
+        elif right.ndim == 1:
+            right = numpy.broadcast_to(right[:, None], (right.shape[0], left.shape[1]))
+
+        return left @ right
+
+    # wektor obok macierzy jest kolumną: jego i-ty element dotyczy i-tego wiersza;
+    # skalary, wiersze 1xN i kolumny Nx1 NumPy rozszerza sam, bez kopiowania
+    if numpy.ndim(left) == 1 and numpy.ndim(right) == 2:
+        left = left[:, None]
+    elif numpy.ndim(right) == 1 and numpy.ndim(left) == 2:
+        right = right[:, None]
+
+    if op == '.*':
+        return left * right
+
+    return elementwise[op](left, right)
+
+
+# A op= value: wynik zapisywany do A (albo jej kopii, jeśli A jest widokiem lub ma widoki),
+# gdy nie zmienia wymiarów ani typu elementów
+def update_mat(op, matrix, value):
+    if op == '.*' and 2 in (matrix.ndim, numpy.ndim(value)) and numpy.ndim(value) > 0:
+        return arith_mat(op, matrix, value)
+
+    if numpy.ndim(value) == 1 and matrix.ndim == 2:
+        value = value[:, None]
+
+    dtype = numpy.result_type(matrix, value, 1. if op == './' else 0)
+
+    if dtype != matrix.dtype or numpy.broadcast_shapes(matrix.shape, numpy.shape(value)) != matrix.shape:
+        return arith_mat(op, matrix, value)
+
+    matrix = writable(matrix)
+
+    # dzielenie przez zero daje `inf`, jak w `divide`
+    if op == './':
+        zero = numpy.equal(value, 0)
+        numpy.divide(matrix, value, out=matrix, where=~zero)
+        numpy.copyto(matrix, numpy.inf, where=zero)
+    else:
+        inplace[op](matrix, value, out=matrix)
+
+    return matrix
+
+
+inplace = {
+    '.+': numpy.add,
+    '.-': numpy.subtract,
+    '.*': numpy.multiply,
+}
+
+
+# id tablicy -> słabe referencje do widoków na jej dane (wycinków, bloków, transpozycji)
+views = {}
+
+
+def view(value):
+    base = value.base
+
+    if id(base) not in views:
+        views[id(base)] = []
+        weakref.finalize(base, views.pop, id(base), None)
+
+    refs = views[id(base)]
+    refs[:] = [ref for ref in refs if ref() is not None]
+    refs.append(weakref.ref(value))
+    return value
+
+
+def share(value):
+    return view(value.view()) if isinstance(value, numpy.ndarray) else value
+
+
+def transpose(value):
+    return view(value.T)
+
+
+def load_range(matrix, begin, end):
+    return view(matrix[begin:end])
+
+
+def load_block(matrix, row_begin, row_end, col_begin, col_end):
+    return view(matrix[row_begin:row_end, col_begin:col_end])
+
+
+# Zapis do widoku (także `B = A`) trafia do jego kopii, a zapis do tablicy, na
+# którą są jeszcze widoki - do kopii tablicy, tak jak w Matrix. Widok widoku ma tę samą `base`.
+def writable(matrix):
+    if matrix.base is not None:
+        return matrix.copy()
+
+    refs = views.get(id(matrix))
+
+    if refs is not None:
+        if any(ref() is not None for ref in refs):
+            return matrix.copy()
+
+        del views[id(matrix)]
+
+    return matrix
+
+
+# tablica intów przycięłaby ułamki - jak Matrix, zapis liczby rzeczywistej zmienia typ tablicy na float
+def writable_for(matrix, value):
+    if matrix.dtype.kind == 'i' and numpy.result_type(value).kind == 'f':
+        return matrix.astype(float)
+
+    return writable(matrix)
+
+
+def store_item(matrix, row, col, value):
+    matrix = writable_for(matrix, value)
+    matrix[row, col] = value
+    return matrix
+
+
+def store_row(matrix, row, value):
+    matrix = writable_for(matrix, value)
+    matrix[row] = value
+    return matrix
+
+
+# jak Matrix.block_values: do bloku trafia liczba, macierz tych samych wymiarów albo (w bloku
+# macierzy) wektor długości wiersza powtórzony w każdym wierszu - bez innych rozszerzeń z NumPy
+def check_block(block, value):
+    if not isinstance(value, numpy.ndarray) or value.shape == block.shape:
+        return
+    elif block.ndim == 2 and value.ndim == 1 and value.shape[0] == block.shape[1]:
+        return
+
+    size, shape = "x".join(map(str, value.shape)), "x".join(map(str, block.shape))
+    raise ValueError(f"Nie można zapisać macierzy {size} w bloku {shape}")
+
+
+def store_range(matrix, begin, end, value):
+    check_block(matrix[begin:end], value)
+    matrix = writable_for(matrix, value)
+    matrix[begin:end] = value
+    return matrix
+
+
+def store_block(matrix, row_begin, row_end, col_begin, col_end, value):
+    check_block(matrix[row_begin:row_end, col_begin:col_end], value)
+    matrix = writable_for(matrix, value)
+    matrix[row_begin:row_end, col_begin:col_end] = value
+    return matrix
+
+
+def show(value):
+    return str(value.tolist()) if isinstance(value, numpy.ndarray) else str(value)
+
+
+# sum/min/max/mean/norm jak w Builtins.reduce: minimum i maksimum liczy NumPy, sumy - te same
+# `reducers` na wartościach z `tolist` (fsum nie zależy od kolejności, więc wynik jest ten sam co do bitu)
+def reduce(fun, value, axis=None):
+    if not isinstance(value, numpy.ndarray):
+        raise ValueError(f"Argument funkcji `{fun}` musi być macierzą albo wektorem")
+
+    floats = value.dtype.kind == 'f'
+
+    if axis is None:
+        if value.size and fun in ("min", "max"):
+            return getattr(value, fun)().item()
+        elif value.size and not any(value.strides):
+            return constant_reducers[fun](value.flat[0].item(), value.size)
+
+        result = reducers[fun](value.ravel().tolist(), value.size, floats)
+
+        if result is None:
+            raise ValueError(f"Nie można policzyć `{fun}` dla pustej macierzy")
+
+        return result
+
+    if value.ndim == 1:
+        raise ValueError(f"Funkcja `{fun}` z osią wymaga macierzy, nie wektora")
+    elif axis not in (0, 1):
+        raise ValueError(f"Oś funkcji `{fun}` musi być równa 0 (kolumny) albo 1 (wiersze): {axis}")
+
+    lines = value.T.tolist() if axis == 0 else value.tolist()
+    results = [reducers[fun](line, value.shape[axis], floats) for line in lines]
+
+    if None in results:
+        raise ValueError(f"Nie można policzyć `{fun}` dla pustej macierzy")
+
+    return numpy.array(results, dtype=float if floats or fun in ("mean", "norm") else int)
+
+
+def dot(left, right):
+    if not isinstance(left, numpy.ndarray) or not isinstance(right, numpy.ndarray):
+        raise ValueError("Argumenty funkcji `dot` muszą być macierzami albo wektorami")
+    elif left.shape != right.shape:
+        raise ValueError("Nie można policzyć `dot` dla wartości o różnych wymiarach")
+
+    return total(numpy.multiply(left, right).ravel().tolist(), 'f' in (left.dtype.kind, right.dtype.kind))
+
+
+# sqrt/exp/log/abs jak w Builtins.map_elements. sqrt i abs liczy NumPy (sqrt jest dokładnie
+# zaokrąglany, więc wyniki są te same), exp i log - te same funkcje z math na wartościach z `tolist`,
+# bo wersje SIMD z NumPy potrafią się różnić od nich na ostatnim bicie
+def map_elements(fun, value):
+    if not isinstance(value, numpy.ndarray):
+        return abs(value) if fun == "abs" else kernels[fun][1](value)
+    elif fun == "abs":
+        return numpy.abs(value)
+    elif fun == "sqrt":
+        with numpy.errstate(invalid='ignore'):
+            return numpy.sqrt(value)
+
+    return numpy.array(apply(fun, value.ravel().tolist()), dtype=float).reshape(value.shape)
+
+
+# float_power daje te same wyniki co math.pow (numpy.power(x, 2.) liczy x * x)
+def power(x, y):
+    if not isinstance(x, numpy.ndarray) and not isinstance(y, numpy.ndarray):
+        return safe_pow(x, y)
+    elif isinstance(x, numpy.ndarray) and isinstance(y, numpy.ndarray) and x.shape != y.shape:
+        raise ValueError("Nie można policzyć `pow` dla macierzy o różnych wymiarach")
+
+    with numpy.errstate(all='ignore'):
+        return numpy.float_power(x, y)
+
+
+# rozkład LU jak Builtins.lu - te same działania na każdym elemencie, tylko całymi wierszami
+# (numpy.linalg liczy w innej kolejności, więc wyniki różniłyby się od Matrix na ostatnich bitach)
+def lu(value):
+    a = numpy.array(value, dtype=float)
+    n = a.shape[0]
+    perm, sign, singular = numpy.arange(n), 1., False
+
+    for k in range(n):
+        pivot = k + int(numpy.argmax(numpy.abs(a[k:, k])))
+
+        if a[pivot, k] == 0:
+            singular = True
+            continue
+
+        if pivot != k:
+            a[[k, pivot]] = a[[pivot, k]]
+            perm[[k, pivot]] = perm[[pivot, k]]
+            sign = -sign
+
+        a[k + 1:, k] /= a[k, k]
+        a[k + 1:, k + 1:] -= a[k + 1:, k, None] * a[k, k + 1:]
+
+    return a, perm, sign, singular
+
+
+# id tablicy -> (słaba referencja, kopia, rozkład), jak w Builtins.factorization
+factorizations = {}
+
+
+def factorization(value):
+    cached = factorizations.get(id(value))
+
+    if cached is not None and cached[0]() is value and numpy.array_equal(cached[1], value):
+        return cached[2]
+
+    if cached is None:
+        weakref.finalize(value, factorizations.pop, id(value), None)
+
+    factors = lu(value)
+    factorizations[id(value)] = (weakref.ref(value), value.copy(), factors)
+    return factors
+
+
+def square(fun, value):
+    if not isinstance(value, numpy.ndarray) or value.ndim != 2 or value.shape[0] != value.shape[1]:
+        raise ValueError(f"Funkcja `{fun}` wymaga macierzy kwadratowej")
+
+    return value
+
+
+def substitute(factors, rhs):
+    a, perm, sign, singular = factors
+
+    if singular:
+        raise ValueError("Macierz układu jest osobliwa")
+
+    b = numpy.array(rhs, dtype=float)[perm]
+    n = a.shape[0]
+
+    for k in range(n):
+        b[k + 1:] -= a[k + 1:, k, None] * b[k]
+
+    for k in reversed(range(n)):
+        b[k] /= a[k, k]
+        b[:k] -= a[:k, k, None] * b[k]
+
+    return b
+
+
+def solve(matrix, rhs):
+    if not isinstance(rhs, numpy.ndarray):
+        raise ValueError("Prawa strona układu w funkcji `solve` musi być macierzą albo wektorem")
+
+    matrix = square("solve", matrix)
+
+    if rhs.shape[0] != matrix.shape[0]:
+        raise ValueError(f"Prawa strona układu ma {rhs.shape[0]} wierszy, a macierz {matrix.shape[0]}")
+
+    return substitute(factorization(matrix), rhs[:, None] if rhs.ndim == 1 else rhs).reshape(rhs.shape)
+
+
+def inverse(matrix):
+    matrix = square("inv", matrix)
+    return substitute(factorization(matrix), numpy.eye(matrix.shape[0]))
+
+
+def determinant(matrix):
+    a, perm, sign, singular = factorization(square("det", matrix))
+
+    if singular:
+        return 0.
+
+    for pivot in a.diagonal().tolist():
+        sign *= pivot
+
+    return sign
+
+
+builtins = {
+    "sum": lambda value, axis=None: reduce("sum", value, axis),
+    "min": lambda value, axis=None: reduce("min", value, axis),
+    "max": lambda value, axis=None: reduce("max", value, axis),
+    "mean": lambda value, axis=None: reduce("mean", value, axis),
+    "norm": lambda value, axis=None: reduce("norm", value, axis),
+    "dot": dot,
+    "sqrt": lambda value: map_elements("sqrt", value),
+    "exp": lambda value: map_elements("exp", value),
+    "log": lambda value: map_elements("log", value),
+    "abs": lambda value: map_elements("abs", value),
+    "pow": power,
+    "solve": solve,
+    "inv": inverse,
+    "det": determinant,
+}
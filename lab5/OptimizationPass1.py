@@ -0,0 +1,307 @@
+import AST
+from visit import *
+from Runtime import operations, comparisons
+from DefUse import target_name
+
+literals = (AST.IntNum, AST.FloatNum, AST.String)
+
+# dłuższe napisy (np. "*" * 100000) zostają liczone w czasie wykonania
+max_folded_string = 4096
+
+
+# liczba przypisań do każdej nazwy w całym programie (razem ze zmiennymi pętli `for`)
+def assignments(tree):
+    counts = {}
+
+    for node in AST.walk(tree):
+        if isinstance(node, (AST.DeclareExpr, AST.UpdateExpr)):
+            name = target_name(node.left)
+        elif isinstance(node, AST.ForStmt):
+            name = node.iter_variable
+        else:
+            continue
+
+        counts[name] = counts.get(name, 0) + 1
+
+    return counts
+
+
+# zdejmuje z wyrażenia opakowania Value i nawiasy; zwraca literał albo None
+def literal(node):
+    while isinstance(node, (AST.Value, AST.GeneralExpression)):
+        node = node.val if isinstance(node, AST.Value) else node.expression
+
+    return node if isinstance(node, literals) else None
+
+
+# wartość literału w Pythonie - napis bez cudzysłowów, tak jak zwraca go Interpreter
+def value_of(node):
+    return node.value[1:-1] if isinstance(node, AST.String) else node.value
+
+
+def make_literal(value, lineno):
+    if isinstance(value, str):
+        return AST.String(f'"{value}"', lineno)
+    elif isinstance(value, float):
+        return AST.FloatNum(value, lineno)
+
+    # wynik porównania (bool) też jest przechowywany w IntNum - print wypisze True/False
+    return AST.IntNum(value, lineno)
+
+
+# Przebieg optymalizujący AST po TypeCheckerze: zwija stałe podwyrażenia
+# ArithNumExpr, CompExpr i UnaryExpression w literały (licząc je tymi samymi
+# funkcjami z Runtime co silniki) oraz wstawia wartość zmiennych przypisanych
+# w programie dokładnie raz, stałą, na najwyższym poziomie - w ich późniejsze
+# użycia. Każdy `visit` zwraca węzeł, który ma zastąpić odwiedzony.
+class OptimizationPass1(object):
+    def __init__(self):
+        self.counts = {}
+        self.constants = {}
+        self.nesting = 0    # > 0 wewnątrz bloków, pętli i gałęzi `if`
+        self.folded = 0
+        self.propagated = 0
+
+    def optimize(self, ast):
+        self.counts = assignments(ast)
+        return self.visit(ast)
+
+    def nested(self, node):
+        self.nesting += 1
+        node = self.visit(node)
+        self.nesting -= 1
+        return node
+
+    def fold(self, func, left, right, lineno):
+        try:
+            value = func(value_of(left), value_of(right))
+        except (TypeError, ValueError, OverflowError, MemoryError):
+            return None
+
+        if isinstance(value, str) and len(value) > max_folded_string:
+            return None
+
+        self.folded += 1
+        return make_literal(value, lineno)
+
+    @on('node')
+    def visit(self, node):
+        return node
+
+    @when(AST.MultipleStmts)
+    def visit(self, node):
+        node.stmts = [self.visit(stmt) for stmt in node.stmts]
+        return node
+
+    @when(AST.StatementsSet)
+    def visit(self, node):
+        node.stmts = self.nested(node.stmts)
+        return node
+
+    @when(AST.SpecificStmt)
+    def visit(self, node):
+        node.specific_stmt = self.visit(node.specific_stmt)
+        return node
+
+    @when(AST.ReturnExpression)
+    def visit(self, node):
+        node.expression = self.visit(node.expression)
+        return node
+
+    @when(AST.IfElseStmt)
+    def visit(self, node):
+        node.rel_expr = self.visit(node.rel_expr)
+        node.if_stmt = self.nested(node.if_stmt)
+        node.else_stmt = self.nested(node.else_stmt)
+        return node
+
+    @when(AST.IfStmt)
+    def visit(self, node):
+        node.rel_expr = self.visit(node.rel_expr)
+        node.if_stmt = self.nested(node.if_stmt)
+        return node
+
+    # warunek pętli jest liczony wielokrotnie, więc też jest zagnieżdżony
+    @when(AST.WhileStmt)
+    def visit(self, node):
+        node.rel_expr = self.nested(node.rel_expr)
+        node.while_stmt = self.nested(node.while_stmt)
+        return node
+
+    @when(AST.ForStmt)
+    def visit(self, node):
+        node.range_begin = self.visit(node.range_begin)
+        node.range_end = self.visit(node.range_end)
+        node.for_stmt = self.nested(node.for_stmt)
+        return node
+
+    @when(AST.PrintStmt)
+    def visit(self, node):
+        node.print_stmt = self.visit(node.print_stmt)
+        return node
+
+    @when(AST.PrintRecursive)
+    def visit(self, node):
+        node.print_rec = self.visit(node.print_rec)
+        node.print_expr = self.visit(node.print_expr)
+        return node
+
+    @when(AST.PrintExpr)
+    def visit(self, node):
+        node.print_expr = self.visit(node.print_expr)
+        return node
+
+    @when(AST.Value)
+    def visit(self, node):
+        node.val = self.visit(node.val)
+        return node
+
+    @when(AST.ArithNumExpr)
+    def visit(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        left, right = literal(node.left), literal(node.right)
+
+        if left is not None and right is not None:
+            return self.fold(operations[node.op], left, right, node.lineno) or node
+
+        return node
+
+    @when(AST.CompExpr)
+    def visit(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        left, right = literal(node.left), literal(node.right)
+
+        if left is not None and right is not None:
+            return self.fold(comparisons[node.comp_op], left, right, node.lineno) or node
+
+        return node
+
+    # silniki nie stosują unarnego minusa, więc nad literałem węzeł jest po prostu pomijany
+    @when(AST.UnaryExpression)
+    def visit(self, node):
+        node.expression = self.visit(node.expression)
+        value = literal(node.expression)
+
+        if value is not None:
+            self.folded += 1
+            return value
+
+        return node
+
+    @when(AST.Variable)
+    def visit(self, node):
+        value = self.constants.get(node.name)
+
+        if value is None:
+            return node
+
+        self.propagated += 1
+        return make_literal(value, node.lineno)
+
+    @when(AST.AssignExpression)
+    def visit(self, node):
+        node.expression = self.visit(node.expression)
+        return node
+
+    @when(AST.RelationExpression)
+    def visit(self, node):
+        node.expression = self.visit(node.expression)
+        return node
+
+    @when(AST.MatrixExpression)
+    def visit(self, node):
+        node.expression = self.visit(node.expression)
+        return node
+
+    @when(AST.GeneralExpression)
+    def visit(self, node):
+        node.expression = self.visit(node.expression)
+        return node
+
+    @when(AST.ArithMatExpr)
+    def visit(self, node):
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        return node
+
+    # cel przypisania nie jest odwiedzany - tylko indeksy w nim
+    @when(AST.DeclareExpr)
+    def visit(self, node):
+        node.right = self.visit(node.right)
+
+        if isinstance(node.left, AST.Variable):
+            value = literal(node.right)
+
+            if value is not None and self.nesting == 0 and self.counts.get(node.left.name) == 1:
+                self.constants[node.left.name] = value_of(value)
+        else:
+            node.left = self.visit(node.left)
+
+        return node
+
+    @when(AST.UpdateExpr)
+    def visit(self, node):
+        node.right = self.visit(node.right)
+
+        if not isinstance(node.left, AST.Variable):
+            node.left = self.visit(node.left)
+
+        return node
+
+    @when(AST.MatrixFuncs)
+    def visit(self, node):
+        node.rows = self.visit(node.rows)
+        node.cols = self.visit(node.cols)
+        return node
+
+    @when(AST.Builtin)
+    def visit(self, node):
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    @when(AST.MatrixRef)
+    def visit(self, node):
+        node.matrix_ref = self.visit(node.matrix_ref)
+        return node
+
+    @when(AST.TabRef)
+    def visit(self, node):
+        node.tab_ref = self.visit(node.tab_ref)
+        return node
+
+    @when(AST.DoubleRef)
+    def visit(self, node):
+        node.row = self.visit(node.row)
+        node.col = self.visit(node.col)
+        return node
+
+    @when(AST.SingleRef)
+    def visit(self, node):
+        node.row = self.visit(node.row)
+        return node
+
+    @when(AST.TabRefBoth)
+    def visit(self, node):
+        node.begin = self.visit(node.begin)
+        node.end = self.visit(node.end)
+        return node
+
+    @when(AST.TabRefEnd)
+    def visit(self, node):
+        node.end = self.visit(node.end)
+        return node
+
+    @when(AST.TabRefBegin)
+    def visit(self, node):
+        node.begin = self.visit(node.begin)
+        return node
+
+    @when(AST.BlockRef)
+    def visit(self, node):
+        node.row_begin = self.visit(node.row_begin)
+        node.row_end = self.visit(node.row_end)
+        node.col_begin = self.visit(node.col_begin)
+        node.col_end = self.visit(node.col_end)
+        return node
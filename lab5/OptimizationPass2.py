@@ -0,0 +1,244 @@
+import AST
+from copy import deepcopy
+from visit import *
+from DefUse import DefUse, unwrap, numbers, refs
+
+# wyrażenia, które warto policzyć raz przed pętlą
+candidates = (AST.ArithNumExpr, AST.ArithMatExpr, AST.CompExpr, AST.MatrixFuncs, AST.Builtin)
+
+# funkcje wbudowane, które dla argumentów przepuszczonych przez TypeChecker nie zgłaszają błędu
+# (solve, inv, pusta macierz w min/max/mean, zła oś, różne wymiary w dot/pow - zgłaszają)
+safe_builtins = ("sum", "norm", "sqrt", "exp", "log", "abs")
+
+# węzły, których wynik może współdzielić dane z wartością dziecka (transpozycja w NumPy to widok)
+wrappers = (AST.Value, AST.GeneralExpression, AST.UnaryExpression, AST.MatrixExpression)
+
+
+# czy indeks <index> (literał) leży w zakresie 0..size-1
+def inside(index, size):
+    index = unwrap(index)
+    return isinstance(index, AST.IntNum) and 0 <= index.value < size
+
+
+# czy <node> może przerwać iterację pętli: return zawsze, break/continue - poza pętlą zagnieżdżoną
+def exits(node, nested=False):
+    if isinstance(node, list):
+        return any(exits(item, nested) for item in node)
+    elif not isinstance(node, AST.Node):
+        return False
+    elif isinstance(node, AST.ReturnExpression):
+        return True
+    elif isinstance(node, AST.ControlStmt):
+        return not nested
+
+    nested = nested or isinstance(node, (AST.WhileStmt, AST.ForStmt))
+    return any(exits(value, nested) for value in vars(node).values())
+
+
+# Przebieg przenoszący niezmienniki pętli: w ciele (i warunku) WhileStmt oraz
+# ciele ForStmt szuka wyrażeń, których żaden argument nie jest przypisywany w
+# pętli, i zastępuje je zmienną tymczasową przypisaną tuż przed pętlą.
+# Przenoszone są tylko wyrażenia, których wszystkie argumenty są na pewno
+# przypisane przed pętlą, a wartość zapisana do zmiennej nie jest potem
+# zmieniana w miejscu (przez przypisanie do elementu macierzy).
+# Wyrażenie policzone przed pętlą nie może zgłosić błędu, którego bez
+# optymalizacji by nie było: przenoszone są tylko wyrażenia wykonywane w każdej
+# iteracji (nie z gałęzi `if`, ciał pętli zagnieżdżonych ani instrukcji po
+# break/continue/return), a pętla, która może się nie wykonać ani razu, trafia
+# razem ze zmiennymi tymczasowymi do `if` z jej warunkiem. Wyrażenie, które może
+# zgłosić błąd (`unsafe`), jest przenoszone tylko przed pierwszą instrukcją
+# iteracji z widocznym skutkiem - inaczej błąd wyprzedziłby np. jej `print`.
+class OptimizationPass2(object):
+    def __init__(self):
+        self.def_use = None
+        self.defined = set()    # nazwy na pewno przypisane w bieżącym miejscu programu
+        self.pending = []       # przypisania zmiennych tymczasowych do wstawienia przed pętlą
+        self.guard = None       # warunek, bez którego pętla nie wykona się ani razu (None - wykona się)
+        self.exited = False     # czy w ciele pętli była już instrukcja, która może przerwać iterację
+        self.started = False    # czy w ciele pętli była już instrukcja z widocznym skutkiem (albo błędem)
+        self.hoisted = 0
+
+    def optimize(self, ast):
+        self.def_use = DefUse(ast)
+        return self.visit(ast)
+
+    # wykonuje <node> z kopią zbioru `defined` - przypisania w gałęzi czy pętli nie są pewne
+    def branch(self, node):
+        defined = set(self.defined)
+        node = self.visit(node)
+        self.defined = defined
+        return node
+
+    # czy wyrażenie może zgłosić błąd: odwołanie do elementu poza macierzą, działanie na macierzach
+    # niezgodnych wymiarów, zeros/ones/eye z ujemnym rozmiarem, funkcja spoza `safe_builtins` - chyba
+    # że z wymiarów znanych przed wykonaniem (DefUse.shape) wiadomo, że go nie będzie
+    def unsafe(self, node):
+        return any(not self.safe(child) for child in AST.walk(node))
+
+    def safe(self, node):
+        if isinstance(node, AST.Builtin):
+            return node.fun in safe_builtins and len(node.args) == 1
+        elif isinstance(node, AST.MatrixFuncs):
+            return self.def_use.shape(node) is not None
+        elif isinstance(node, AST.DoubleRef):
+            shape = self.def_use.shape(AST.Variable(node.id, node.lineno))
+            return shape is not None and shape[1] is not None and inside(node.row, shape[0]) and inside(node.col, shape[1])
+        elif isinstance(node, AST.SingleRef):
+            shape = self.def_use.shape(AST.Variable(node.id, node.lineno))
+            return shape is not None and inside(node.row, shape[0])
+        elif isinstance(node, refs):
+            return False
+        elif isinstance(node, AST.ArithMatExpr):
+            if self.number(node.left) or self.number(node.right):
+                return True
+
+            left, right = self.def_use.shape(node.left), self.def_use.shape(node.right)
+
+            if left is None or right is None:
+                return False
+            elif node.div_op == '.*' and None not in (left[1], right[1]):
+                return left[1] == right[0]
+
+            return left == right and (node.div_op != '.*' or left[1] is None)
+
+        return True
+
+    def number(self, node):
+        node = unwrap(node)
+        return isinstance(node, numbers) or isinstance(node, AST.Variable) and self.def_use.number(node.name)
+
+    # zastępuje niezmiennicze wyrażenia w <node>; shared=False, gdy wartość node trafia do zmiennej
+    # zmienianej w miejscu i nie może być jedną wartością dla wszystkich iteracji
+    def hoist(self, node, changed, shared=True):
+        if isinstance(node, list):
+            return [self.hoist(item, changed) for item in node]
+
+        if not isinstance(node, AST.Node) or self.exited:
+            return node
+
+        # z instrukcji warunkowych i pętli zagnieżdżonych - tylko warunek (i zakres), liczony za każdym razem
+        if isinstance(node, (AST.IfStmt, AST.IfElseStmt, AST.WhileStmt)):
+            node.rel_expr = self.hoist(node.rel_expr, changed)
+            self.exited = exits(node)
+            return node
+        elif isinstance(node, AST.ForStmt):
+            node.range_begin = self.hoist(node.range_begin, changed)
+            node.range_end = self.hoist(node.range_end, changed)
+            self.exited = exits(node)
+            return node
+        elif isinstance(node, AST.ControlStmt):
+            self.exited = True
+            return node
+        elif isinstance(node, AST.ReturnExpression):
+            node.expression = self.hoist(node.expression, changed)
+            self.exited = True
+            return node
+        elif isinstance(node, AST.SpecificStmt):
+            node.specific_stmt = stmt = self.hoist(node.specific_stmt, changed)
+
+            # przypisanie do zmiennej wartości, która nie może zgłosić błędu, nie ma widocznego skutku
+            if not (isinstance(stmt, AST.DeclareExpr) and isinstance(stmt.left, AST.Variable) and not self.unsafe(stmt.right)):
+                self.started = True
+
+            return node
+
+        if shared and isinstance(node, candidates) and not (self.started and self.unsafe(node)):
+            names = self.def_use.uses(node)
+
+            if names is not None and names.isdisjoint(changed) and names <= self.defined:
+                name = self.def_use.fresh("_licm")
+                self.def_use.define(name, node)
+                declare = AST.DeclareExpr('=', AST.Variable(name, node.lineno), node, node.lineno)
+                self.pending.append(AST.SpecificStmt(declare, node.lineno))
+                self.hoisted += 1
+                return AST.Variable(name, node.lineno)
+
+        if isinstance(node, AST.DeclareExpr):
+            node.right = self.hoist(node.right, changed, not self.def_use.mutable(node.left))
+            return node
+
+        for key, value in vars(node).items():
+            setattr(node, key, self.hoist(value, changed, shared or not isinstance(node, wrappers)))
+
+        return node
+
+    @on('node')
+    def visit(self, node):
+        return node
+
+    @when(AST.MultipleStmts)
+    def visit(self, node):
+        node.stmts = [self.visit(stmt) for stmt in node.stmts]
+        return node
+
+    @when(AST.StatementsSet)
+    def visit(self, node):
+        node.stmts = self.branch(node.stmts)
+        return node
+
+    # przypisania zmiennych tymczasowych trafiają przed instrukcję z pętlą; jeśli pętla może się
+    # nie wykonać - razem z nią do `if (warunek) { ... }` (zmienne z tego bloku nie są widoczne dalej)
+    @when(AST.SpecificStmt)
+    def visit(self, node):
+        pending, self.pending, self.guard = self.pending, [], None
+        node.specific_stmt = self.visit(node.specific_stmt)
+        hoisted, guard, self.pending, self.guard = self.pending, self.guard, pending, None
+
+        if not hoisted:
+            return node
+        elif guard is not None:
+            # bez StatementsSet - blok `{ }` zatrzymałby `return` z pętli
+            block = AST.MultipleStmts(hoisted + [node], node.lineno)
+            return AST.SpecificStmt(AST.IfStmt(guard, block, node.lineno), node.lineno)
+
+        for stmt in hoisted:
+            self.defined.add(stmt.specific_stmt.left.name)
+
+        return AST.MultipleStmts(hoisted + [node], node.lineno)
+
+    @when(AST.IfElseStmt)
+    def visit(self, node):
+        node.if_stmt = self.branch(node.if_stmt)
+        node.else_stmt = self.branch(node.else_stmt)
+        return node
+
+    @when(AST.IfStmt)
+    def visit(self, node):
+        node.if_stmt = self.branch(node.if_stmt)
+        return node
+
+    # pętle wewnętrzne są przetwarzane najpierw, więc ich zmienne tymczasowe
+    # mogą być dalej przeniesione przed pętlę zewnętrzną
+    @when(AST.WhileStmt)
+    def visit(self, node):
+        node.while_stmt = self.branch(node.while_stmt)
+        changed = self.def_use.definitions(node)
+        self.guard = deepcopy(node.rel_expr)
+        self.exited = self.started = False
+        node.rel_expr = self.hoist(node.rel_expr, changed)
+        node.while_stmt = self.hoist(node.while_stmt, changed)
+        return node
+
+    # pętla `for i = a:b` wykonuje się, gdy a < b - bez warunku, gdy wiadomo to już teraz
+    @when(AST.ForStmt)
+    def visit(self, node):
+        defined = set(self.defined)
+        self.defined.add(node.iter_variable)
+        node.for_stmt = self.visit(node.for_stmt)
+        self.defined = defined
+
+        begin, end = node.range_begin, node.range_end
+
+        if not (isinstance(begin, AST.IntNum) and isinstance(end, AST.IntNum) and begin.value < end.value):
+            self.guard = AST.CompExpr('<', deepcopy(begin), deepcopy(end), node.lineno)
+
+        self.exited = self.started = False
+        node.for_stmt = self.hoist(node.for_stmt, self.def_use.definitions(node))
+        return node
+
+    @when(AST.DeclareExpr)
+    def visit(self, node):
+        if isinstance(node.left, AST.Variable):
+            self.defined.add(node.left.name)
+
+        return node
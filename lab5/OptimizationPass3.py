@@ -0,0 +1,199 @@
+import AST
+from visit import *
+from DefUse import DefUse
+from OptimizationPass2 import wrappers
+
+# wyrażenia, których powtórzenia są zastępowane jedną zmienną tymczasową
+candidates = (AST.ArithNumExpr, AST.ArithMatExpr)
+
+
+# instrukcje bez rozgałęzień i bez przypisań zagnieżdżonych w wyrażeniach
+def straight(stmt, def_use):
+    if isinstance(stmt, AST.SpecificStmt):
+        stmt = stmt.specific_stmt
+    elif not isinstance(stmt, AST.ReturnExpression):
+        return False
+
+    if not isinstance(stmt, (AST.DeclareExpr, AST.UpdateExpr, AST.PrintStmt, AST.ReturnExpression)):
+        return False
+
+    return def_use.uses(stmt.right if isinstance(stmt, (AST.DeclareExpr, AST.UpdateExpr)) else stmt) is not None
+
+
+# Przebieg eliminujący wspólne podwyrażenia (numerowanie wartości): w każdym
+# ciągu instrukcji bez rozgałęzień wewnątrz MultipleStmts drzewa ArithNumExpr
+# i ArithMatExpr dostają klucz zależny od operatorów, literałów i wersji
+# zmiennych. Przypisanie (DeclareExpr, UpdateExpr, także do elementu macierzy
+# z całą klasą aliasów) zwiększa wersję zmiennej, więc wyrażenie liczone
+# ponownie po zmianie argumentu ma inny klucz. Wyrażenie o powtórzonym kluczu
+# jest liczone raz - do zmiennej tymczasowej przed instrukcją, w której
+# wystąpiło pierwszy raz.
+class OptimizationPass3(object):
+    def __init__(self):
+        self.def_use = None
+        self.versions = {}
+        self.temps = {}     # zmienna tymczasowa -> klucz jej wyrażenia
+        self.seen = {}      # klucz -> (instrukcja, rodzic, atrybut, węzeł) pierwszego wystąpienia
+        self.available = {} # klucz -> zmienna tymczasowa
+        self.inserted = {}  # instrukcja -> przypisania zmiennych tymczasowych przed nią
+        self.eliminated = 0
+
+    def optimize(self, ast):
+        self.def_use = DefUse(ast)
+        return self.visit(ast)
+
+    def key(self, node, keys):
+        if isinstance(node, AST.Variable):
+            return self.temps.get(node.name) or ("var", node.name, self.versions.get(node.name, 0))
+        elif isinstance(node, (AST.IntNum, AST.FloatNum, AST.String)):
+            return (type(node.value), node.value)
+        elif isinstance(node, (AST.DoubleRef, AST.SingleRef)):
+            return ("ref", node.id, self.versions.get(node.id, 0)) + tuple(keys)
+        elif isinstance(node, (AST.Value, AST.MatrixExpression)) or getattr(node, "special_op", None) == "()":
+            return keys[0]
+        elif isinstance(node, AST.GeneralExpression):
+            return (node.special_op,) + tuple(keys)
+        elif isinstance(node, AST.UnaryExpression):
+            return (node.op,) + tuple(keys)
+        elif isinstance(node, AST.ArithNumExpr):
+            return (node.op,) + tuple(keys)
+        elif isinstance(node, AST.ArithMatExpr):
+            return (node.div_op,) + tuple(keys)
+        elif isinstance(node, AST.MatrixFuncs):
+            return (node.fun,) + tuple(keys)
+
+        return None
+
+    # numeruje <node> (w kolejności wykonania) i zwraca jego klucz; None - wartość nieporównywalna
+    def number(self, node, position, parent, attr, shared=True):
+        children = []
+
+        for name in ("val", "expression", "left", "right", "row", "col", "rows", "cols"):
+            if isinstance(getattr(node, name, None), AST.Node):
+                children.append(self.number(getattr(node, name), position, node, name,
+                                            shared or not isinstance(node, wrappers)))
+
+        if None in children:
+            return None
+
+        key = self.key(node, children)
+
+        if key is None or not shared or not isinstance(node, candidates):
+            return key
+
+        if key not in self.available and key in self.seen:
+            first_position, first_parent, first_attr, first = self.seen[key]
+            name = self.def_use.fresh("_cse")
+            declare = AST.DeclareExpr('=', AST.Variable(name, first.lineno), first, first.lineno)
+            self.inserted.setdefault(first_position, []).append(AST.SpecificStmt(declare, first.lineno))
+            setattr(first_parent, first_attr, AST.Variable(name, first.lineno))
+            self.available[key] = name
+            self.temps[name] = key
+
+        if key in self.available:
+            setattr(parent, attr, AST.Variable(self.available[key], node.lineno))
+            self.eliminated += 1
+        else:
+            self.seen[key] = (position, parent, attr, node)
+
+        return key
+
+    def region(self, stmts):
+        self.seen, self.available, self.inserted = {}, {}, {}
+
+        for position, stmt in enumerate(stmts):
+            node = stmt.specific_stmt if isinstance(stmt, AST.SpecificStmt) else stmt
+
+            if isinstance(node, AST.DeclareExpr):
+                self.number(node.right, position, node, "right", not self.def_use.mutable(node.left))
+            elif isinstance(node, AST.UpdateExpr):
+                self.number(node.right, position, node, "right")
+            elif isinstance(node, AST.ReturnExpression):
+                self.number(node.expression, position, node, "expression")
+            else:
+                # `print a, b` liczy najpierw a - łańcuch PrintRecursive jest odwiedzany od końca
+                chain = [node.print_stmt]
+
+                while isinstance(chain[-1], AST.PrintRecursive):
+                    chain.append(chain[-1].print_rec)
+
+                for print_expr in reversed(chain):
+                    self.number(print_expr.print_expr, position, print_expr, "print_expr")
+
+            for name in self.def_use.definitions(stmt):
+                self.versions[name] = self.versions.get(name, 0) + 1
+
+        result = []
+
+        for position, stmt in enumerate(stmts):
+            result.extend(self.inserted.get(position, []))
+            result.append(stmt)
+
+        return result
+
+    # dzieli ciąg instrukcji na odcinki bez rozgałęzień
+    def block(self, stmts):
+        result, region = [], []
+
+        for stmt in stmts:
+            if straight(stmt, self.def_use):
+                region.append(stmt)
+                continue
+
+            result.extend(self.region(region))
+            region = []
+            result.append(self.visit(stmt))
+
+            # wersje zmiennych zmienionych w rozgałęzieniu nie mogą być porównywane dalej
+            for name in self.def_use.definitions(stmt) if stmt is not None else ():
+                self.versions[name] = self.versions.get(name, 0) + 1
+
+        return result + self.region(region)
+
+    # ciało instrukcji złożonej bez nawiasów { } to jednoelementowy odcinek
+    def body(self, node):
+        if not straight(node, self.def_use):
+            return self.visit(node)
+
+        stmts = self.region([node])
+        return stmts[0] if len(stmts) == 1 else AST.MultipleStmts(stmts, node.lineno)
+
+    @on('node')
+    def visit(self, node):
+        return node
+
+    @when(AST.MultipleStmts)
+    def visit(self, node):
+        node.stmts = self.block(node.stmts)
+        return node
+
+    @when(AST.StatementsSet)
+    def visit(self, node):
+        node.stmts = self.visit(node.stmts)
+        return node
+
+    @when(AST.SpecificStmt)
+    def visit(self, node):
+        node.specific_stmt = self.visit(node.specific_stmt)
+        return node
+
+    @when(AST.IfElseStmt)
+    def visit(self, node):
+        node.if_stmt = self.body(node.if_stmt)
+        node.else_stmt = self.body(node.else_stmt)
+        return node
+
+    @when(AST.IfStmt)
+    def visit(self, node):
+        node.if_stmt = self.body(node.if_stmt)
+        return node
+
+    @when(AST.WhileStmt)
+    def visit(self, node):
+        node.while_stmt = self.body(node.while_stmt)
+        return node
+
+    @when(AST.ForStmt)
+    def visit(self, node):
+        node.for_stmt = self.body(node.for_stmt)
+        return node
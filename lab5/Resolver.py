@@ -0,0 +1,246 @@
+import AST
+from visit import *
+from DefUse import shares
+
+
+# Przebieg rozwiązujący nazwy przed wykonaniem: każda zmienna, zmienna
+# iterująca pętli `for` i cel przypisania dostaje adres (poziom, slot).
+# Poziom to pozycja ramki na MemoryStack (bloki nie są rekurencyjne, więc
+# jest znany statycznie), slot to indeks w tablicy tej ramki. Bloki dostają
+# `frame_size` - rozmiar ramki tworzonej przy ich wykonaniu albo None, gdy
+# TypeChecker ustalił, że blok nie wprowadza nowych nazw i ramka jest zbędna.
+class Resolver(object):
+    def __init__(self):
+        self.scopes = []
+        self.loops = [] # otwarte pętle `for`, w kolejności zagnieżdżenia
+
+    def resolve(self, ast):
+        self.scopes.append({})
+        self.visit(ast)
+        ast.frame_size = len(self.scopes.pop())
+
+    def lookup(self, name):
+        for level in range(len(self.scopes) - 1, -1, -1):
+            slot = self.scopes[level].get(name)
+
+            if slot is not None:
+                return level, slot
+
+        return None
+
+    # przypisanie do niewidocznej nazwy tworzy ją w bieżącym bloku - jak MemoryStack.insert
+    def address(self, name):
+        address = self.lookup(name)
+
+        if address is None:
+            scope = self.scopes[-1]
+            scope[name] = len(scope)
+            address = len(self.scopes) - 1, scope[name]
+
+        return address
+
+    # brak znacznika od TypeCheckera oznacza ostrożnie, że blok potrzebuje ramki
+    def scoped(self, node, declares=True):
+        if not declares:
+            self.visit(node)
+            return None
+
+        self.scopes.append({})
+        self.visit(node)
+        return len(self.scopes.pop())
+
+    @on('node')
+    def visit(self, node):
+        pass
+
+    @when(AST.MultipleStmts)
+    def visit(self, node):
+        node.frame_size = 0
+
+        for stmt in node.stmts:
+            self.visit(stmt)
+
+    @when(AST.StatementsSet)
+    def visit(self, node):
+        node.frame_size = self.scoped(node.stmts, getattr(node, "declares", True))
+
+    @when(AST.SpecificStmt)
+    def visit(self, node):
+        self.visit(node.specific_stmt)
+
+    @when(AST.ReturnExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+    @when(AST.IfElseStmt)
+    def visit(self, node):
+        self.visit(node.rel_expr)
+        node.if_frame_size = self.scoped(node.if_stmt, getattr(node, "if_declares", True))
+        node.else_frame_size = self.scoped(node.else_stmt, getattr(node, "else_declares", True))
+
+    @when(AST.IfStmt)
+    def visit(self, node):
+        self.visit(node.rel_expr)
+        node.frame_size = self.scoped(node.if_stmt, getattr(node, "declares", True))
+
+    @when(AST.WhileStmt)
+    def visit(self, node):
+        declares = getattr(node, "declares", True)
+
+        if declares:
+            self.scopes.append({})
+
+        self.visit(node.rel_expr)
+        self.visit(node.while_stmt)
+        node.frame_size = len(self.scopes.pop()) if declares else None
+
+    @when(AST.ForStmt)
+    def visit(self, node):
+        self.visit(node.range_begin)
+        self.visit(node.range_end)
+
+        # zmienna iterująca zawsze dostaje slot 0 nowej ramki, nawet gdy przesłania inną
+        self.scopes.append({node.iter_variable: 0})
+        node.address = len(self.scopes) - 1, 0
+        node.assigns_iterator = False
+
+        self.loops.append(node)
+        self.visit(node.for_stmt)
+        self.loops.pop()
+
+        node.frame_size = len(self.scopes.pop())
+
+    @when(AST.PrintStmt)
+    def visit(self, node):
+        self.visit(node.print_stmt)
+
+    @when(AST.PrintRecursive)
+    def visit(self, node):
+        self.visit(node.print_rec)
+        self.visit(node.print_expr)
+
+    @when(AST.PrintExpr)
+    def visit(self, node):
+        self.visit(node.print_expr)
+
+    @when(AST.Value)
+    def visit(self, node):
+        self.visit(node.val)
+
+    @when(AST.ArithNumExpr)
+    def visit(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    @when(AST.Variable)
+    def visit(self, node):
+        node.address = self.address(node.name)
+
+    @when(AST.AssignExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+    @when(AST.RelationExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+    @when(AST.MatrixExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+    @when(AST.UnaryExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+    @when(AST.MatrixNode)
+    def visit(self, node):
+        self.visit(node.values)
+
+    @when(AST.GeneralExpression)
+    def visit(self, node):
+        self.visit(node.expression)
+
+    @when(AST.ArithMatExpr)
+    def visit(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    # prawa strona jest liczona przed utworzeniem zmiennej po lewej
+    # `shares` - wartość prawej strony to macierz innej zmiennej albo wiersz macierzy; przypisanie daje nowy nagłówek
+    @when(AST.DeclareExpr)
+    def visit(self, node):
+        node.shares = shares(node.right)
+        self.visit(node.right)
+        self.visit(node.left)
+        self.assigned(node.left)
+
+    @when(AST.UpdateExpr)
+    def visit(self, node):
+        self.visit(node.right)
+        self.visit(node.left)
+        self.assigned(node.left)
+
+    # pętle, których zmienna iterująca jest celem przypisania, nie mogą iterować po `range`
+    def assigned(self, target):
+        if isinstance(target, AST.Variable):
+            for loop in self.loops:
+                if loop.address == target.address:
+                    loop.assigns_iterator = True
+
+    @when(AST.CompExpr)
+    def visit(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    @when(AST.MatrixFuncs)
+    def visit(self, node):
+        self.visit(node.rows)
+        self.visit(node.cols)
+
+    @when(AST.Builtin)
+    def visit(self, node):
+        for arg in node.args:
+            self.visit(arg)
+
+    @when(AST.MatrixRef)
+    def visit(self, node):
+        self.visit(node.matrix_ref)
+
+    @when(AST.TabRef)
+    def visit(self, node):
+        self.visit(node.tab_ref)
+
+    @when(AST.DoubleRef)
+    def visit(self, node):
+        node.address = self.address(node.id)
+        self.visit(node.row)
+        self.visit(node.col)
+
+    @when(AST.SingleRef)
+    def visit(self, node):
+        node.address = self.address(node.id)
+        self.visit(node.row)
+
+    @when(AST.TabRefBoth)
+    def visit(self, node):
+        node.address = self.address(node.id)
+        self.visit(node.begin)
+        self.visit(node.end)
+
+    @when(AST.TabRefEnd)
+    def visit(self, node):
+        node.address = self.address(node.id)
+        self.visit(node.end)
+
+    @when(AST.TabRefBegin)
+    def visit(self, node):
+        node.address = self.address(node.id)
+        self.visit(node.begin)
+
+    @when(AST.BlockRef)
+    def visit(self, node):
+        node.address = self.address(node.id)
+        self.visit(node.row_begin)
+        self.visit(node.row_end)
+        self.visit(node.col_begin)
+        self.visit(node.col_end)
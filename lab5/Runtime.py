@@ -0,0 +1,471 @@
+from array import array
+from itertools import chain, repeat
+from operator import add, sub, mul, truediv
+from numbers import Integral
+from Matrix import Matrix
+from SparseMatrix import SparseMatrix
+import Builtins
+
+try:
+    import NumpyBackend
+except ImportError:
+    NumpyBackend = None
+
+# sposób przechowywania macierzy: "array" (Matrix z buforem array) albo "numpy" (opcjonalnie, gdy NumPy jest dostępny)
+backends = ["array", "numpy"] if NumpyBackend is not None else ["array"]
+backend = "array"
+
+# od tylu elementów wyniku mnożenie macierzy jest liczone blokami po <matmul_block> kolumn
+matmul_blocked_size = 250 * 250
+matmul_block = 64
+
+operations = {
+    '+': add,
+    '-': sub,
+    '/': lambda x, y: x / y if y != 0 else float('inf'),
+    '.+': add,
+    '.-': sub,
+    './': lambda x, y: x / y if y != 0 else float('inf'),
+    '*': mul,
+}
+
+# przypisania złożone: na liczbach jak zwykłe działania, na macierzach jak działania element po elemencie (`*=` to `.*`)
+compound = {'+=': add, '-=': sub, '*=': mul, '/=': truediv}
+compound_mat = {'+=': '.+', '-=': '.-', '*=': '.*', '/=': './'}
+
+# typy liczb, dla których silniki liczą `x op= v` bezpośrednio, bez `update` (sprawdzenie przez `x.__class__ in scalars`)
+scalars = frozenset((int, float))
+
+comparisons = {
+    '<': lambda x, y: x < y,
+    '>': lambda x, y: x > y,
+    '<=': lambda x, y: x <= y,
+    '>=': lambda x, y: x >= y,
+    '==': lambda x, y: x == y,
+    '!=': lambda x, y: x != y,
+}
+
+# zeros i ones to jedna liczba z krokami 0, eye - macierz rzadka; pełny bufor powstaje przy pierwszym zapisie
+generators = {
+    "zeros": lambda rows, cols: Matrix.repeated(0., rows, cols),
+    "ones":  lambda rows, cols: Matrix.repeated(1., rows, cols),
+    "eye":   lambda rows, cols: SparseMatrix.identity(rows, cols)
+}
+
+
+def use_backend(name):
+    global backend
+
+    if name not in backends:
+        raise ValueError(f"Niedostępny sposób przechowywania macierzy: {name}")
+
+    backend = name
+
+
+def arith_mat(op, left, right):
+    if backend == "numpy":
+        return NumpyBackend.arith_mat(op, left, right)
+
+    # dodanie (odjęcie) macierzy zer nic nie zmienia
+    if op in ('.+', '.-') and not_scalar(left) and not_scalar(right) and (left.rows, left.cols) == (right.rows, right.cols):
+        if right.constant() == 0:
+            return cast(left, right)
+        elif op == '.+' and left.constant() == 0:
+            return cast(right, left)
+
+    if isinstance(left, SparseMatrix) or isinstance(right, SparseMatrix):
+        return arith_sparse(op, left, right)
+
+    # Pobranie funkcji odpowiadającej operatorowi z mapowania (np. dodawanie, odejmowanie)
+    func = mul if op == '.*' else operations[op]
+
+    # Mnożenie macierzy (Matrix Multiplication) dla struktur 2D - wektor obok
+    # macierzy jest kolumną powtórzoną tyle razy, ile kolumn ma macierz
+    if op == '.*' and isinstance(left, Matrix) and isinstance(right, Matrix) and (left.cols, right.cols) != (None, None):
+        if left.cols is None:
+            left = left.broadcast(left.rows, right.cols)
+        elif right.cols is None:
+            right = right.broadcast(right.rows, left.cols)
+
+        return matmul(left, right)
+
+    # --- LOGIKA BROADCASTINGU (Dopasowanie wymiarów) ---
+    # Skalar, wektor (jako kolumna), wiersz 1xN albo kolumna Nx1 są rozszerzane do
+    # wymiarów wyniku widokiem z krokiem 0 - bez budowania powtórzonych danych.
+    rows, cols = broadcast_shape(op, left, right)
+    left, right = broadcast(left, rows, cols), broadcast(right, rows, cols)
+    dtype = 'd' if op == './' or 'd' in (left.dtype, right.dtype) else 'q'
+
+    # Dla ciągłych macierzy tych samych wymiarów: operacja element po elemencie na całych buforach
+    if not left.view and not right.view:
+        return Matrix(array(dtype, map(func, left.data, right.data)), rows, cols)
+
+    data = array(dtype)
+
+    for left_line, right_line in zip(left.lines(), right.lines()):
+        data.extend(map(func, left_line, right_line))
+
+    return Matrix(data, rows, cols)
+
+
+def not_scalar(value):
+    return isinstance(value, (Matrix, SparseMatrix))
+
+
+# <value> jako wynik działania z <other>: typ elementów 'd', jeśli któraś z nich ma taki typ
+def cast(value, other):
+    if value.dtype == other.dtype or value.dtype == 'd':
+        return share(value)
+
+    return Matrix(array('d', value.flat()), value.rows, value.cols)
+
+
+# działania na macierzach rzadkich: mnożenie przez eye zwraca drugi argument, mnożenie macierzy
+# przechodzi tylko po niezerowych elementach, mnożenie przez liczbę i suma (różnica) dwóch
+# macierzy rzadkich zostają rzadkie; pozostałe działania dostają gęstą macierz (`dense`)
+def arith_sparse(op, left, right):
+    if op == '.*' and not_scalar(left) and not_scalar(right):
+        if left.cols is None:
+            left = left.broadcast(left.rows, right.cols)
+        elif right.cols is None:
+            right = right.broadcast(right.rows, left.cols)
+
+        if isinstance(left, SparseMatrix) and left.is_identity() and left.cols == right.rows:
+            return cast(right, left)
+        elif isinstance(right, SparseMatrix) and right.is_identity() and left.cols == right.rows:
+            return cast(left, right)
+        elif isinstance(left, SparseMatrix):
+            return left.matmul(dense(right))
+
+        return right.rmatmul(left)
+
+    if op == '.*' and not not_scalar(left):
+        return right.scaled(mul, left)
+    elif op in ('.*', './') and not not_scalar(right) and right != 0:
+        return left.scaled(mul if op == '.*' else truediv, right)
+    elif op in ('.+', '.-') and isinstance(left, SparseMatrix) and isinstance(right, SparseMatrix) \
+            and (left.rows, left.cols) == (right.rows, right.cols):
+        return left.combine(op, right)
+
+    return arith_mat(op, dense(left), dense(right))
+
+
+def dense(value):
+    return value.dense() if isinstance(value, SparseMatrix) else value
+
+
+# wymiary (wiersze, kolumny - None dla wektora) wyniku działań element po elemencie na <values>
+def broadcast_shape(op, *values):
+    shapes = [(value.rows, value.cols) for value in values if isinstance(value, Matrix)]
+
+    # wektor obok macierzy jest kolumną: jego i-ty element dotyczy i-tego wiersza
+    if any(cols is None for _, cols in shapes) and any(cols is not None for _, cols in shapes):
+        shapes = [(rows, 1 if cols is None else cols) for rows, cols in shapes]
+
+    rows, cols = {rows for rows, _ in shapes} - {1}, {cols for _, cols in shapes} - {1}
+
+    if len(rows) > 1 or len(cols) > 1:
+        raise ValueError(f"Nie można wykonać `{op}` na macierzach o różnych wymiarach")
+
+    return (rows.pop() if rows else 1), (cols.pop() if cols else 1)
+
+
+def broadcast(value, rows, cols):
+    if isinstance(value, Matrix):
+        return value.broadcast(rows, cols)
+
+    return Matrix.repeated(value, rows, cols)
+
+
+# Drzewo działań element po elemencie, np. `A .+ B .- C ./ D`, liczone w jednym
+# przejściu: wiersz wyniku to złożenie `map` po wierszach argumentów (rozszerzonych
+# widokiem jak w `arith_mat`), dopisywane od razu do jednego bufora - bez macierzy
+# pośrednich. tree to krotki (op, lewy, prawy) z indeksami w <operands> w liściach.
+def arith_fused(tree, operands):
+    matrices = [value for value in operands if isinstance(value, Matrix)]
+
+    # NumPy liczy każde działanie wektorowo; mnożenie macierzy nie jest działaniem element po elemencie,
+    # a macierze rzadkie i zera mają własne przypadki w `arith_mat`
+    if backend == "numpy" or not matrices or product(tree, operands) or any(structured(value) for value in operands):
+        return arith_tree(tree, operands)
+
+    op = tree[0]
+    rows, cols = broadcast_shape(op, *matrices)
+    operands = [broadcast(value, rows, cols) if isinstance(value, Matrix) else value for value in operands]
+    floats = any(isinstance(value, float) or isinstance(value, Matrix) and value.dtype == 'd' for value in operands)
+    dtype = 'd' if floats or './' in tree_ops(tree) else 'q'
+
+    # źródła kolejnych wierszy każdego argumentu: ciągłe macierze tych samych wymiarów
+    # to jeden wiersz - cały bufor, skalar to ten sam nieskończony `repeat` dla każdego wiersza
+    if not any(value.view for value in operands if isinstance(value, Matrix)):
+        sources = [[value.data] if isinstance(value, Matrix) else [repeat(value)] for value in operands]
+    else:
+        sources = [value.lines() if isinstance(value, Matrix) else repeat(repeat(value)) for value in operands]
+
+    data = array(dtype)
+
+    for lines in zip(*sources):
+        data.extend(fused_line(tree, lines))
+
+    return Matrix(data, rows, cols)
+
+
+def structured(value):
+    return isinstance(value, SparseMatrix) or isinstance(value, Matrix) and value.constant() == 0
+
+
+def fused_line(tree, lines):
+    if not isinstance(tree, tuple):
+        return lines[tree]
+
+    op, left, right = tree
+    return map(mul if op == '.*' else operations[op], fused_line(left, lines), fused_line(right, lines))
+
+
+# drzewo liczone działanie po działaniu
+def arith_tree(tree, operands):
+    if not isinstance(tree, tuple):
+        return operands[tree]
+
+    op, left, right = tree
+    return arith_mat(op, arith_tree(left, operands), arith_tree(right, operands))
+
+
+def tree_ops(tree):
+    return [tree[0], *tree_ops(tree[1]), *tree_ops(tree[2])] if isinstance(tree, tuple) else []
+
+
+# liczba wymiarów wyniku poddrzewa: 0 - skalar, 1 - wektor, 2 - macierz
+def tree_dimension(tree, operands):
+    if isinstance(tree, tuple):
+        return max(tree_dimension(tree[1], operands), tree_dimension(tree[2], operands))
+
+    value = operands[tree]
+    return 0 if not isinstance(value, Matrix) else 1 if value.cols is None else 2
+
+
+# czy w drzewie jest `.*` będące mnożeniem macierzy
+def product(tree, operands):
+    if not isinstance(tree, tuple):
+        return False
+
+    op, left, right = tree
+    dimensions = (tree_dimension(left, operands), tree_dimension(right, operands))
+
+    if op == '.*' and 0 not in dimensions and 2 in dimensions:
+        return True
+
+    return product(left, operands) or product(right, operands)
+
+
+# x op= value - zwraca nową wartość x
+def update(op, old, value):
+    if not_scalar(old) or backend == "numpy" and isinstance(old, NumpyBackend.numpy.ndarray):
+        return update_mat(op, old, value)
+
+    return compound[op](old, value)
+
+
+# A op= value dla macierzy: wynik trafia do bufora A, jeśli A nie dzieli go z widokiem
+# ani innym nagłówkiem, a działanie nie zmienia wymiarów ani typu elementów A
+# (mnożenie macierzy zawsze daje nową macierz)
+def update_mat(op, matrix, value):
+    op = compound_mat[op]
+
+    if backend == "numpy":
+        return NumpyBackend.update_mat(op, matrix, value)
+
+    if isinstance(matrix, SparseMatrix) or isinstance(value, SparseMatrix):
+        return arith_mat(op, matrix, value)
+
+    if op == '.*' and isinstance(value, Matrix) and (matrix.cols, value.cols) != (None, None):
+        return arith_mat(op, matrix, value)
+
+    floats = op == './' or isinstance(value, float) or isinstance(value, Matrix) and value.dtype == 'd'
+
+    if not matrix.owns_data() or floats and matrix.dtype == 'q' or broadcast_shape(op, matrix, value) != (matrix.rows, matrix.cols):
+        return arith_mat(op, matrix, value)
+
+    value = broadcast(value, matrix.rows, matrix.cols)
+    values = chain.from_iterable(value.lines()) if value.view else value.data
+    func = mul if op == '.*' else operations[op]
+    matrix.data[:] = array(matrix.dtype, map(func, matrix.data, values))
+    return matrix
+
+
+# A[...] op= value; indices jak w przypisaniu: [row, col], [row], [begin, end, None] albo 4 granice bloku
+def update_item(op, matrix, indices, value):
+    if len(indices) == 4:
+        return store_block(matrix, *indices, update(op, load_block(matrix, *indices), value))
+    elif len(indices) == 2:
+        row, col = indices
+        return store_item(matrix, row, col, update(op, matrix[row, col], value))
+    elif len(indices) == 1:
+        return store_row(matrix, indices[0], update(op, matrix[indices[0]], value))
+
+    begin, end = indices[0], indices[1]
+    return store_range(matrix, begin, end, update(op, load_range(matrix, begin, end), value))
+
+
+# mnożenie wierszy lewej macierzy przez kolumny prawej (wycinane z bufora z krokiem
+# raz, przed pętlą - także z widoków) - iloczyn skalarny liczy `sum(map(mul, ...))` bez pętli w Pythonie
+def matmul(left, right):
+    if left.cols != right.rows:
+        raise ValueError(f"Nie można pomnożyć macierzy {left.rows}x{left.cols} i {right.rows}x{right.cols}")
+
+    rows = [left.row_values(i).tolist() for i in range(left.rows)]
+    columns = [right.column_values(j).tolist() for j in range(right.cols)]
+    dtype = 'd' if 'd' in (left.dtype, right.dtype) else 'q'
+
+    if len(rows) * len(columns) < matmul_blocked_size:
+        data = array(dtype, [sum(map(mul, row, column)) for row in rows for column in columns])
+        return Matrix(data, left.rows, right.cols)
+
+    # duże macierze: kolumny brane blokami, by blok był w pamięci podręcznej dla wszystkich wierszy
+    result = [[] for _ in rows]
+
+    for start in range(0, len(columns), matmul_block):
+        block = columns[start:start + matmul_block]
+
+        for row, line in zip(rows, result):
+            line.extend([sum(map(mul, row, column)) for column in block])
+
+    return Matrix(array(dtype, chain.from_iterable(result)), left.rows, right.cols)
+
+
+# wartości zmiennej pętli `for begin:end` w kolejnych obrotach, jak w Interpreterze - także dla liczb rzeczywistych
+def for_range(begin, end):
+    if type(begin) is int and type(end) is int:
+        return range(begin, end + 1 if begin < end else begin)
+
+    return float_range(begin, end)
+
+
+def float_range(value, end):
+    if value < end:
+        yield value
+
+        while value < end:
+            value += 1
+            yield value
+
+
+# zeros/ones/eye(rows, cols); bez cols - macierz kwadratowa
+def matrix_funcs(fun, rows, cols=None):
+    cols = rows if cols is None else cols
+
+    if not isinstance(rows, Integral) or not isinstance(cols, Integral) or rows < 0 or cols < 0:
+        raise ValueError(f"Wymiary macierzy `{fun}` muszą być nieujemnymi liczbami całkowitymi: {rows}, {cols}")
+
+    if backend == "numpy":
+        return NumpyBackend.matrix_funcs(fun, rows, cols)
+
+    matrix_func = generators.get(fun)
+
+    if matrix_func:
+        return matrix_func(rows, cols)
+
+    raise ValueError(f"Nieznana funkcja macierzowa: {fun}")
+
+
+# funkcja wbudowana (sum, min, max, mean, norm, dot) - Builtins albo jej odpowiednik w NumpyBackend
+def call_builtin(fun, *args):
+    if backend == "numpy":
+        return NumpyBackend.builtins[fun](*args)
+
+    return Builtins.builtins[fun](*args)
+
+
+# Zapisy do macierzy zwracają macierz, którą silnik ma dalej trzymać w zmiennej -
+# widok NumPy jest przy zapisie zastępowany kopią (Matrix robi to sama).
+
+# A[begin:end] = value - wiersze (elementy wektora) zapisywane jednym wycinkiem bufora
+def store_range(matrix, begin, end, value):
+    if backend == "numpy":
+        return NumpyBackend.store_range(matrix, begin, end, value)
+
+    matrix, value = dense(matrix), dense(value)
+    matrix.store_block(range(matrix.rows)[begin:end], None if matrix.cols is None else range(matrix.cols), value)
+    return matrix
+
+
+# A[row_begin:row_end, col_begin:col_end] = value
+def store_block(matrix, row_begin, row_end, col_begin, col_end, value):
+    if backend == "numpy":
+        return NumpyBackend.store_block(matrix, row_begin, row_end, col_begin, col_end, value)
+
+    matrix, value = dense(matrix), dense(value)
+    matrix.store_block(range(matrix.rows)[row_begin:row_end], range(matrix.cols)[col_begin:col_end], value)
+    return matrix
+
+
+# A[row] = value
+def store_row(matrix, row, value):
+    if backend == "numpy":
+        return NumpyBackend.store_row(matrix, row, value)
+
+    matrix, value = dense(matrix), dense(value)
+    matrix[row] = value
+    return matrix
+
+
+# A[begin:end] - widok wierszy (elementów wektora)
+def load_range(matrix, begin, end):
+    if backend == "numpy":
+        return NumpyBackend.load_range(matrix, begin, end)
+
+    return matrix.rows_view(begin, end)
+
+
+# A[row_begin:row_end, col_begin:col_end] - widok bloku
+def load_block(matrix, row_begin, row_end, col_begin, col_end):
+    if backend == "numpy":
+        return NumpyBackend.load_block(matrix, row_begin, row_end, col_begin, col_end)
+
+    return matrix.block(row_begin, row_end, col_begin, col_end)
+
+
+# `B = A` - macierz dostaje nowy nagłówek na tym samym buforze; pierwszy zapis
+# przez którąkolwiek z nazw kopiuje dane (kopiowanie przy zapisie)
+def share(value):
+    if backend == "numpy":
+        return NumpyBackend.share(value)
+
+    return value.shared() if isinstance(value, Matrix) else value
+
+
+# wartość literału macierzowego [ ... ] - silniki tworzą ją raz i przy każdym wykonaniu zwracają `share`
+def matrix_literal(value):
+    if backend == "numpy":
+        return NumpyBackend.matrix(value)
+
+    return Matrix.from_list(value)
+
+
+# transpozycja `'` (widok) - skalary i wektory 1-D zostają bez zmian
+def transpose(value):
+    if backend == "numpy":
+        return NumpyBackend.transpose(value) if isinstance(value, NumpyBackend.numpy.ndarray) else value
+
+    if isinstance(value, SparseMatrix) or isinstance(value, Matrix) and value.cols is not None:
+        return value.transposed()
+
+    return value
+
+
+# A[row, col] = value; element macierzy liczb rzeczywistych pozostaje float
+def store_item(matrix, row, col, value):
+    if backend == "numpy":
+        return NumpyBackend.store_item(matrix, row, col, value)
+
+    matrix, value = dense(matrix), dense(value)
+    matrix[row, col] = value
+    return matrix
+
+
+# tekst wypisywany przez print - macierz zawsze w postaci zagnieżdżonej listy
+def show(value):
+    if backend == "numpy":
+        return NumpyBackend.show(value)
+
+    return str(value)
@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left
+from operator import add, sub
+from Matrix import Matrix
+
+
+# Macierz rzadka w formacie CSR: niezerowe elementy wiersza i leżą w data[indptr[i]:indptr[i + 1]],
+# a ich kolumny - pod tymi samymi indeksami w indices (rosnąco). Wartość jest
+# niezmienna - zapis do niej (i działania, które nie zachowują struktury) dostaje
+# gęstą macierz z `dense`, więc może być dzielona przez wiele zmiennych bez kopiowania.
+class SparseMatrix(object):
+    __slots__ = ("data", "indices", "indptr", "rows", "cols")
+
+    def __init__(self, data, indices, indptr, rows, cols):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.rows = rows
+        self.cols = cols
+
+    # jedynki na przekątnej macierzy rows x cols
+    @classmethod
+    def identity(cls, rows, cols):
+        n = min(rows, cols)
+        indptr = array('q', range(n + 1)) + array('q', [n]) * (rows - n)
+        return cls(array('d', [1.]) * n, array('q', range(n)), indptr, rows, cols)
+
+    @property
+    def dtype(self):
+        return self.data.typecode
+
+    def is_identity(self):
+        return (self.rows == self.cols == len(self.data) and all(value == 1 for value in self.data)
+                and self.indices == array('q', range(self.rows)))
+
+    # macierz bez niezerowych elementów to same zera (jak Matrix.constant)
+    def constant(self):
+        return None if self.data else 0.
+
+    def position(self, row, col):
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"Indeks [{row}, {col}] poza macierzą {self.rows}x{self.cols}")
+
+        end = self.indptr[row + 1]
+        k = bisect_left(self.indices, col, self.indptr[row], end)
+        return k if k < end and self.indices[k] == col else None
+
+    # wartości wiersza jako gęsty array
+    def row_values(self, row):
+        line = array(self.data.typecode, [0]) * self.cols
+
+        for k in range(self.indptr[row], self.indptr[row + 1]):
+            line[self.indices[k]] = self.data[k]
+
+        return line
+
+    def dense(self):
+        data = array(self.data.typecode, [0]) * (self.rows * self.cols)
+
+        for row in range(self.rows):
+            for k in range(self.indptr[row], self.indptr[row + 1]):
+                data[row * self.cols + self.indices[k]] = self.data[k]
+
+        return Matrix(data, self.rows, self.cols)
+
+    # wiersze begin..end-1 i blok - gęste kopie (wartość się nie zmienia, więc kopia zachowuje się jak widok)
+    def rows_view(self, begin, end):
+        rows = range(self.rows)[begin:end]
+        return self.block(rows.start, rows.stop, None, None)
+
+    def block(self, row_begin, row_end, col_begin, col_end):
+        rows, cols = range(self.rows)[row_begin:row_end], range(self.cols)[col_begin:col_end]
+        data = array(self.data.typecode)
+
+        for row in rows:
+            data.extend(self.row_values(row)[cols.start:cols.stop])
+
+        return Matrix(data, len(rows), len(cols))
+
+    def transposed(self):
+        counts = array('q', [0]) * (self.cols + 1)
+
+        for col in self.indices:
+            counts[col + 1] += 1
+
+        for col in range(self.cols):
+            counts[col + 1] += counts[col]
+
+        indptr, fill = array('q', counts), counts
+        data, indices = array(self.data.typecode, self.data), array('q', self.indices)
+
+        for row in range(self.rows):
+            for k in range(self.indptr[row], self.indptr[row + 1]):
+                col = self.indices[k]
+                data[fill[col]], indices[fill[col]] = self.data[k], row
+                fill[col] += 1
+
+        return SparseMatrix(data, indices, indptr, self.cols, self.rows)
+
+    # iloczyn z gęstą macierzą <other>: wiersz wyniku to suma wierszy other z wagami z wiersza tej macierzy
+    def matmul(self, other):
+        if self.cols != other.rows:
+            raise ValueError(f"Nie można pomnożyć macierzy {self.rows}x{self.cols} i {other.rows}x{other.cols}")
+
+        data = array('d' if 'd' in (self.dtype, other.dtype) else 'q')
+        zeros = array(data.typecode, [0]) * other.cols
+
+        for row in range(self.rows):
+            line = zeros
+
+            for k in range(self.indptr[row], self.indptr[row + 1]):
+                weight = self.data[k]
+                line = [value + weight * x for value, x in zip(line, other.row_values(self.indices[k]))]
+
+            data.extend(line)
+
+        return Matrix(data, self.rows, other.cols)
+
+    # other .* ta macierz = (tᵀ .* otherᵀ)ᵀ
+    def rmatmul(self, other):
+        if other.cols != self.rows:
+            raise ValueError(f"Nie można pomnożyć macierzy {other.rows}x{other.cols} i {self.rows}x{self.cols}")
+
+        return self.transposed().matmul(other.transposed()).transposed()
+
+    # działanie z liczbą, które zostawia zera zerami (mnożenie, dzielenie przez liczbę różną od 0)
+    def scaled(self, func, value):
+        return self.mapped(lambda x: func(x, value))
+
+    # funkcja z func(0) == 0 na każdym elemencie - zmieniają się tylko niezerowe
+    def mapped(self, func, typecode=None):
+        data = array(typecode or self.data.typecode, map(func, self.data))
+        return SparseMatrix(data, self.indices, self.indptr, self.rows, self.cols)
+
+    # suma albo różnica dwóch macierzy rzadkich tych samych wymiarów - wiersze łączone po kolumnach
+    def combine(self, op, other):
+        func = add if op == '.+' else sub
+        data, indices, indptr = array(self.data.typecode), array('q'), array('q', [0])
+
+        for row in range(self.rows):
+            values = dict(zip(self.indices[self.indptr[row]:self.indptr[row + 1]],
+                              self.data[self.indptr[row]:self.indptr[row + 1]]))
+
+            for k in range(other.indptr[row], other.indptr[row + 1]):
+                col = other.indices[k]
+                values[col] = func(values.get(col, 0.), other.data[k])
+
+            for col in sorted(values):
+                indices.append(col)
+                data.append(values[col])
+
+            indptr.append(len(data))
+
+        return SparseMatrix(data, indices, indptr, self.rows, self.cols)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            k = self.position(*index)
+            return self.data[k] if k is not None else 0. if self.data.typecode == 'd' else 0
+
+        if not 0 <= index < self.rows:
+            raise IndexError(f"Indeks [{index}] poza macierzą {self.rows}x{self.cols}")
+
+        return Matrix(self.row_values(index), self.cols)
+
+    def tolist(self):
+        return [self.row_values(row).tolist() for row in range(self.rows)]
+
+    def __str__(self):
+        return str(self.tolist())
+
+    __repr__ = __str__
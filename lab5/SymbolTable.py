@@ -9,11 +9,12 @@ class VariableSymbol(Symbol):
 
 
 class VectorSymbol(Symbol):
-    def __init__(self, name, size, type, dimension):
+    def __init__(self, name, size, type, dimension, element="float"):
         self.name = name
         self.size = size
         self.type = type
         self.dimension = dimension
+        self.element = element # "int" tylko dla macierzy, która na pewno przechowuje liczby całkowite
 
 
 class SymbolTable(object):
@@ -21,12 +22,20 @@ class SymbolTable(object):
     def __init__(self, parent, name):
         self.symbol_table = {}
         self.name = name
+        self.declares = False # czy w tym zasięgu pojawiła się nowa nazwa
         self.parent = parent # widzę parent jako wskaźnik do tablicy symboli dla poprzedniego scope'a
 
     # put variable symbol or fundef under <name> entry
     def put(self, name, symbol):
         self.symbol_table[name] = symbol
 
+    # put symbol under <name> and remember if the name was not visible before
+    def declare(self, name, symbol):
+        if self.get(name) is None:
+            self.declares = True
+
+        self.put(name, symbol)
+
     # get variable symbol or fundef from <name> entry
     def get(self, name):
         result = self.symbol_table.get(name)
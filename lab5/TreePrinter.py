@@ -175,6 +175,11 @@ class TreePrinter:
     def toTree(self):
         return Tree("REF", [Tree(self.id), self.begin.toTree(), Tree(":")])
 
+    @addToClass(AST.BlockRef)
+    def toTree(self):
+        return Tree("REF", [Tree(self.id), self.row_begin.toTree(), Tree(":"), self.row_end.toTree(),
+                            self.col_begin.toTree(), Tree(":"), self.col_end.toTree()])
+
     @addToClass(AST.MatrixRowsNode)
     def toTree(self):
         return Tree("VECTOR", [row.toTree() for row in self.rows])
@@ -185,7 +190,11 @@ class TreePrinter:
 
     @addToClass(AST.MatrixFuncs)
     def toTree(self):
-        return Tree(self.fun, [Tree(self.value)])
+        return Tree(self.fun, [arg.toTree() for arg in (self.rows, self.cols) if arg is not None])
+
+    @addToClass(AST.Builtin)
+    def toTree(self):
+        return Tree(self.fun, [arg.toTree() for arg in self.args])
 
     @addToClass(AST.Error)
     def toTree(self):
@@ -73,6 +73,14 @@ ttype['+=']["vector"]["vector"] = "vector"
 ttype['-=']["vector"]["vector"] = "vector"
 ttype['*=']["vector"]["vector"] = "vector"
 ttype['/=']["vector"]["vector"] = "vector"
+ttype['+=']["vector"]["int"] = "vector"
+ttype['-=']["vector"]["int"] = "vector"
+ttype['*=']["vector"]["int"] = "vector"
+ttype['/=']["vector"]["int"] = "vector"
+ttype['+=']["vector"]["float"] = "vector"
+ttype['-=']["vector"]["float"] = "vector"
+ttype['*=']["vector"]["float"] = "vector"
+ttype['/=']["vector"]["float"] = "vector"
 
 # special operations for vectors and mixed types
 # "DOTADD"
@@ -112,6 +120,36 @@ ttype['+']["string"]["string"] = "string"
 ttype["*"]["string"]["int"] = "string"
 ttype["*"]["int"]["string"] = "string"
 
+# funkcje wbudowane - redukcje macierzy: całej (drugi argument None) albo wzdłuż osi (int);
+# sum/min/max/dot dają liczbę typu elementu - int tylko dla macierzy liczb całkowitych (visit_Builtin)
+for fun in ("sum", "min", "max", "mean", "norm"):
+    ttype[fun]["vector"][None] = "float"
+    ttype[fun]["vector"]["int"] = "vector"
+
+ttype["dot"]["vector"]["vector"] = "float"
+
+# funkcje wbudowane element po elemencie: liczba daje liczbę, macierz - macierz tych samych wymiarów;
+# sqrt/exp/log/pow zawsze dają liczby rzeczywiste, abs - liczbę typu argumentu
+for fun in ("sqrt", "exp", "log"):
+    ttype[fun]["int"][None] = "float"
+    ttype[fun]["float"][None] = "float"
+    ttype[fun]["vector"][None] = "vector"
+
+ttype["abs"]["int"][None] = "int"
+ttype["abs"]["float"][None] = "float"
+ttype["abs"]["vector"][None] = "vector"
+
+for type1 in ("int", "float", "vector"):
+    for type2 in ("int", "float", "vector"):
+        ttype["pow"][type1][type2] = "vector" if "vector" in (type1, type2) else "float"
+
+elementwise = ("sqrt", "exp", "log", "abs", "pow")
+
+# algebra liniowa: solve(A, b) ma wymiary b, inv(A) - wymiary A, det(A) jest liczbą
+ttype["solve"]["vector"]["vector"] = "vector"
+ttype["inv"]["vector"][None] = "vector"
+ttype["det"]["vector"][None] = "float"
+
 
 class NodeVisitor(object):
     def visit(self, node):
@@ -134,6 +172,44 @@ class NodeVisitor(object):
                     self.visit(child)
 
 
+# wartość indeksu do sprawdzenia zakresu; indeks-zmienna (znany dopiero w czasie wykonania) przechodzi każde sprawdzenie
+def literal(node, default=0):
+    return node.value if isinstance(node, AST.IntNum) else default
+
+
+# rozmiar macierzy z argumentu zeros/ones/eye: liczba dla literału, None - znany dopiero w czasie wykonania
+def size_of(node):
+    while isinstance(node, AST.Value):
+        node = node.val
+
+    return node.value if isinstance(node, AST.IntNum) else None
+
+
+# wymiary wartości zeros/ones/eye(rows) i (rows, cols)
+def funcs_size(node):
+    return [size_of(node.rows), size_of(node.rows if node.cols is None else node.cols)]
+
+
+# rozmiar do sprawdzenia zakresu indeksu; nieznany (None) przepuszcza każdy indeks
+def extent(size):
+    return float('inf') if size is None else size
+
+
+refs = (AST.DoubleRef, AST.SingleRef, AST.TabRefBoth, AST.TabRefEnd, AST.TabRefBegin, AST.BlockRef)
+
+
+# przypisania do elementów, wierszy i bloków macierzy oraz A op= x w <node> (bez wchodzenia w wyrażenia)
+def stores(node):
+    if isinstance(node, list):
+        return [store for item in node for store in stores(item)]
+    elif isinstance(node, AST.UpdateExpr) or isinstance(node, AST.DeclareExpr) and not isinstance(node.left, AST.Variable):
+        return [node]
+    elif not isinstance(node, AST.Node) or isinstance(node, AST.DeclareExpr):
+        return []
+
+    return [store for value in vars(node).values() for store in stores(value)]
+
+
 class TypeChecker(NodeVisitor):
     def __init__(self):
         self.table = SymbolTable(None, "root")
@@ -157,6 +233,7 @@ class TypeChecker(NodeVisitor):
     def visit_StatementsSet(self, node):
         self.table = self.table.pushScope("stmts_set")
         self.visit(node.stmts)
+        node.declares = self.table.declares
         self.table = self.table.popScope()
 
     def visit_SpecificStmt(self, node):
@@ -179,35 +256,77 @@ class TypeChecker(NodeVisitor):
         self.visit(node.rel_expr)
         self.table = self.table.pushScope("if_stmt")
         self.visit(node.if_stmt)
+        node.if_declares = self.table.declares
         self.table = self.table.popScope()
 
         self.table = self.table.pushScope("else_stmt")
         self.visit(node.else_stmt)
+        node.else_declares = self.table.declares
         self.table = self.table.popScope()
 
     def visit_IfStmt(self, node):
         self.visit(node.rel_expr)
         self.table = self.table.pushScope("if_stmt")
         self.visit(node.if_stmt)
+        node.declares = self.table.declares
         self.table = self.table.popScope()
 
     def visit_WhileStmt(self, node):
+        self.loop_stores(node.while_stmt)
         self.visit(node.rel_expr)
         self.table = self.table.pushScope("while_stmt")
         self.visit(node.while_stmt)
+        node.declares = self.table.declares
         self.table = self.table.popScope()
 
     def visit_ForStmt(self, node):
         self.table = self.table.pushScope("for_stmt")
         var = VariableSymbol(node.iter_variable, "int")
         self.table.put(node.iter_variable, var)
+        self.table.declares = True
 
         self.visit(node.range_begin)
         self.visit(node.range_end)
+        self.loop_stores(node.for_stmt)
         self.visit(node.for_stmt)
 
         self.table = self.table.popScope()
 
+    # zapis liczby rzeczywistej do macierzy liczb całkowitych zmienia typ jej elementów na float - zapis w
+    # pętli dotyczy też odczytów przed nim w ciele, więc jest uwzględniany, zanim ciało zostanie sprawdzone
+    def loop_stores(self, body):
+        for store in stores(body):
+            self.store(store)
+
+    def store(self, node):
+        target = node.left.matrix_ref if isinstance(node.left, AST.MatrixRef) else node.left.tab_ref if isinstance(node.left, AST.TabRef) else node.left
+        vector = self.table.get(target.id if hasattr(target, "id") else target.name)
+
+        if isinstance(vector, VectorSymbol) and (getattr(node, "assign_op", None) == "/=" or self.element(node.right) != "int"):
+            vector.element = "float"
+
+    # typ elementów (albo liczby) wartości <node>: "int" tylko wtedy, gdy na pewno są to liczby całkowite
+    def element(self, node):
+        while isinstance(node, (AST.Value, AST.GeneralExpression, AST.MatrixExpression, AST.UnaryExpression)):
+            node = node.val if isinstance(node, AST.Value) else node.expression
+
+        if isinstance(node, (AST.IntNum, AST.MatrixNode)):
+            return "int"
+        elif isinstance(node, (AST.Variable,) + refs):
+            symbol = self.table.get(node.name if isinstance(node, AST.Variable) else node.id)
+
+            if isinstance(symbol, VectorSymbol):
+                return symbol.element
+
+            return "int" if symbol is not None and symbol.type == "int" else "float"
+        elif isinstance(node, (AST.ArithNumExpr, AST.ArithMatExpr)):
+            op = node.op if isinstance(node, AST.ArithNumExpr) else node.div_op
+            return "int" if op not in ('/', './') and self.element(node.left) == self.element(node.right) == "int" else "float"
+        elif isinstance(node, AST.Builtin) and node.fun in ("sum", "min", "max", "abs", "dot"):
+            return "int" if all(self.element(arg) == "int" for arg in node.args[:2 if node.fun == "dot" else 1]) else "float"
+
+        return "float"
+
     def visit_PrintStmt(self, node):
         self.visit(node.print_stmt)
 
@@ -266,6 +385,7 @@ class TypeChecker(NodeVisitor):
 
     def visit_MatrixNode(self, node):
         self.visit(node.values)
+        return "vector"
 
     def visit_GeneralExpression(self, node):
         return self.visit(node.expression)
@@ -281,31 +401,62 @@ class TypeChecker(NodeVisitor):
             return
 
         if type != "" and type1 == "vector" and type2 == "vector":
-            if isinstance(node.left, AST.GeneralExpression):
-                m1 = self.table.get(node.left.expression.val.name)
-            else:
-                m1 = self.table.get(node.left.val.name)
-            
-            if isinstance(node.right, AST.GeneralExpression):
-                m2 = self.table.get(node.right.expression.val.name)
-            else:
-                m2 = self.table.get(node.right.val.name)
+            m1, m2 = self.operand_size(node.left), self.operand_size(node.right)
+
+            if m1 is None or m2 is None:
+                return type
+
+            (size1, dimension1), (size2, dimension2) = m1, m2
+
+            # mnożenie macierzy - wektor obok macierzy jest kolumną powtórzoną tyle razy, ile kolumn ma macierz
+            if op == ".*" and 2 in (dimension1, dimension2):
+                if dimension1 == 1:
+                    size1 = [size1[0], size2[1]]
+                elif dimension2 == 1:
+                    size2 = [size2[0], size1[1]]
 
-            if (m1.size != m2.size or m1.dimension != m2.dimension) and op in [".+", ".-", "./"]:
+                if None not in (size1[1], size2[0]) and size1[1] != size2[0]:
+                    self.errors.append(f"Błąd w linii {node.lineno}: nie można wykonywać operacji `{op}` na macierzach o niekompatybilnych wymiarach!")
+                    return
+
+            # działania element po elemencie: wymiar długości 1 (wiersz, kolumna, wektor jako kolumna) jest rozszerzany
+            elif any(a != b and 1 not in (a, b) and None not in (a, b) for a, b in zip(size1, size2)):
                 self.errors.append(f"Błąd w linii {node.lineno}: nie można wykonywać operacji `{op}` na macierzach o różnych wymiarach!")
                 return
-            
-            if m1.size[1] != m2.size[0] and op == ".*":
-                self.errors.append(f"Błąd w linii {node.lineno}: nie można wykonywać operacji `{op}` na macierzach o niekompatybilnych wymiarach!")
-                return
 
         return type
 
+    # wymiary macierzy będącej argumentem działania (zmiennej, zeros/ones/eye albo ich transpozycji); None, gdy nie są znane
+    def operand_size(self, node):
+        transposed = isinstance(node, AST.GeneralExpression) and node.special_op == "'"
+
+        if isinstance(node, AST.GeneralExpression):
+            node = node.expression
+
+        if isinstance(node, AST.MatrixExpression) and isinstance(node.expression, AST.MatrixFuncs):
+            size = funcs_size(node.expression)
+            return (size[::-1] if transposed else size), 2
+
+        if not isinstance(node, AST.Value) or not isinstance(node.val, AST.Variable):
+            return None
+
+        symbol = self.table.get(node.val.name)
+
+        # wymiar 0 - wynik działania albo wycinka, którego wymiarów nie znamy
+        if not isinstance(symbol, VectorSymbol) or symbol.dimension == 0:
+            return None
+
+        if transposed and symbol.dimension == 2:
+            return symbol.size[::-1], symbol.dimension
+
+        return symbol.size, symbol.dimension
+
     def visit_DeclareExpr(self, node):
         type = self.visit(node.right)
 
         if isinstance(node.left, AST.TabRef) or isinstance(node.left, AST.MatrixRef):
             self.visit(node.left)
+            self.store(node)
             return
         
         name = node.left.name
@@ -346,17 +497,30 @@ class TypeChecker(NodeVisitor):
         # odpowiada za inicjalizację/nadpisanie pojedynczą zmienną lub wartością
         elif isinstance(node.right, AST.Value):
             var_type = type
+            source = self.table.get(node.right.val.name) if isinstance(node.right.val, AST.Variable) else None
+
+            # `B = A` - B ma wymiary A
+            if isinstance(source, VectorSymbol):
+                size, dimension = source.size, source.dimension
+
+        # odpowiada za inicjalizację/nadpisanie wynikiem funkcji wbudowanej
+        elif isinstance(node.right, AST.Builtin):
+            var_type = type
+            size, dimension = self.builtin_size(node.right)
 
         # odpowiada za inicjalizację/nadpisanie funkcją do macierzy
         elif isinstance(node.right.expression, AST.MatrixFuncs):
             var_type = "vector"
-            arg = node.right.expression.value
-            size = [arg, arg]
+            size = funcs_size(node.right.expression)
             dimension = 2
 
-            if arg < 0:
+            if any(arg is not None and arg < 0 for arg in size):
                 return
 
+        # odpowiada za inicjalizację/nadpisanie wierszem, wycinkiem lub blokiem innej macierzy
+        elif isinstance(node.right, AST.MatrixExpression):
+            size, dimension = self.slice_size(node.right.expression)
+
         elif isinstance(node.right, AST.GeneralExpression):
             matrix = self.table.get(node.right.expression.val.name)
 
@@ -365,18 +529,39 @@ class TypeChecker(NodeVisitor):
                 var_type = matrix.type
                 dimension = matrix.dimension
 
+                if node.right.special_op == "'" and dimension == 2:
+                    size = matrix.size[::-1]
+
         if var_type == "":
             var_type = type
 
         if var_type == "vector":
-            var = VectorSymbol(name, size, var_type, dimension)
+            var = VectorSymbol(name, size, var_type, dimension, self.element(node.right))
         else:
             var = VariableSymbol(name, var_type)
 
         if var_type != None:
-            self.table.put(name, var)
+            self.table.declare(name, var)
             self.visit(node.left)
 
+    # wymiary wartości A[i], A[a:b], A[a:], A[:b] i A[a:b, c:d]; [0, 0] i 0, gdy nie są znane
+    def slice_size(self, ref):
+        vector = self.table.get(ref.id) if hasattr(ref, "id") else None
+        bounds = [getattr(ref, name) for name in ("row", "begin", "end", "row_begin", "row_end", "col_begin", "col_end")
+                  if hasattr(ref, name)]
+
+        if not isinstance(vector, VectorSymbol) or not all(isinstance(bound, AST.IntNum) for bound in bounds):
+            return [0, 0], 0
+
+        if isinstance(ref, AST.SingleRef):
+            return ([vector.size[1], 1], 1) if vector.dimension == 2 else ([0, 0], 0)
+        elif isinstance(ref, AST.BlockRef):
+            return [ref.row_end.value - ref.row_begin.value, ref.col_end.value - ref.col_begin.value], 2
+
+        begin = ref.begin.value if hasattr(ref, "begin") else 0
+        end = ref.end.value if hasattr(ref, "end") else vector.size[0]
+        return [None if end is None else end - begin, vector.size[1]], vector.dimension
+
     def visit_UpdateExpr(self, node):
         type1 = self.visit(node.left)
         type2 = self.visit(node.right)
@@ -387,6 +572,7 @@ class TypeChecker(NodeVisitor):
             self.errors.append(f"Błąd w linii {node.lineno}: działanie na niekompatybilnych typach danych: {type1} i {type2}!")
             return
 
+        self.store(node)
         return type
 
     def visit_CompExpr(self, node):
@@ -402,14 +588,21 @@ class TypeChecker(NodeVisitor):
         return type
 
     def visit_MatrixRef(self, node):
-        self.visit(node.matrix_ref)
+        return self.visit(node.matrix_ref)
 
     def visit_TabRef(self, node):
-        self.visit(node.tab_ref)
+        return self.visit(node.tab_ref)
+
+    # indeks (i zakres wycinka) musi być liczbą całkowitą - np. wynik sum(A) dla A z liczbami rzeczywistymi nim nie jest
+    def visit_index(self, node, *bounds):
+        for bound in bounds:
+            type = self.visit(bound)
+
+            if type is not None and type != "int":
+                self.errors.append(f"Błąd w linii {node.lineno}: indeks macierzy `{node.id}` musi być liczbą całkowitą!")
 
     def visit_DoubleRef(self, node):
-        self.visit(node.row)
-        self.visit(node.col)
+        self.visit_index(node, node.row, node.col)
         vector = self.table.get(node.id)
 
         if not vector:
@@ -424,14 +617,14 @@ class TypeChecker(NodeVisitor):
             self.errors.append(f"Błąd w linii {node.lineno}: za dużo argumentów!")
             return
 
-        if node.row.value >= vector.size[0] or node.col.value >= vector.size[1]:
+        if literal(node.row) >= extent(vector.size[0]) or literal(node.col) >= extent(vector.size[1]):
             self.errors.append(f"Błąd w linii {node.lineno}: zły wymiar macierzy!")
             return
 
-        return "int"
+        return vector.element
 
     def visit_SingleRef(self, node):
-        self.visit(node.row)
+        self.visit_index(node, node.row)
         vector = self.table.get(node.id)
 
         if not vector:
@@ -442,15 +635,15 @@ class TypeChecker(NodeVisitor):
             self.errors.append(f"Błąd w linii {node.lineno}: zły typ zmiennej!")
             return
 
-        if node.row.value >= vector.size[0]:
+        if literal(node.row) >= extent(vector.size[0]):
             self.errors.append(f"Błąd w linii {node.lineno}: zły wymiar macierzy!")
             return
 
-        return "vector"
+        # element wektora 1-D jest liczbą, wiersz macierzy - wektorem
+        return vector.element if vector.dimension == 1 else "vector"
 
     def visit_TabRefBoth(self, node):
-        self.visit(node.begin)
-        self.visit(node.end)
+        self.visit_index(node, node.begin, node.end)
         vector = self.table.get(node.id)
 
         if not vector:
@@ -461,14 +654,14 @@ class TypeChecker(NodeVisitor):
             self.errors.append(f"Błąd w linii {node.lineno}: zły typ zmiennej!")
             return
 
-        if node.end.value > vector.size[0] or node.begin.value > node.end.value or node.begin.value < 0:
+        if literal(node.end) > extent(vector.size[0]) or literal(node.begin) > literal(node.end, extent(vector.size[0])) or literal(node.begin) < 0:
             self.errors.append(f"Błąd w linii {node.lineno}: zły wymiar tablicy!")
             return
 
         return "vector"
 
     def visit_TabRefEnd(self, node):
-        self.visit(node.end)
+        self.visit_index(node, node.end)
         vector = self.table.get(node.id)
 
         if not vector:
@@ -479,14 +672,14 @@ class TypeChecker(NodeVisitor):
             self.errors.append(f"Błąd w linii {node.lineno}: zły typ zmiennej!")
             return
 
-        if node.end.value > vector.size[0] or node.end.value < 0:
+        if literal(node.end) > extent(vector.size[0]) or literal(node.end) < 0:
             self.errors.append(f"Błąd w linii {node.lineno}: zły wymiar tablicy!")
             return
 
         return "vector"
 
     def visit_TabRefBegin(self, node):
-        self.visit(node.begin)
+        self.visit_index(node, node.begin)
         vector = self.table.get(node.id)
 
         if not vector:
@@ -497,12 +690,37 @@ class TypeChecker(NodeVisitor):
             self.errors.append(f"Błąd w linii {node.lineno}: zły typ zmiennej!")
             return
 
-        if node.begin.value > vector.size[0] or node.begin.value < 0:
+        if literal(node.begin) > extent(vector.size[0]) or literal(node.begin) < 0:
             self.errors.append(f"Błąd w linii {node.lineno}: zły wymiar tablicy!")
             return
 
         return "vector"
     
+    def visit_BlockRef(self, node):
+        self.visit_index(node, node.row_begin, node.row_end, node.col_begin, node.col_end)
+
+        vector = self.table.get(node.id)
+
+        if not vector:
+            self.errors.append(f"Błąd w linii {node.lineno}: nie rozpoznano zmiennej `{node.id}`!")
+            return
+
+        if not isinstance(vector, VectorSymbol):
+            self.errors.append(f"Błąd w linii {node.lineno}: zły typ zmiennej!")
+            return
+
+        if vector.dimension < 2:
+            self.errors.append(f"Błąd w linii {node.lineno}: za dużo argumentów!")
+            return
+
+        for begin, end, size in ((node.row_begin, node.row_end, extent(vector.size[0])), (node.col_begin, node.col_end, extent(vector.size[1]))):
+            if isinstance(begin, AST.IntNum) and isinstance(end, AST.IntNum):
+                if end.value > size or begin.value > end.value or begin.value < 0:
+                    self.errors.append(f"Błąd w linii {node.lineno}: zły wymiar tablicy!")
+                    return
+
+        return "vector"
+
     def visit_MatrixRowsNode(self, node):
         for value in node.rows:
             self.visit(value)
@@ -511,12 +729,94 @@ class TypeChecker(NodeVisitor):
         pass
 
     def visit_MatrixFuncs(self, node):
-        if node.value < 0:
-            self.errors.append(f"Błąd w linii {node.lineno}: argument dla funkcji `{node.fun}` mniejszy lub równy zero!")
-            return
+        for arg in (node.rows, node.cols):
+            if arg is None:
+                continue
+
+            type = self.visit(arg)
+
+            if type is not None and type != "int":
+                self.errors.append(f"Błąd w linii {node.lineno}: argument dla funkcji `{node.fun}` musi być liczbą całkowitą!")
+                return
+
+            if size_of(arg) is not None and size_of(arg) < 0:
+                self.errors.append(f"Błąd w linii {node.lineno}: argument dla funkcji `{node.fun}` mniejszy lub równy zero!")
+                return
 
         return "vector"
 
+    def visit_Builtin(self, node):
+        types = [self.visit(arg) for arg in node.args]
+
+        if None in types:
+            return
+
+        type = ttype[node.fun][types[0]][types[1] if len(types) > 1 else None]
+
+        if type is None:
+            self.errors.append(f"Błąd w linii {node.lineno}: zły typ argumentów funkcji `{node.fun}`: {', '.join(types)}!")
+            return
+
+        if type == "float" and node.fun in ("sum", "min", "max", "dot"):
+            type = self.element(node)
+
+        m1 = self.operand_size(node.args[0])
+        m2 = self.operand_size(node.args[1]) if node.fun in ("dot", "pow") else None
+
+        if node.fun in ("solve", "inv", "det"):
+            if m1 is not None and (m1[1] != 2 or (m1[0][0] != m1[0][1] and None not in m1[0])):
+                self.errors.append(f"Błąd w linii {node.lineno}: funkcja `{node.fun}` wymaga macierzy kwadratowej!")
+                return
+
+            m2 = self.operand_size(node.args[1]) if node.fun == "solve" else None
+
+            if m1 is not None and m2 is not None and m1[0][0] != m2[0][0] and None not in (m1[0][0], m2[0][0]):
+                self.errors.append(f"Błąd w linii {node.lineno}: prawa strona układu w funkcji `solve` ma inną liczbę wierszy niż macierz!")
+                return
+        elif node.fun in ("dot", "pow"):
+            if m1 is not None and m2 is not None and m1[0] != m2[0] and None not in m1[0] + m2[0]:
+                self.errors.append(f"Błąd w linii {node.lineno}: argumenty funkcji `{node.fun}` mają różne wymiary!")
+                return
+        elif len(node.args) > 1:
+            axis = size_of(node.args[1])
+
+            if axis is not None and axis not in (0, 1):
+                self.errors.append(f"Błąd w linii {node.lineno}: oś funkcji `{node.fun}` musi być równa 0 albo 1!")
+                return
+
+            if m1 is not None and m1[1] == 1:
+                self.errors.append(f"Błąd w linii {node.lineno}: funkcja `{node.fun}` z osią wymaga macierzy, nie wektora!")
+                return
+
+        return type
+
+    # wymiary wyniku funkcji wbudowanej: redukcja macierzy znanych wymiarów wzdłuż osi 0 to wektor
+    # długości liczby kolumn, wzdłuż osi 1 - liczby wierszy; funkcja element po elemencie ma
+    # wymiary swojego argumentu będącego macierzą, solve - prawej strony, inv - macierzy; [0, 0] i 0, gdy nie są znane
+    def builtin_size(self, node):
+        if node.fun in ("solve", "inv"):
+            m = self.operand_size(node.args[-1])
+            return (list(m[0]), m[1]) if m is not None else ([0, 0], 0)
+
+        if node.fun in elementwise:
+            for arg in node.args:
+                m = self.operand_size(arg)
+
+                if m is not None:
+                    return list(m[0]), m[1]
+
+            return [0, 0], 0
+
+        if len(node.args) < 2 or node.fun == "dot":
+            return [0, 0], 0
+
+        m1, axis = self.operand_size(node.args[0]), size_of(node.args[1])
+
+        if m1 is None or m1[1] != 2 or axis not in (0, 1):
+            return [0, 0], 0
+
+        return [m1[0][1 - axis], 1], 1
+
     def visit_FloatNum(self, node):
         return "float"
 
@@ -0,0 +1,151 @@
+from BytecodeCompiler import *
+from Runtime import *
+
+
+class VirtualMachine(object):
+    def __init__(self, code):
+        self.code = code
+        self.slots = [None] * code.nslots
+
+    # Pętla dyspozytora - instrukcje ułożone od najczęściej wykonywanych
+    def run(self):
+        instructions = self.code.instructions
+        consts = self.code.consts
+        slots = self.slots
+        stack = []
+        literals = {}   # indeks w consts -> macierz literału
+        push, pop = stack.append, stack.pop
+        numbers = scalars
+        pc = 0
+
+        while True:
+            op = instructions[pc]
+            arg = instructions[pc + 1]
+            pc += 2
+
+            if op == LOAD:
+                push(slots[arg])
+            elif op == LOAD_CONST:
+                push(consts[arg])
+            elif op == STORE:
+                slots[arg] = pop()
+            elif op == POP_JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == POP_JUMP_IF_TRUE:
+                if pop():
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == UPDATE:
+                right = pop()
+                left = stack[-1]
+                stack[-1] = compound[consts[arg]](left, right) if left.__class__ in numbers else update(consts[arg], left, right)
+            elif op == ADD:
+                right = pop()
+                stack[-1] = stack[-1] + right
+            elif op == SUB:
+                right = pop()
+                stack[-1] = stack[-1] - right
+            elif op == MUL:
+                right = pop()
+                stack[-1] = stack[-1] * right
+            elif op == DIV:
+                right = pop()
+                stack[-1] = stack[-1] / right if right != 0 else float('inf')
+            elif op == FOR_STEP:
+                value = slots[arg]
+                push(value < slots[arg + 1])
+                slots[arg] = value + 1
+            elif op == COMPARE_LT:
+                right = pop()
+                stack[-1] = stack[-1] < right
+            elif op == COMPARE_GT:
+                right = pop()
+                stack[-1] = stack[-1] > right
+            elif op == COMPARE_EQ:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == COMPARE_LE:
+                right = pop()
+                stack[-1] = stack[-1] <= right
+            elif op == COMPARE_GE:
+                right = pop()
+                stack[-1] = stack[-1] >= right
+            elif op == COMPARE_NE:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif op == LOAD_ITEM2:
+                col = pop()
+                stack[-1] = slots[arg][stack[-1], col]
+            elif op == LOAD_ITEM1:
+                stack[-1] = slots[arg][stack[-1]]
+            elif op == STORE_ITEM2:
+                col = pop()
+                row = pop()
+                slots[arg] = store_item(slots[arg], row, col, pop())
+            elif op == STORE_ITEM1:
+                row = pop()
+                slots[arg] = store_row(slots[arg], row, pop())
+            elif op == STORE_RANGE:
+                end = pop()
+                begin = pop()
+                slots[arg] = store_range(slots[arg], begin, end, pop())
+            elif op == LOAD_RANGE:
+                end = pop()
+                stack[-1] = load_range(slots[arg], stack[-1], end)
+            elif op == LOAD_BLOCK:
+                bounds = stack[-4:]
+                del stack[-4:]
+                push(load_block(slots[arg], *bounds))
+            elif op == BINARY_MAT:
+                right = pop()
+                stack[-1] = arith_mat(consts[arg], stack[-1], right)
+            elif op == MATRIX_FUNC:
+                fun, count = consts[arg]
+                args = stack[-count:]
+                del stack[-count:]
+                push(matrix_funcs(fun, *args))
+            elif op == TO_STR:
+                stack[-1] = show(stack[-1])
+            elif op == JOIN_STR:
+                right = pop()
+                stack[-1] = f"{stack[-1]} {show(right)}"
+            elif op == TRANSPOSE:
+                stack[-1] = transpose(stack[-1])
+            elif op == MATRIX_LITERAL:
+                matrix = literals.get(arg)
+
+                if matrix is None:
+                    matrix = literals[arg] = matrix_literal(consts[arg])
+
+                push(share(matrix))
+            elif op == ARITH_FUSED:
+                tree, count = consts[arg]
+                operands = stack[-count:]
+                del stack[-count:]
+                push(arith_fused(tree, operands))
+            elif op == CALL_BUILTIN:
+                fun, count = consts[arg]
+                args = stack[-count:]
+                del stack[-count:]
+                push(call_builtin(fun, *args))
+            elif op == STORE_BLOCK:
+                bounds = stack[-4:]
+                del stack[-4:]
+                slots[arg] = store_block(slots[arg], *bounds, pop())
+            elif op == UPDATE_ITEM:
+                update_op, slot, count = consts[arg]
+                indices = stack[-count:]
+                del stack[-count:]
+                slots[slot] = update_item(update_op, slots[slot], indices, pop())
+            elif op == SHARE:
+                stack[-1] = share(stack[-1])
+            elif op == PRINT:
+                print(pop())
+            elif op == POP:
+                pop()
+            elif op == HALT:
+                return
+            else:
+                raise RuntimeError(f"Nieznany kod operacji {op} pod adresem {pc - 2}")
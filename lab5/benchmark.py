@@ -0,0 +1,334 @@
+import io
+import glob
+import time
+import argparse
+import tracemalloc
+import contextlib
+from array import array
+import AST
+import Runtime
+from Matrix import Matrix
+from scanner import Scanner
+from parser import Mparser
+from TypeChecker import TypeChecker
+from Resolver import Resolver
+from OptimizationPass1 import OptimizationPass1
+from OptimizationPass2 import OptimizationPass2
+from OptimizationPass3 import OptimizationPass3
+from Interpreter import Interpreter
+from ClosureCompiler import ClosureCompiler
+from BytecodeCompiler import BytecodeCompiler
+from VirtualMachine import VirtualMachine
+from CodeGenerator import CodeGenerator, execute
+from Runtime import backends, use_backend
+
+engines = {
+    "visitor": lambda ast: Interpreter().visit(resolved(ast)),
+    "closure": lambda ast: ClosureCompiler().run(resolved(ast)),
+    "bytecode": lambda ast: VirtualMachine(BytecodeCompiler().compile(ast)).run(),
+    "python": lambda ast: execute(CodeGenerator().generate(ast)),
+}
+
+
+def resolved(ast):
+    Resolver().resolve(ast)
+    return ast
+
+
+def load(filename, optimize=False):
+    with open(filename, "r") as file:
+        text = file.read()
+
+    ast = Mparser().parse(Scanner().tokenize(text))
+    typeChecker = TypeChecker()
+    typeChecker.visit(ast)
+
+    if len(typeChecker.errors) > 0:
+        raise ValueError(f"{filename}: {typeChecker.errors}")
+
+    if optimize:
+        ast = OptimizationPass1().optimize(ast)
+        ast = OptimizationPass2().optimize(ast)
+        ast = OptimizationPass3().optimize(ast)
+
+    return ast
+
+
+# najlepszy z <repeat> czasów wykonania (razem z ewentualną kompilacją) i wypisany tekst
+def measure(run, filename, repeat, optimize=False):
+    best = float('inf')
+    output = None
+
+    for _ in range(repeat):
+        ast = load(filename, optimize)
+
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            start = time.perf_counter()
+            run(ast)
+            best = min(best, time.perf_counter() - start)
+
+        output = out.getvalue()
+
+    return best, output
+
+
+# podklasa bez własnego `@when` - wymusza szukanie celu przez klasy bazowe
+class DerivedIntNum(AST.IntNum):
+    pass
+
+
+def bench_engines(args):
+    print(f"{'program':<22}{'engine':<10}{'time [ms]':>12}{'speedup':>10}  output")
+
+    for filename in args.files:
+        baseline_time, baseline_output = measure(engines["visitor"], filename, args.repeat)
+
+        for engine in args.engines:
+            if engine == "visitor":
+                elapsed, output = baseline_time, baseline_output
+            else:
+                elapsed, output = measure(engines[engine], filename, args.repeat)
+
+            status = "same" if output == baseline_output else "DIFFERENT"
+            print(f"{filename:<22}{engine:<10}{elapsed * 1000:>12.3f}{baseline_time / elapsed:>9.2f}x  {status}")
+
+
+# każdy silnik na drzewie przed i po przebiegach optymalizujących
+def bench_optimize(args):
+    print(f"{'program':<22}{'engine':<10}{'plain [ms]':>12}{'optimized [ms]':>15}{'speedup':>10}  output")
+
+    for filename in args.files:
+        for engine in args.engines:
+            plain_time, plain_output = measure(engines[engine], filename, args.repeat)
+            elapsed, output = measure(engines[engine], filename, args.repeat, optimize=True)
+
+            status = "same" if output == plain_output else "DIFFERENT"
+            print(f"{filename:<22}{engine:<10}{plain_time * 1000:>12.3f}{elapsed * 1000:>15.3f}"
+                  f"{plain_time / elapsed:>9.2f}x  {status}")
+
+
+# każdy silnik z macierzami w Matrix i w tablicach NumPy
+def bench_backends(args):
+    print(f"{'program':<22}{'engine':<10}" + "".join(f"{name + ' [ms]':>14}" for name in backends) + "  output")
+
+    for filename in args.files:
+        for engine in args.engines:
+            times, outputs = [], []
+
+            for name in backends:
+                use_backend(name)
+                elapsed, output = measure(engines[engine], filename, args.repeat)
+                times.append(elapsed)
+                outputs.append(output)
+
+            use_backend("array")
+            status = "same" if len(set(outputs)) == 1 else "DIFFERENT"
+            print(f"{filename:<22}{engine:<10}" + "".join(f"{elapsed * 1000:>14.3f}" for elapsed in times) + f"  {status}")
+
+
+# dawne mnożenie macierzy z Runtime - potrójna pętla z kolumnami prawej macierzy w najgłębszej pętli
+def naive_matmul(left, right):
+    result = [[0. for _ in range(len(right[0]))] for _ in range(len(left))]
+
+    for i in range(len(left)):
+        for j in range(len(right[0])):
+            suma = 0
+            for k in range(len(left[0])):
+                suma += left[i][k] * right[k][j]
+            result[i][j] = suma
+
+    return result
+
+
+# Runtime.matmul z wymuszonym wariantem (wiersze razy kolumny albo bloki)
+def forced_matmul(blocked_size):
+    def run(left, right):
+        default, Runtime.matmul_blocked_size = Runtime.matmul_blocked_size, blocked_size
+
+        try:
+            return Runtime.matmul(left, right)
+        finally:
+            Runtime.matmul_blocked_size = default
+
+    return run
+
+
+matmul_kernels = {
+    "naive": naive_matmul,
+    "rows": forced_matmul(float('inf')),
+    "blocked": forced_matmul(0),
+    "auto": Runtime.matmul,
+}
+
+
+# mnożenie macierzy n x n każdym wariantem; argumenty: rozmiary
+def bench_matmul(args):
+    sizes = [int(size) for size in args.files] or [10, 50, 100, 200, 400]
+    print(f"{'size':<8}" + "".join(f"{name + ' [ms]':>16}" for name in matmul_kernels) + "  result")
+
+    for n in sizes:
+        left = [[float((i * n + j) % 7) for j in range(n)] for i in range(n)]
+        right = [[float((i + 2 * j) % 5) for j in range(n)] for i in range(n)]
+        times, results = [], []
+
+        for name, kernel in matmul_kernels.items():
+            # poza dawną pętlą argumentami są Matrix, jak w Runtime
+            operands = (left, right) if name == "naive" else (Matrix.from_list(left), Matrix.from_list(right))
+            best = float('inf')
+
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = kernel(*operands)
+                best = min(best, time.perf_counter() - start)
+
+            times.append(best)
+            results.append(result if name == "naive" else result.tolist())
+
+        status = "same" if all(result == results[0] for result in results) else "DIFFERENT"
+        print(f"{n:<8}" + "".join(f"{elapsed * 1000:>16.3f}" for elapsed in times) + f"  {status}")
+
+
+# łańcuch A1 .+ A2 .- A3 .+ ... z <length> macierzy n x n (co trzecie działanie to `./`)
+def elementwise_chain(n, length):
+    operands = [Matrix.from_list([[float((i + j + k) % 9 + 1) for j in range(n)] for i in range(n)]) for k in range(length)]
+    ops = ['.+', '.-', './']
+    tree = 0
+
+    for k in range(1, length):
+        tree = (ops[(k - 1) % len(ops)], tree, k)
+
+    return tree, operands
+
+
+elementwise_kernels = {
+    "stepwise": Runtime.arith_tree,
+    "fused": Runtime.arith_fused,
+}
+
+
+# łańcuchy działań element po elemencie liczone działanie po działaniu i w jednym przejściu;
+# argumenty: rozmiary macierzy. Szczyt pamięci (tracemalloc) nie liczy argumentów
+def bench_elementwise(args):
+    sizes = [int(size) for size in args.files] or [100, 300, 600]
+    header = "".join(f"{name + ' [ms]':>15}{name + ' [MB]':>15}" for name in elementwise_kernels)
+    print(f"{'size':<8}{'length':<8}" + header + "  result")
+
+    for n in sizes:
+        for length in (3, 6, 12):
+            tree, operands = elementwise_chain(n, length)
+            row, results = [], []
+
+            for kernel in elementwise_kernels.values():
+                best = float('inf')
+
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    result = kernel(tree, operands)
+                    best = min(best, time.perf_counter() - start)
+
+                tracemalloc.start()
+                kernel(tree, operands)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                row.append(f"{best * 1000:>15.3f}{peak / 2 ** 20:>15.3f}")
+                results.append(result.tolist())
+
+            status = "same" if all(result == results[0] for result in results) else "DIFFERENT"
+            print(f"{n:<8}{length:<8}" + "".join(row) + f"  {status}")
+
+
+# wartość <fun>(n) w postaci z Runtime i jako gęsta macierz (jak przed wprowadzeniem macierzy rzadkich)
+def dense_generator(fun):
+    def run(n):
+        value = Runtime.matrix_funcs(fun, n)
+        return Matrix(array('d', Runtime.dense(value).flat()), n, n)
+
+    return run
+
+
+# eye/zeros/ones: czas i szczyt pamięci utworzenia wartości i działania z macierzą A
+# (`A .* eye(n)`, `A .+ zeros(n)`, `A .* ones(n)`); argumenty: rozmiary macierzy
+def bench_structured(args):
+    sizes = [int(size) for size in args.files] or [100, 300, 600]
+    ops = {"eye": '.*', "zeros": '.+', "ones": '.*'}
+    print(f"{'size':<8}{'fun':<8}" + "".join(f"{kind + ' [ms]':>16}{kind + ' [MB]':>16}" for kind in ("structured", "dense"))
+          + f"{'op structured':>16}{'op dense':>16}  result")
+
+    for n in sizes:
+        A = Matrix.from_list([[float((i * n + j) % 7) for j in range(n)] for i in range(n)])
+
+        for fun, op in ops.items():
+            row, results = [], []
+
+            for generator in (lambda n: Runtime.matrix_funcs(fun, n), dense_generator(fun)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                value = generator(n)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                row.append(f"{elapsed * 1000:>16.3f}{peak / 2 ** 20:>16.3f}")
+
+                start = time.perf_counter()
+                results.append(Runtime.arith_mat(op, A, value).tolist())
+                row.append(f"{(time.perf_counter() - start) * 1000:>16.3f}")
+
+            status = "same" if results[0] == results[1] else "DIFFERENT"
+            print(f"{n:<8}{fun:<8}" + row[0] + row[2] + row[1] + row[3] + f"  {status}")
+
+
+# sam koszt `Interpreter.visit` - liście drzew z przykładów nie wywołują rekurencji
+def bench_dispatch(args):
+    leaf_types = (AST.IntNum, AST.FloatNum, AST.String, AST.NumLineNode)
+    nodes = [node for filename in args.files for node in AST.walk(resolved(load(filename))) if type(node) in leaf_types]
+    derived = [DerivedIntNum(node.value, node.lineno) for node in nodes if type(node) is AST.IntNum]
+    interpreter = Interpreter()
+    visit = interpreter.visit
+
+    print(f"{'nodes':<22}{'count':>10}{'ns/visit':>12}")
+
+    for label, group in (("registered classes", nodes), ("unregistered subclass", derived)):
+        best = float('inf')
+        rounds = max(1, 200000 // len(group))
+
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+
+            for _ in range(rounds):
+                for node in group:
+                    visit(node)
+
+            best = min(best, time.perf_counter() - start)
+
+        print(f"{label:<22}{len(group):>10}{best / (rounds * len(group)) * 1e9:>12.1f}")
+
+
+suites = {
+    "engines": bench_engines,
+    "dispatch": bench_dispatch,
+    "optimize": bench_optimize,
+    "backends": bench_backends,
+    "matmul": bench_matmul,
+    "elementwise": bench_elementwise,
+    "structured": bench_structured,
+}
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("files", nargs="*")
+    arg_parser.add_argument("--suite", choices=list(suites), default="engines")
+    arg_parser.add_argument("--engines", nargs="+", choices=list(engines), default=list(engines))
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    if not args.files and args.suite not in ("matmul", "elementwise", "structured"):
+        if args.suite == "dispatch":
+            args.files = sorted(glob.glob("examples/*.m"))
+        elif args.suite == "backends":
+            args.files = ["examples/matrix.m", "examples/common.m", "examples/large.m"]
+        else:
+            args.files = ["examples/pi.m", "examples/primes.m", "examples/sqrt.m"]
+
+    suites[args.suite](args)
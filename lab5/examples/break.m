@@ -0,0 +1,15 @@
+found = 0;
+for n = 1:20000 {
+    for d = 1:n {
+        if (d == 3) {
+            found += 1;
+            break;
+        }
+    }
+    k = 0;
+    while (k < 100) {
+        k += 1;
+        break;
+    }
+}
+print found;
@@ -0,0 +1,10 @@
+A = ones(40);
+B = eye(40);
+R = zeros(40);
+for k = 1:10 {
+    A[0, 0] = k;
+    P = A .* B;
+    Q = A .* B;
+    R = P .+ Q;
+}
+print R;
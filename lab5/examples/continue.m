@@ -0,0 +1,8 @@
+odd = 0;
+parity = 0;
+for i = 1:100000 {
+    parity = 1 - parity;
+    if (parity == 0) continue;
+    odd += 1;
+}
+print odd;
@@ -0,0 +1,11 @@
+A = zeros(200, 300);
+for i = 0:199 {
+    for j = 0:299 {
+        A[i, j] = i + j;
+    }
+}
+R = sqrt(A);
+L = log(ones(200, 300) .+ A);
+P = pow(R, 2);
+print sum(R), sum(L), sum(P), sum(A);
+print exp(1), log(0), sqrt(2), abs(0 - 3), pow(2, 10);
@@ -0,0 +1,8 @@
+n = 2;
+m = 3;
+A = ones(n);
+B = ones(m);
+for i = 1:3 {
+    print i;
+    C = A .+ B;
+}
@@ -0,0 +1,7 @@
+n = 0 - 1;
+i = 0;
+while (i < 2) {
+    print i;
+    A = zeros(n);
+    i += 1;
+}
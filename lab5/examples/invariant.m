@@ -0,0 +1,10 @@
+scale = 1.0;
+offset = 0.5;
+for k = 1:10 {
+    scale += 0.25;
+    total = 0.0;
+    for i = 1:100 {
+        for j = 1:100 total += scale * scale / (i + offset) + j;
+    }
+    print k, total;
+}
@@ -0,0 +1,6 @@
+A = ones(150);
+B = eye(150);
+C = A .+ B;
+D = C .* C;
+E = D ./ C;
+print E;
@@ -0,0 +1,15 @@
+A = ones(60, 60);
+for i = 0:59 {
+    A[i, i] = i + 60;
+}
+b = sum(A, 1);
+x = solve(A, b);
+print sum(x), det(A) > 0;
+B = inv(A);
+print sum(B);
+s = 0;
+for k = 1:20 {
+    y = solve(A, b);
+    s += y[59];
+}
+print s;
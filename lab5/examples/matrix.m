@@ -5,6 +5,6 @@ print C;
 
 D = zeros(3);
 D[0, 0] = 42;
-#D[1 : 3, 2 : 4] = 7; #dla chetnych
+D[1 : 3, 1 : 3] = 7;
 print D;
 print D[2, 2];
@@ -0,0 +1,8 @@
+A = ones(200, 300);
+for i = 0:199 {
+    A[i, i] = i;
+}
+print sum(A), min(A), max(A), mean(A), norm(A);
+columns = sum(A, 0);
+rows = max(A, 1);
+print sum(columns), mean(rows), dot(columns, columns);
@@ -1,13 +1,73 @@
+import io
 import sys
+import argparse
+import contextlib
 from scanner import Scanner
 from parser import Mparser
 from TypeChecker import TypeChecker
+from Resolver import Resolver
+from OptimizationPass1 import OptimizationPass1
+from OptimizationPass2 import OptimizationPass2
+from OptimizationPass3 import OptimizationPass3
 from Interpreter import Interpreter
+from ClosureCompiler import ClosureCompiler
+from BytecodeCompiler import BytecodeCompiler, disassemble
+from VirtualMachine import VirtualMachine
+from CodeGenerator import CodeGenerator, execute
+from Runtime import backends, use_backend
 import TreePrinter
+import ast as python_ast
+
+
+def run(engine, ast, args):
+    if engine == "closure":
+        Resolver().resolve(ast)
+        ClosureCompiler().run(ast)
+    elif engine == "bytecode":
+        code = BytecodeCompiler().compile(ast)
+
+        if args.disassemble:
+            print(disassemble(code))
+            print()
+
+        VirtualMachine(code).run()
+    elif engine == "python":
+        module = CodeGenerator().generate(ast)
+
+        if args.dump_source:
+            print(python_ast.unparse(module))
+            print()
+
+        execute(module, args.filename)
+    else:
+        Resolver().resolve(ast)
+        interpreter = Interpreter()
+        interpreter.visit(ast)
+
 
 if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("filename", nargs="?", default="examples/example.txt")
+    arg_parser.add_argument("--engine", choices=["visitor", "closure", "bytecode", "python"], default="visitor",
+                            help="visitor walks the AST on every evaluation, closure compiles it to closures once, "
+                                 "bytecode compiles it for the stack virtual machine, python transpiles it to Python")
+    arg_parser.add_argument("--disassemble", action="store_true",
+                            help="print the bytecode before running it (with --engine bytecode)")
+    arg_parser.add_argument("--dump-source", action="store_true",
+                            help="print the generated Python source before running it (with --engine python)")
+    arg_parser.add_argument("--matrix-backend", choices=backends, default="array",
+                            help="store matrices in flat Python arrays or as NumPy arrays")
+    arg_parser.add_argument("--no-optimize", action="store_true",
+                            help="skip constant folding and propagation (OptimizationPass1) "
+                                 "loop-invariant code motion (OptimizationPass2) "
+                                 "and common subexpression elimination (OptimizationPass3)")
+    arg_parser.add_argument("--check", action="store_true",
+                            help="compare the program output with the output of the visitor Interpreter")
+    args = arg_parser.parse_args()
+    use_backend(args.matrix_backend)
+
     try:
-        filename = sys.argv[1] if len(sys.argv) > 1 else "examples/example.txt"
+        filename = args.filename
         file = open(filename, "r")
     except IOError:
         print("Cannot open {0} file".format(filename))
@@ -23,8 +83,8 @@ if __name__ == '__main__':
         print("Abstract syntax tree:")
         print(ast.printTree())
         print()
-        
-        typeChecker = TypeChecker()   
+
+        typeChecker = TypeChecker()
         typeChecker.visit(ast) # or alternatively ast.accept(typeChecker)
 
         if len(typeChecker.errors) > 0:
@@ -33,10 +93,39 @@ if __name__ == '__main__':
             for error in typeChecker.errors:
                 print(error)
         else:
+            if not args.no_optimize:
+                optimizer = OptimizationPass1()
+                ast = optimizer.optimize(ast)
+                print(f"Optimization: folded {optimizer.folded} nodes, propagated {optimizer.propagated} constants")
+
+                optimizer = OptimizationPass2()
+                ast = optimizer.optimize(ast)
+                print(f"Optimization: hoisted {optimizer.hoisted} loop-invariant expressions")
+
+                optimizer = OptimizationPass3()
+                ast = optimizer.optimize(ast)
+                print(f"Optimization: eliminated {optimizer.eliminated} common subexpressions")
+
             print("Interpreting the program:")
-            interpreter = Interpreter()
-            interpreter.visit(ast)
-            # in future
-            # ast.accept(OptimizationPass1())
-            # ast.accept(OptimizationPass2())
-            # ast.accept(CodeGenerator())
\ No newline at end of file
+
+            if not args.check:
+                run(args.engine, ast, args)
+            else:
+                with contextlib.redirect_stdout(io.StringIO()) as out:
+                    run(args.engine, ast, args)
+
+                print(out.getvalue(), end="")
+
+                # Interpreter dostaje świeże, niezoptymalizowane drzewo - przebiegi optymalizacji przepisały AST -
+                # i przechowuje macierze w Matrix
+                use_backend("array")
+
+                with contextlib.redirect_stdout(io.StringIO()) as reference:
+                    run("visitor", parser.parse(lexer.tokenize(text)), args)
+
+                if out.getvalue() == reference.getvalue():
+                    print("Check passed: output matches the Interpreter")
+                else:
+                    print("Check failed! Interpreter output:")
+                    print(reference.getvalue(), end="")
+
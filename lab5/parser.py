@@ -128,8 +128,14 @@ class Mparser(Parser):
     def expression(self, p):
         return AST.RelationExpression(p[0], p.lineno)
 
+    @_('builtin')
+    def expression(self, p):
+        return p[0]
+
     @_('matrix_funcs',
-       'matrix_ref')
+       'matrix_ref',
+       'tab_ref',
+       'block_ref')
     def expression(self, p):
         return AST.MatrixExpression(p[0], p.lineno)
 
@@ -193,7 +199,8 @@ class Mparser(Parser):
     def id_ref(self, p):
         return AST.MatrixRef(p[0], p.lineno)
 
-    @_('tab_ref')
+    @_('tab_ref',
+       'block_ref')
     def id_ref(self, p):
         return AST.TabRef(p[0], p.lineno)
 
@@ -217,6 +224,10 @@ class Mparser(Parser):
     def tab_ref(self, p):
         return AST.TabRefBegin(p[0], p[2], p.lineno)
 
+    @_('ID "[" id_int ":" id_int "," id_int ":" id_int "]"')
+    def block_ref(self, p):
+        return AST.BlockRef(p[0], p[2], p[4], p[6], p[8], p.lineno)
+
     @_('"[" line_of_num "]"',
        'matrix_rows "," "[" line_of_num "]"')
     def matrix_rows(self, p):
@@ -239,11 +250,39 @@ class Mparser(Parser):
 
         return AST.NumLineNode(values, p.lineno)
 
-    @_('ZEROS "(" INTNUM ")"',
-       'ONES "(" INTNUM ")"',
-       'EYE "(" INTNUM ")"')
+    @_('ZEROS "(" expression ")"',
+       'ONES "(" expression ")"',
+       'EYE "(" expression ")"')
+    def matrix_funcs(self, p):
+        return AST.MatrixFuncs(p[0], p[2], None, p.lineno)
+
+    @_('ZEROS "(" expression "," expression ")"',
+       'ONES "(" expression "," expression ")"',
+       'EYE "(" expression "," expression ")"')
     def matrix_funcs(self, p):
-        return AST.MatrixFuncs(p[0], p[2], p.lineno)
+        return AST.MatrixFuncs(p[0], p[2], p[4], p.lineno)
+
+    @_('SUM "(" expression ")"',
+       'MIN "(" expression ")"',
+       'MAX "(" expression ")"',
+       'MEAN "(" expression ")"',
+       'NORM "(" expression ")"',
+       'SUM "(" expression "," expression ")"',
+       'MIN "(" expression "," expression ")"',
+       'MAX "(" expression "," expression ")"',
+       'MEAN "(" expression "," expression ")"',
+       'NORM "(" expression "," expression ")"',
+       'DOT "(" expression "," expression ")"',
+       'SQRT "(" expression ")"',
+       'EXP "(" expression ")"',
+       'LOG "(" expression ")"',
+       'ABS "(" expression ")"',
+       'POW "(" expression "," expression ")"',
+       'SOLVE "(" expression "," expression ")"',
+       'INV "(" expression ")"',
+       'DET "(" expression ")"')
+    def builtin(self, p):
+        return AST.Builtin(p[0], [p[2]] if len(p) == 4 else [p[2], p[4]], p.lineno)
 
     @_('INTNUM')
     def value(self, p):
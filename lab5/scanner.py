@@ -9,6 +9,9 @@ class Scanner(Lexer):
                 LE, GE, NE, EQ, 
                 IF, ELSE, FOR, WHILE, BREAK, CONTINUE, RETURN,
                 EYE, ZEROS, ONES, 
+                SUM, MIN, MAX, MEAN, NORM, DOT,
+                SQRT, EXP, LOG, ABS, POW,
+                SOLVE, INV, DET,
                 PRINT, ID, INTNUM, FLOATNUM, STRING
              }
 
@@ -59,6 +62,20 @@ class Scanner(Lexer):
     ID['eye'] = EYE
     ID['zeros'] = ZEROS
     ID['ones'] = ONES
+    ID['sum'] = SUM
+    ID['min'] = MIN
+    ID['max'] = MAX
+    ID['mean'] = MEAN
+    ID['norm'] = NORM
+    ID['dot'] = DOT
+    ID['sqrt'] = SQRT
+    ID['exp'] = EXP
+    ID['log'] = LOG
+    ID['abs'] = ABS
+    ID['pow'] = POW
+    ID['solve'] = SOLVE
+    ID['inv'] = INV
+    ID['det'] = DET
     ID['print'] = PRINT
 
     # Line number tracking
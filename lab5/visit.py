@@ -5,8 +5,8 @@ __all__ = ['on', 'when']
 def on(param_name):
     def f(fn):
         dispatcher = Dispatcher(param_name, fn)
-        return dispatcher
-    
+        return dispatcher.dispatch
+
     return f
 
 def when(param_type):
@@ -20,12 +20,10 @@ def when(param_type):
 
         dispatcher.add_target(param_type, fn)
 
-        def ff(*args, **kw):
-            return dispatcher(*args, **kw)
-        
-        ff.dispatcher = dispatcher
-        return ff
-    
+        # zwracamy samą funkcję dyspozytora (bez dodatkowej ramki `ff`),
+        # więc `self.visit(node)` to jedno wyszukanie w cache i jedno wywołanie
+        return dispatcher.dispatch
+
     return f
 
 
@@ -33,27 +31,61 @@ class Dispatcher(object):
     def __init__(self, param_name, fn):
         self.param_index = self.__argspec(fn).args.index(param_name)
         self.param_name = param_name
+        self.default = fn
         self.targets = {}
+        self.cache = {}
+        self.dispatch = self.__make_dispatch()
 
     def __call__(self, *args, **kw):
-        typ = args[self.param_index].__class__
-        d = self.targets.get(typ)
+        return self.dispatch(*args, **kw)
+
+    def __make_dispatch(self):
+        cache = self.cache
+        resolve = self.resolve
+        param_index = self.param_index
 
-        if d is not None:
-            return d(*args, **kw)
+        if param_index == 1:
+            def dispatch(self, node, *args, **kw):
+                target = cache.get(node.__class__)
+
+                if target is None:
+                    target = resolve(node.__class__)
+
+                return target(self, node, *args, **kw)
         else:
-            issub = issubclass
-            t = self.targets
-            ks = iter(t)
-            
-            return [t[k](*args, **kw) for k in ks if issub(typ, k)]
+            def dispatch(*args, **kw):
+                typ = args[param_index].__class__
+                target = cache.get(typ)
+
+                if target is None:
+                    target = resolve(typ)
+
+                return target(*args, **kw)
+
+        dispatch.dispatcher = self
+        return dispatch
+
+    # klasa jest rozwiązywana raz, przez jej MRO - najbardziej szczegółowa
+    # zarejestrowana klasa bazowa wygrywa, a bez dopasowania wołana jest
+    # funkcja oznaczona `@on`
+    def resolve(self, typ):
+        target = self.default
+
+        for base in typ.__mro__:
+            if base in self.targets:
+                target = self.targets[base]
+                break
+
+        self.cache[typ] = target
+        return target
 
     def add_target(self, typ, target):
         self.targets[typ] = target
+        self.cache.clear()
 
     @staticmethod
     def __argspec(fn):
         if hasattr(inspect, 'getfullargspec'):
             return inspect.getfullargspec(fn)
         else:
-            return inspect.getargspec(fn)
\ No newline at end of file
+            return inspect.getargspec(fn)